@@ -6,6 +6,8 @@ from typing import Any
 
 from datetime import datetime
 
+from .cache import bump_generation, cached_view, vault_generation, view_cache
+from .catalog import active_catalog
 from .io import canonicalize_path, dump_frontmatter, safe_write_text
 from .items import (
     append_daily_note,
@@ -14,10 +16,33 @@ from .items import (
     promote_inbox_item,
     read_item,
 )
+from .jobs import list_jobs, open_job
+from .links import active_link_index, record_link_writes
+from .memory import SITE_GROUPS
+from .metrics import metrics
 from .ops_log import append_ops_log, utc_now_iso
+from .passages import active_passage_index
+from .perf import span
+from .profiling import (
+    DEFAULT_CAPTURE_SECONDS,
+    DEFAULT_SAMPLE_INTERVAL,
+    capture_memory,
+    start_capture,
+    stop_memory_capture,
+)
 from .schema import load_schema, validate_frontmatter_verbose
+from .search import CancelToken
+from .slow_log import tracked
 from .status import StatusTransitionError, validate_status_transition
-from .views import inbox_view, item_view, load_item_view, search_view
+from .text_index import active_trigram_index
+from .views import (
+    graph_neighbors_view,
+    inbox_view,
+    load_item_view,
+    retrieve_view,
+    search_view,
+    written_item_view,
+)
 
 
 @dataclass(frozen=True)
@@ -32,6 +57,7 @@ def _require_token(required: str | None, provided: str | None) -> None:
             raise ApiError("unauthorized", status=401)
 
 
+@tracked("api.inbox")
 def api_inbox(
     vault_root: Path,
     *,
@@ -42,11 +68,29 @@ def api_inbox(
     privacy: list[str] | None,
     token_required: str | None,
     token_provided: str | None,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
     _require_token(token_required, token_provided)
-    return inbox_view(vault_root, limit=limit, offset=offset, sort=sort, status=status, privacy=privacy)
+    params = {
+        "limit": limit,
+        "offset": offset,
+        "sort": sort,
+        "status": status,
+        "privacy": privacy,
+        "cursor": cursor,
+    }
+    try:
+        return cached_view(
+            "inbox",
+            vault_root,
+            params,
+            lambda: inbox_view(vault_root, catalog=active_catalog(vault_root), **params),
+        )
+    except ValueError as exc:
+        raise ApiError(str(exc), status=400) from exc
 
 
+@tracked("api.item")
 def api_item(
     vault_root: Path,
     *,
@@ -63,9 +107,10 @@ def api_item(
         raise ApiError("invalid path", status=400)
     if not path.exists():
         raise ApiError("path not found", status=404)
-    return load_item_view(path)
+    return load_item_view(path, vault_root)
 
 
+@tracked("api.search")
 def api_search(
     vault_root: Path,
     *,
@@ -76,11 +121,237 @@ def api_search(
     privacy: list[str] | None,
     token_required: str | None,
     token_provided: str | None,
+    cursor: str | None = None,
+    budget_ms: int | None = None,
+    cancel: CancelToken | None = None,
+    explain: bool = False,
+    mode: str = "lexical",
+) -> dict[str, Any]:
+    _require_token(token_required, token_provided)
+    if budget_ms is not None and budget_ms <= 0:
+        raise ApiError("budget_ms must be positive", status=400)
+    params = {
+        "query": query,
+        "limit": limit,
+        "offset": offset,
+        "status": status,
+        "privacy": privacy,
+        "cursor": cursor,
+        "explain": explain,
+        "mode": mode,
+    }
+    try:
+        return cached_view(
+            "search",
+            vault_root,
+            params,
+            lambda: search_view(
+                vault_root,
+                time_budget=budget_ms / 1000 if budget_ms is not None else None,
+                cancel=cancel,
+                index=active_trigram_index(vault_root),
+                catalog=active_catalog(vault_root),
+                **params,
+            ),
+            cacheable=lambda payload: not payload["partial"] and not explain,
+        )
+    except ValueError as exc:
+        raise ApiError(str(exc), status=400) from exc
+
+
+@tracked("api.retrieve")
+def api_retrieve(
+    vault_root: Path,
+    *,
+    query: str,
+    k: int,
+    mode: str,
+    status: list[str] | None,
+    privacy: list[str] | None,
+    token_required: str | None,
+    token_provided: str | None,
 ) -> dict[str, Any]:
     _require_token(token_required, token_provided)
-    return search_view(vault_root, query, limit=limit, offset=offset, status=status, privacy=privacy)
+    if k <= 0:
+        raise ApiError("k must be positive", status=400)
+    params = {"query": query, "k": k, "mode": mode, "status": status, "privacy": privacy}
+    try:
+        return cached_view("retrieve", vault_root, params, lambda: retrieve_view(vault_root, **params))
+    except ValueError as exc:
+        raise ApiError(str(exc), status=400) from exc
+
+
+@tracked("api.graph_neighbors")
+def api_graph_neighbors(
+    vault_root: Path,
+    *,
+    item_id: str,
+    depth: int,
+    direction: str,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    _require_token(token_required, token_provided)
+    if not item_id:
+        raise ApiError("missing id parameter", status=400)
+    if depth <= 0:
+        raise ApiError("depth must be positive", status=400)
+    try:
+        return graph_neighbors_view(vault_root, item_id, depth=depth, direction=direction)
+    except ValueError as exc:
+        raise ApiError(str(exc), status=400) from exc
+
+
+def effective_budget_ms(server_budget_ms: int | None, requested_ms: int | None) -> int | None:
+    """Clients may tighten the server's search budget but never extend it."""
+    if server_budget_ms is None:
+        return requested_ms
+    if requested_ms is None:
+        return server_budget_ms
+    return min(server_budget_ms, requested_ms)
+
+
+def api_cache_stats(
+    vault_root: Path,
+    *,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    _require_token(token_required, token_provided)
+    stats = view_cache.stats()
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "hit_ratio": stats.hit_ratio,
+        "evictions": stats.evictions,
+        "entries": stats.entries,
+        "bytes": stats.bytes,
+        "max_bytes": stats.max_bytes,
+    }
+
+
+def metrics_format(requested: str | None, accept: str | None) -> str:
+    """``json`` or ``prometheus``: an explicit ``format`` wins, else Prometheus scrapers are recognised by Accept."""
+    if requested:
+        if requested not in ("json", "prometheus"):
+            raise ApiError("format must be json or prometheus", status=400)
+        return requested
+    accept = accept or ""
+    return "prometheus" if "text/plain" in accept or "openmetrics" in accept else "json"
+
+
+def api_metrics(
+    vault_root: Path,
+    *,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    """Request, IO and cache counters plus histograms; see ``render_prometheus`` for the text format."""
+    _require_token(token_required, token_provided)
+    stats = view_cache.stats()
+    gauges: dict[str, float] = {
+        "view_cache_hits": stats.hits,
+        "view_cache_misses": stats.misses,
+        "view_cache_hit_ratio": round(stats.hit_ratio, 6),
+        "view_cache_evictions": stats.evictions,
+        "view_cache_entries": stats.entries,
+        "view_cache_bytes": stats.bytes,
+        "vault_generation": vault_generation(),
+    }
+    for name, index in (
+        ("trigram_index_documents", active_trigram_index(vault_root)),
+        ("passage_index_passages", active_passage_index(vault_root)),
+        ("link_index_nodes", active_link_index(vault_root)),
+        ("catalog_rows", active_catalog(vault_root)),
+    ):
+        if index is not None:
+            gauges[name] = len(index)
+    return {**metrics.snapshot(), "gauges": gauges}
+
+
+def api_debug_profile(
+    vault_root: Path,
+    *,
+    seconds: float | None,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    """Start a background stack-sampling capture of all server threads."""
+    if not token_required:
+        raise ApiError("profiling requires an API token", status=403)
+    _require_token(token_required, token_provided)
+    seconds = seconds or DEFAULT_CAPTURE_SECONDS
+
+    def _done(path: Path, sampler: Any) -> None:
+        append_ops_log(vault_root, "debug.profile", {"path": str(path), "samples": sampler.samples})
+
+    try:
+        path = start_capture(vault_root, seconds, on_done=_done)
+    except ValueError as exc:
+        raise ApiError(str(exc), status=400) from exc
+    except RuntimeError as exc:
+        raise ApiError(str(exc), status=409) from exc
+    return {
+        "status": "started",
+        "mode": "sample",
+        "seconds": seconds,
+        "interval_ms": DEFAULT_SAMPLE_INTERVAL * 1000,
+        "path": str(path),
+    }
+
+
+MEMORY_ACTIONS = ("snapshot", "stop")
+
+
+def api_debug_memory(
+    vault_root: Path,
+    *,
+    action: str | None,
+    limit: int | None,
+    group: str | None,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    """Take a tracemalloc snapshot (the first call starts tracing) or stop tracing."""
+    if not token_required:
+        raise ApiError("memory profiling requires an API token", status=403)
+    _require_token(token_required, token_provided)
+    action = action or "snapshot"
+    group = group or "module"
+    if action not in MEMORY_ACTIONS:
+        raise ApiError(f"action must be one of: {', '.join(MEMORY_ACTIONS)}", status=400)
+    if group not in SITE_GROUPS:
+        raise ApiError(f"group must be one of: {', '.join(SITE_GROUPS)}", status=400)
+    if action == "stop":
+        stop_memory_capture()
+        return {"status": "stopped"}
+    payload = capture_memory(vault_root, limit=limit or 20, group=group)
+    if payload["status"] == "snapshot":
+        append_ops_log(
+            vault_root,
+            "debug.memory",
+            {"path": payload["path"], "traced_bytes": payload["traced_bytes"], "peak_bytes": payload["peak_bytes"]},
+        )
+    return payload
+
+
+def api_jobs(
+    vault_root: Path,
+    *,
+    job_id: str | None,
+    token_required: str | None,
+    token_provided: str | None,
+) -> dict[str, Any]:
+    _require_token(token_required, token_provided)
+    if not job_id:
+        return {"jobs": list_jobs(vault_root)}
+    try:
+        return {"job": open_job(vault_root, job_id).progress()}
+    except ValueError as exc:
+        raise ApiError(str(exc), status=404) from exc
 
 
+@tracked("api.capture")
 def api_capture(
     vault_root: Path,
     *,
@@ -104,10 +375,12 @@ def api_capture(
         tags=tags,
         privacy=privacy,
     )
+    record_link_writes(vault_root, path)
     append_ops_log(vault_root, "inbox.capture", {"file": str(path), "title": title})
     return {"path": str(path)}
 
 
+@tracked("api.promote")
 def api_promote(
     vault_root: Path,
     *,
@@ -128,10 +401,12 @@ def api_promote(
         target = promote_inbox_item(vault_root, path, target_status=status_value)
     except ValueError as exc:
         raise ApiError(str(exc), status=400)
+    record_link_writes(vault_root, path, target)
     append_ops_log(vault_root, "inbox.promote", {"from": path_value, "to": str(target)})
     return {"path": str(target)}
 
 
+@tracked("api.validate")
 def api_validate(
     vault_root: Path,
     *,
@@ -146,10 +421,12 @@ def api_validate(
     from .constants import DEFAULT_SCHEMA_PATH
 
     schema = load_schema(DEFAULT_SCHEMA_PATH)
-    result = validate_frontmatter_verbose(frontmatter, schema)
+    with span("validate"):
+        result = validate_frontmatter_verbose(frontmatter, schema)
     return {"valid": len(result.errors) == 0, "errors": result.errors, "warnings": result.warnings}
 
 
+@tracked("api.item_update")
 def api_item_update(
     vault_root: Path,
     *,
@@ -188,7 +465,8 @@ def api_item_update(
     from .constants import DEFAULT_SCHEMA_PATH
 
     schema = load_schema(DEFAULT_SCHEMA_PATH)
-    validation = validate_frontmatter_verbose(frontmatter, schema)
+    with span("validate"):
+        validation = validate_frontmatter_verbose(frontmatter, schema)
     validate_only = bool(payload.get("validate_only", False))
     if validation.errors:
         raise ApiError("; ".join(validation.errors), status=400)
@@ -204,6 +482,8 @@ def api_item_update(
 
     content = dump_frontmatter(frontmatter, body)
     safe_write_text(path, content)
+    bump_generation()
+    record_link_writes(vault_root, path)
     append_ops_log(vault_root, "item.update", {"file": str(path)})
     return {
         "path": str(path),
@@ -214,6 +494,7 @@ def api_item_update(
     }
 
 
+@tracked("api.daily_open")
 def api_daily_open(
     vault_root: Path,
     *,
@@ -230,9 +511,10 @@ def api_daily_open(
             raise ApiError("invalid date", status=400)
     path = open_daily_note(vault_root, target_date=target_date)
     append_ops_log(vault_root, "daily.open", {"file": str(path), "date": date_value})
-    return {"path": str(path), "item": item_view(read_item(path))}
+    return {"path": str(path), "item": written_item_view(path, vault_root)}
 
 
+@tracked("api.daily_append")
 def api_daily_append(
     vault_root: Path,
     *,
@@ -253,4 +535,4 @@ def api_daily_append(
             raise ApiError("invalid date", status=400)
     path = append_daily_note(vault_root, text, target_date=target_date)
     append_ops_log(vault_root, "daily.append", {"file": str(path), "date": date_value})
-    return {"path": str(path), "item": item_view(read_item(path))}
+    return {"path": str(path), "item": written_item_view(path, vault_root)}
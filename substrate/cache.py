@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .perf import span
+
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Directories whose entries feed cached views; see external_signature().
+_WATCHED_DIRS = ("inbox", "items", "daily")
+
+_generation_lock = threading.Lock()
+_generation = 0
+
+
+def vault_generation() -> int:
+    return _generation
+
+
+def bump_generation() -> int:
+    """Invalidate derived state after a write. Called by every write path."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+_watched: set[str] = set()
+
+
+def set_watched(vault_root: Path, watched: bool) -> None:
+    """Record whether a vault watcher is applying changes for ``vault_root``."""
+    with _generation_lock:
+        if watched:
+            _watched.add(str(vault_root))
+        else:
+            _watched.discard(str(vault_root))
+
+
+def change_token(vault_root: Path) -> tuple | None:
+    """State that moves whenever the vault's markdown may have changed.
+
+    ``None`` means no cheap token can be trusted: in-place saves (how
+    editors such as Obsidian write) change no directory mtime, so only a
+    running watcher, which bumps the generation for every modified file,
+    makes the generation plus directory signature sufficient. Callers then
+    compare per-file stat signatures, or skip caching.
+    """
+    if str(vault_root) not in _watched:
+        return None
+    return (vault_generation(), external_signature(vault_root))
+
+
+def external_signature(vault_root: Path) -> tuple[int, ...]:
+    """Cheap detector for changes made outside this process.
+
+    Atomic writes (temp file + rename), creates, deletes and moves all update
+    the parent directory's mtime, so a stat per watched directory is enough to
+    notice them without listing files. Shard directories of the sharded item
+    layout are not stat'ed: the signature is only consulted while a watcher
+    runs (see :func:`change_token`), and the watcher bumps the generation
+    for every write inside a shard.
+    """
+    signature: list[int] = []
+    for name in _WATCHED_DIRS:
+        try:
+            signature.append(os.stat(vault_root / "vault" / name).st_mtime_ns)
+        except FileNotFoundError:
+            signature.append(0)
+    return tuple(signature)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ViewCache:
+    """LRU cache of JSON view payloads bounded by encoded size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> dict[str, Any] | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return json.loads(data)
+
+    def put(self, key: tuple, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+view_cache = ViewCache()
+
+
+def configure_view_cache(max_bytes: int) -> None:
+    view_cache.max_bytes = max_bytes
+    view_cache.clear()
+
+
+def _normalize(value: Any) -> Any:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return value
+
+
+def cached_view(
+    name: str,
+    vault_root: Path,
+    params: dict[str, Any],
+    compute: Callable[[], dict[str, Any]],
+    *,
+    cacheable: Callable[[dict[str, Any]], bool] | None = None,
+) -> dict[str, Any]:
+    # The token is read before computing so a write that races with the
+    # computation leaves the stored entry unreachable rather than stale.
+    token = change_token(vault_root)
+    if token is None:
+        return compute()
+    with span("cache"):
+        key = (name, str(vault_root), tuple(sorted((k, _normalize(v)) for k, v in params.items())), token)
+        payload = view_cache.get(key)
+    if payload is not None:
+        return payload
+    payload = compute()
+    if cacheable is None or cacheable(payload):
+        view_cache.put(key, payload)
+    return payload
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import compress
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - dependency guard
+    np = None
+
+from .cache import change_token
+from .inbox import InboxItem
+from .io import parse_frontmatter, safe_read_text
+from .paging import Page
+from .query import Clause
+from .vault import iter_markdown_files
+
+# Frontmatter fields stored as codes into a per-field string table.
+CODED_FIELDS = ("status", "privacy", "type")
+TIME_FIELDS = ("created", "updated")
+SORT_FIELDS = ("updated", "created", "title")
+
+MISSING = -(2**63)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# Compact rows once this fraction of them belongs to removed files.
+_COMPACT_RATIO = 0.5
+# Memoized filtered orders, dropped on every change.
+_MAX_FILTERED = 16
+
+
+def _epoch(value: str) -> tuple[int, bool]:
+    """Microseconds since the epoch, and whether ``value`` is exactly the
+    UTC ``isoformat()`` that :func:`_render` gives back for it."""
+    if not value:
+        return MISSING, True
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return MISSING, False
+    if parsed.tzinfo is None:
+        return (parsed.replace(tzinfo=timezone.utc) - _EPOCH) // _MICROSECOND, False
+    canonical = parsed.utcoffset() == timedelta(0) and parsed.isoformat() == value
+    return (parsed - _EPOCH) // _MICROSECOND, canonical
+
+
+def _render(micros: int) -> str:
+    return "" if micros == MISSING else (_EPOCH + micros * _MICROSECOND).isoformat()
+
+
+class _Codes:
+    """String table of one low-cardinality field; code 0 is the empty string."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: list[str] = [""]
+        self._codes: dict[str, int] = {"": 0}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, predicate: Callable[[str], bool]) -> list[bool]:
+        return [predicate(value) for value in self.values]
+
+
+def _and(left: bytes, right: bytes) -> bytes:
+    # Bytewise AND of 0/1 masks through big-int arithmetic (runs in C).
+    return (int.from_bytes(left, "little") & int.from_bytes(right, "little")).to_bytes(len(left), "little")
+
+
+class Catalog:
+    """Columnar snapshot of the frontmatter fields views filter and sort on.
+
+    One row per markdown file: status/privacy/type as codes into string
+    tables (``array('B')``, widened to ``'H'`` past 256 values), created and
+    updated as int64 microseconds since the epoch (strings that would not
+    round-trip are kept aside), titles in a string table. Sort permutations
+    over live rows are built on first use and patched in place when single
+    files change; filtered orders are memoized until the next change.
+    Masks and gathers use NumPy when it is installed. The API servers start
+    the vault watcher whenever the catalog is enabled, so queries answer
+    from memory; used without a watcher, every query compares each file's
+    mtime and size against its row.
+    """
+
+    def __init__(self, vault_root: Path) -> None:
+        self.vault_root = vault_root
+        self._inbox_dir = str(vault_root / "vault" / "inbox")
+        self._paths: list[str | None] = []
+        self._rows: dict[str, int] = {}
+        self._mtimes = array("q")
+        self._sizes = array("q")
+        self._live = array("B")
+        self._inbox = array("B")
+        self._tables = {field: _Codes() for field in CODED_FIELDS}
+        self._codes = {field: array("B") for field in CODED_FIELDS}
+        self._times = {field: array("q") for field in TIME_FIELDS}
+        self._raw_times: dict[str, dict[int, str]] = {field: {} for field in TIME_FIELDS}
+        self._titles: list[str] = []
+        self._orders: dict[str, array] = {}
+        self._filtered: dict[tuple, Sequence[int]] = {}
+        self._state: tuple | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def refresh(self, *, force: bool = False) -> bool:
+        state = change_token(self.vault_root)
+        with self._lock:
+            if not force and state is not None and state == self._state:
+                return False
+            seen: set[str] = set()
+            for path in iter_markdown_files(self.vault_root):
+                key = str(path)
+                seen.add(key)
+                row = self._rows.get(key)
+                if row is not None:
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    if self._mtimes[row] == stat.st_mtime_ns and self._sizes[row] == stat.st_size:
+                        continue
+                self.update(path)
+            for key in [key for key in self._rows if key not in seen]:
+                self.remove(Path(key))
+            self._state = state
+            return True
+
+    def mark_current(self) -> None:
+        """Record that change events up to now were applied, so the next
+        query does not re-walk the vault."""
+        with self._lock:
+            self._state = change_token(self.vault_root)
+
+    def update(self, path: Path) -> None:
+        """Re-read one file's frontmatter (or drop it if it no longer parses)."""
+        key = str(path)
+        try:
+            stat = path.stat()
+            fm = parse_frontmatter(safe_read_text(path)).frontmatter
+        except Exception:
+            self.remove(path)
+            return
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._paths)
+                self._rows[key] = row
+                self._paths.append(key)
+                for column in (self._mtimes, self._sizes, *self._times.values()):
+                    column.append(0)
+                for column in (self._live, self._inbox, *self._codes.values()):
+                    column.append(0)
+                self._titles.append("")
+                self._live[row] = 1
+                self._inbox[row] = 1 if str(path.parent) == self._inbox_dir else 0
+            else:
+                for order in self._orders.values():
+                    order.remove(row)
+            self._mtimes[row] = stat.st_mtime_ns
+            self._sizes[row] = stat.st_size
+            for field in CODED_FIELDS:
+                self._set_code(field, row, str(fm.get(field, "")))
+            for field in TIME_FIELDS:
+                value = str(fm.get(field, ""))
+                micros, canonical = _epoch(value)
+                self._times[field][row] = micros
+                if canonical:
+                    self._raw_times[field].pop(row, None)
+                else:
+                    self._raw_times[field][row] = value
+            self._titles[row] = str(fm.get("title", ""))
+            for field, order in self._orders.items():
+                bisect.insort(order, row, key=self._order_key(field))
+            self._filtered.clear()
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            row = self._rows.pop(str(path), None)
+            if row is None:
+                return
+            for order in self._orders.values():
+                order.remove(row)
+            self._paths[row] = None
+            self._live[row] = 0
+            for raw in self._raw_times.values():
+                raw.pop(row, None)
+            self._filtered.clear()
+            if len(self._paths) - len(self._rows) > len(self._paths) * _COMPACT_RATIO:
+                self._compact()
+
+    def _set_code(self, field: str, row: int, value: str) -> None:
+        code = self._tables[field].code(value)
+        column = self._codes[field]
+        if code > 255 and column.typecode == "B":
+            column = self._codes[field] = array("H", column)
+        column[row] = code
+
+    def _compact(self) -> None:
+        keep = [row for row, key in enumerate(self._paths) if key is not None]
+        self._paths = [self._paths[row] for row in keep]
+        self._rows = {key: row for row, key in enumerate(self._paths) if key is not None}
+        self._mtimes = array("q", (self._mtimes[row] for row in keep))
+        self._sizes = array("q", (self._sizes[row] for row in keep))
+        self._live = array("B", bytes([1]) * len(keep))
+        self._inbox = array("B", (self._inbox[row] for row in keep))
+        for field in CODED_FIELDS:
+            column = self._codes[field]
+            self._codes[field] = array(column.typecode, (column[row] for row in keep))
+        remap = {old: new for new, old in enumerate(keep)}
+        for field in TIME_FIELDS:
+            column = self._times[field]
+            self._times[field] = array("q", (column[row] for row in keep))
+            self._raw_times[field] = {remap[row]: value for row, value in self._raw_times[field].items()}
+        self._titles = [self._titles[row] for row in keep]
+        self._orders.clear()
+        self._filtered.clear()
+
+    def _time_text(self, field: str, row: int) -> str:
+        raw = self._raw_times[field].get(row)
+        return raw if raw is not None else _render(self._times[field][row])
+
+    def _view_key(self, field: str) -> Callable[[int], tuple]:
+        """The ``(value, path)`` key ``inbox_view`` sorts and encodes cursors with."""
+        paths = self._paths
+        if field == "title":
+            titles = self._titles
+            return lambda row: (titles[row].casefold(), paths[row])
+        return lambda row: (self._time_text(field, row), paths[row])
+
+    def _order_key(self, field: str) -> Callable[[int], tuple]:
+        # Canonical timestamps order the same as integers as they do as
+        # strings, so integers suffice unless some value did not round-trip.
+        if field in TIME_FIELDS and not self._raw_times[field]:
+            paths, times = self._paths, self._times[field]
+            return lambda row: (times[row], paths[row])
+        return self._view_key(field)
+
+    def _order(self, field: str) -> array:
+        order = self._orders.get(field)
+        if order is None:
+            live = [row for row, key in enumerate(self._paths) if key is not None]
+            order = self._orders[field] = array("I", sorted(live, key=self._order_key(field)))
+        return order
+
+    def _mask(self, predicates: dict[str, Callable[[str], bool]], inbox_only: bool) -> Any:
+        if np is not None:
+            mask = np.frombuffer(self._live, dtype=np.uint8).astype(bool)
+            if inbox_only:
+                mask &= np.frombuffer(self._inbox, dtype=np.uint8).astype(bool)
+            for field, predicate in predicates.items():
+                column = self._codes[field]
+                lookup = np.array(self._tables[field].lookup(predicate), dtype=bool)
+                mask &= lookup[np.frombuffer(column, dtype=np.uint8 if column.typecode == "B" else np.uint16)]
+            return mask
+        mask = self._live.tobytes()
+        if inbox_only:
+            mask = _and(mask, self._inbox.tobytes())
+        for field, predicate in predicates.items():
+            column = self._codes[field]
+            lookup = self._tables[field].lookup(predicate)
+            if column.typecode == "B":
+                table = bytes(lookup) + bytes(256 - len(lookup))
+                mask = _and(mask, column.tobytes().translate(table))
+            else:
+                mask = _and(mask, bytes(lookup[code] for code in column))
+        return mask
+
+    def _select(self, field: str, predicates: dict[str, Callable[[str], bool]], inbox_only: bool, key: tuple):
+        """Rows passing ``predicates`` in ascending ``field`` order."""
+        memo = (field, inbox_only, key)
+        rows = self._filtered.get(memo)
+        if rows is None:
+            order = self._order(field)
+            mask = self._mask(predicates, inbox_only)
+            if np is not None:
+                ordered = np.frombuffer(order, dtype=np.uint32)
+                rows = ordered[mask[ordered]].tolist()
+            else:
+                rows = list(compress(order, map(mask.__getitem__, order)))
+            if len(self._filtered) >= _MAX_FILTERED:
+                del self._filtered[next(iter(self._filtered))]
+            self._filtered[memo] = rows
+        return rows
+
+    def inbox_page(
+        self,
+        *,
+        field: str,
+        reverse: bool,
+        status: list[str] | None = None,
+        privacy: list[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        after: tuple | None = None,
+    ) -> Page[InboxItem]:
+        """The same page ``inbox_view`` selects from ``list_inbox``."""
+        if field not in SORT_FIELDS:
+            raise ValueError(f"unsupported sort field: {field}")
+        self.refresh()
+        predicates: dict[str, Callable[[str], bool]] = {}
+        if status:
+            predicates["status"] = set(status).__contains__
+        if privacy:
+            predicates["privacy"] = set(privacy).__contains__
+        with self._lock:
+            rows = self._select(field, predicates, True, (tuple(status or ()), tuple(privacy or ())))
+            key = self._view_key(field)
+            total = len(rows)
+            try:
+                if reverse:
+                    end = bisect.bisect_left(rows, after, key=key) if after is not None else total
+                    remaining = end
+                    start = max(end - max(offset, 0), 0)
+                    stop = max(start - limit, 0) if limit is not None else 0
+                    window = rows[stop:start][::-1]
+                else:
+                    begin = bisect.bisect_right(rows, after, key=key) if after is not None else 0
+                    remaining = total - begin
+                    start = begin + max(offset, 0)
+                    window = rows[start : start + limit] if limit is not None else rows[start:]
+            except TypeError as exc:
+                raise ValueError("invalid cursor") from exc
+            next_key = key(window[-1]) if window and remaining > offset + len(window) else None
+            return Page(total=total, items=[self._inbox_item(row) for row in window], next_key=next_key)
+
+    def _inbox_item(self, row: int) -> InboxItem:
+        return InboxItem(
+            path=Path(self._paths[row] or ""),
+            title=self._titles[row],
+            status=self._tables["status"].values[self._codes["status"][row]],
+            created=self._time_text("created", row),
+            updated=self._time_text("updated", row),
+            privacy=self._tables["privacy"].values[self._codes["privacy"][row]],
+        )
+
+    def paths_matching(self, clauses: Iterable[Clause]) -> list[Path]:
+        """Files whose status/privacy/type satisfy every clause, in path order."""
+        grouped: dict[str, list[Clause]] = {}
+        for clause in clauses:
+            if clause.field not in CODED_FIELDS:
+                raise ValueError(f"catalog cannot evaluate field: {clause.field}")
+            grouped.setdefault(clause.field, []).append(clause)
+        predicates = {
+            field: (lambda value, group=group: all(c.matches_value(value) != c.negated for c in group))
+            for field, group in grouped.items()
+        }
+        self.refresh()
+        with self._lock:
+            mask = self._mask(predicates, False)
+            paths = self._paths
+            if np is not None:
+                selected = [paths[row] for row in np.flatnonzero(mask).tolist()]
+            else:
+                selected = list(compress(paths, mask))
+        return [Path(key) for key in sorted(selected) if key is not None]
+
+
+_catalogs: dict[str, Catalog] = {}
+_registry_lock = threading.Lock()
+
+
+def enable_catalog(vault_root: Path) -> Catalog:
+    key = str(vault_root)
+    with _registry_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = Catalog(vault_root)
+    catalog.refresh()
+    return catalog
+
+
+def active_catalog(vault_root: Path) -> Catalog | None:
+    return _catalogs.get(str(vault_root))
+
+
+def disable_catalog(vault_root: Path) -> None:
+    with _registry_lock:
+        _catalogs.pop(str(vault_root), None)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+
+CHUNK_MAX_CHARS = 800
+CHUNK_OVERLAP = 160
+
+# Preferred cut points, best first; a window is cut at the last one found in
+# its second half so passages end on paragraph or sentence boundaries.
+_BREAKS = ("\n\n", "\n", ". ", " ")
+
+# Line endings as io.normalize_text() folds them to "\n".
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A passage of a vault file with citation offsets into that file.
+
+    Byte offsets are half-open into the UTF-8 file; lines are 1-based and
+    inclusive. ``id`` is ``<doc id>#<content hash>`` (plus an occurrence
+    suffix for repeated text), so it survives appends and edits further down.
+    """
+
+    id: str
+    doc_id: str
+    text: str
+    byte_start: int
+    byte_end: int
+    line_start: int
+    line_end: int
+
+    def citation(self) -> dict[str, int]:
+        return {
+            "byte_start": self.byte_start,
+            "byte_end": self.byte_end,
+            "line_start": self.line_start,
+            "line_end": self.line_end,
+        }
+
+
+class _Offsets:
+    """Character position in normalized ``text`` -> (byte offset, line number)
+    in the file, whose line endings (``raw``) may be CRLF or CR."""
+
+    def __init__(self, text: str, raw: str | None = None) -> None:
+        self.text = text
+        if raw == text:
+            raw = None
+        self.ascii = text.isascii() and raw is None
+        self.line_starts = [0]
+        self.line_bytes = [0]
+        endings = [len(match.group(0)) for match in _NEWLINE_RE.finditer(raw)] if raw is not None else None
+        for number, line in enumerate(text.split("\n")[:-1]):
+            self.line_starts.append(self.line_starts[-1] + len(line) + 1)
+            if not self.ascii:
+                ending = endings[number] if endings is not None else 1
+                self.line_bytes.append(self.line_bytes[-1] + len(line.encode("utf-8")) + ending)
+
+    def line(self, pos: int) -> int:
+        return bisect_right(self.line_starts, pos)
+
+    def byte(self, pos: int) -> int:
+        if self.ascii:
+            return pos
+        line = self.line(pos) - 1
+        start = self.line_starts[line]
+        return self.line_bytes[line] + len(self.text[start:pos].encode("utf-8"))
+
+
+def _cut(text: str, start: int, end: int, limit: int) -> int:
+    if end >= limit:
+        return limit
+    floor = start + (end - start) // 2
+    for sep in _BREAKS:
+        idx = text.rfind(sep, floor, end)
+        if idx != -1:
+            return idx + len(sep)
+    return end
+
+
+def _resume(text: str, start: int, end: int) -> int:
+    """First break at or after ``start`` so the overlap begins cleanly."""
+    for sep in _BREAKS:
+        idx = text.find(sep, start, end)
+        if idx != -1:
+            return idx + len(sep)
+    return start
+
+
+def _windows(text: str, start: int, end: int, max_chars: int, overlap: int) -> list[tuple[int, int]]:
+    """Overlapping ``(start, end)`` windows over ``text[start:end]``."""
+    windows: list[tuple[int, int]] = []
+    pos = start
+    while pos < end:
+        while pos < end and text[pos].isspace():
+            pos += 1
+        if pos >= end:
+            break
+        stop = _cut(text, pos, min(end, pos + max_chars), end)
+        trimmed = stop
+        while trimmed > pos and text[trimmed - 1].isspace():
+            trimmed -= 1
+        windows.append((pos, trimmed))
+        if stop >= end:
+            break
+        pos = _resume(text, max(stop - overlap, pos + 1), trimmed)
+    return windows
+
+
+def _entry_spans(text: str, start: int, end: int) -> list[tuple[int, int]]:
+    """Daily notes: one span per non-empty line (one appended entry each)."""
+    spans: list[tuple[int, int]] = []
+    pos = start
+    while pos < end:
+        stop = text.find("\n", pos, end)
+        stop = end if stop == -1 else stop
+        if text[pos:stop].strip():
+            spans.append((pos, stop))
+        pos = stop + 1
+    return spans
+
+
+def chunk_text(
+    text: str,
+    body_start: int,
+    doc_id: str,
+    *,
+    raw: str | None = None,
+    daily: bool = False,
+    max_chars: int = CHUNK_MAX_CHARS,
+    overlap: int = CHUNK_OVERLAP,
+) -> list[Chunk]:
+    """Split ``text[body_start:]`` (a whole file, line endings normalized)
+    into passages. Pass the file's ``raw`` text when it may contain CRLF so
+    byte offsets cite the file as stored."""
+    offsets = _Offsets(text, raw)
+    spans = _entry_spans(text, body_start, len(text)) if daily else [(body_start, len(text))]
+    chunks: list[Chunk] = []
+    seen: dict[str, int] = {}
+    for span_start, span_end in spans:
+        for start, end in _windows(text, span_start, span_end, max_chars, overlap):
+            passage = text[start:end]
+            digest = hashlib.sha1(passage.encode("utf-8")).hexdigest()[:16]
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            chunk_id = f"{doc_id}#{digest}" + (f"-{occurrence}" if occurrence else "")
+            chunks.append(
+                Chunk(
+                    id=chunk_id,
+                    doc_id=doc_id,
+                    text=passage,
+                    byte_start=offsets.byte(start),
+                    byte_end=offsets.byte(end),
+                    line_start=offsets.line(start),
+                    line_end=offsets.line(max(start, end - 1)),
+                )
+            )
+    return chunks
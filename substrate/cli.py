@@ -2,22 +2,45 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
 from .constants import DEFAULT_SCHEMA_PATH
 from .config import rotate_api_token
+from .dedupe import DEFAULT_THRESHOLD, DedupeIndex
+from .hybrid import hybrid_search
 from .inbox import list_inbox
 from .io import dump_frontmatter, parse_frontmatter, safe_read_text, safe_write_text
-from .items import append_daily_note, create_inbox_note, open_daily_note, promote_inbox_item, read_item, update_frontmatter
+from .items import (
+    MIGRATE_BATCH_SIZE,
+    append_daily_note,
+    create_inbox_note,
+    migrate_items,
+    open_daily_note,
+    promote_inbox_item,
+    read_item,
+    update_frontmatter,
+)
+from .layout import ITEM_LAYOUTS
+from .jobs import create_import_job, list_jobs, open_job
+from .memory import SITE_GROUPS, diff_sites, load_snapshot, top_sites, traced_bytes
 from .ops_log import append_ops_log, filter_ops_log, filter_ops_since, find_vault_root, tail_ops_log
+from .passages import build_passage_vectors
+from .profiling import PROFILE_MODES, profile_call, profiles_dir
 from .quarantine import list_quarantine, quarantine_file, restore_quarantined
+from .query import parse_query
+from .raw_archive import ingest_files
 from .repair import repair_file, repair_tree
 from .schema import SchemaError, load_schema, validate_frontmatter
-from .search import search_items
+from .search import SearchStats, search_items
+from .semantic import build_document_vectors, semantic_search
+from .slow_log import slow_op, summarize_slow_log
 from .ulid import new_ulid
 from .vault import init_vault
-from .views import inbox_view, load_item_view, search_view
+from .watcher import WATCH_BACKENDS, Watcher
+from .views import graph_neighbors_view, inbox_view, load_item_view, retrieve_view, search_view
 
 
 def _parse_csv(value: str | None) -> list[str] | None:
@@ -101,8 +124,8 @@ def cmd_write(args: argparse.Namespace) -> int:
 def cmd_quarantine(args: argparse.Namespace) -> int:
     vault_root = Path(args.vault)
     entry = quarantine_file(vault_root, Path(args.file), args.reason)
-    append_ops_log(vault_root, "quarantine.add", entry.__dict__)
-    print(json.dumps(entry.__dict__, indent=2))
+    append_ops_log(vault_root, "quarantine.add", entry.to_dict())
+    print(json.dumps(entry.to_dict(), indent=2))
     return 0
 
 
@@ -110,7 +133,7 @@ def cmd_quarantine_list(args: argparse.Namespace) -> int:
     vault_root = Path(args.vault)
     entries = list_quarantine(vault_root)
     append_ops_log(vault_root, "quarantine.list", {"count": len(entries)})
-    print(json.dumps([e.__dict__ for e in entries], indent=2))
+    print(json.dumps([e.to_dict() for e in entries], indent=2))
     return 0
 
 
@@ -140,7 +163,7 @@ def cmd_repair(args: argparse.Namespace) -> int:
             "file": str(result.path),
             "action": result.action,
             "errors": result.errors,
-            "quarantined": result.quarantined.__dict__ if result.quarantined else None,
+            "quarantined": result.quarantined.to_dict() if result.quarantined else None,
             "dry_run": args.dry_run,
         },
     )
@@ -150,7 +173,7 @@ def cmd_repair(args: argparse.Namespace) -> int:
                 "file": str(result.path),
                 "action": result.action,
                 "errors": result.errors,
-                "quarantined": result.quarantined.__dict__ if result.quarantined else None,
+                "quarantined": result.quarantined.to_dict() if result.quarantined else None,
             },
             indent=2,
         )
@@ -186,7 +209,7 @@ def cmd_repair_tree(args: argparse.Namespace) -> int:
                     "file": str(result.path),
                     "action": result.action,
                     "errors": result.errors,
-                    "quarantined": result.quarantined.__dict__ if result.quarantined else None,
+                    "quarantined": result.quarantined.to_dict() if result.quarantined else None,
                 }
                 for result in results
             ],
@@ -198,19 +221,19 @@ def cmd_repair_tree(args: argparse.Namespace) -> int:
 
 def cmd_ops_tail(args: argparse.Namespace) -> int:
     entries = tail_ops_log(Path(args.vault), args.limit)
-    print(json.dumps([e.__dict__ for e in entries], indent=2))
+    print(json.dumps([e.to_dict() for e in entries], indent=2))
     return 0
 
 
 def cmd_ops_filter(args: argparse.Namespace) -> int:
     entries = filter_ops_log(Path(args.vault), args.op)
-    print(json.dumps([e.__dict__ for e in entries], indent=2))
+    print(json.dumps([e.to_dict() for e in entries], indent=2))
     return 0
 
 
 def cmd_ops_since(args: argparse.Namespace) -> int:
     entries = filter_ops_since(Path(args.vault), args.since)
-    print(json.dumps([e.__dict__ for e in entries], indent=2))
+    print(json.dumps([e.to_dict() for e in entries], indent=2))
     return 0
 
 
@@ -311,6 +334,27 @@ def cmd_promote(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_items_migrate(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+
+    def _log_batch(batch: int, moved: int) -> None:
+        append_ops_log(vault_root, "items.migrate", {"layout": args.layout, "batch": batch, "moved": moved})
+
+    try:
+        result = migrate_items(
+            vault_root,
+            args.layout,
+            shard_chars=args.shard_chars,
+            batch_size=args.batch_size,
+            on_batch=_log_batch,
+        )
+    except (ValueError, RuntimeError) as exc:
+        print(str(exc))
+        return 1
+    print(json.dumps(asdict(result), indent=2))
+    return 1 if result.conflicts else 0
+
+
 def cmd_inbox_list(args: argparse.Namespace) -> int:
     items = list_inbox(Path(args.vault))
     print(
@@ -340,6 +384,7 @@ def cmd_inbox_view(args: argparse.Namespace) -> int:
             sort=args.sort,
             status=_parse_csv(args.status),
             privacy=_parse_csv(args.privacy),
+            cursor=args.cursor,
         )
     except ValueError as exc:
         print(str(exc))
@@ -349,30 +394,226 @@ def cmd_inbox_view(args: argparse.Namespace) -> int:
 
 
 def cmd_search(args: argparse.Namespace) -> int:
-    results = search_items(
-        Path(args.vault),
-        args.query,
-        status=_parse_csv(args.status),
-        privacy=_parse_csv(args.privacy),
+    stats = SearchStats()
+    if args.mode == "semantic":
+        try:
+            results = semantic_search(
+                Path(args.vault),
+                args.query,
+                status=_parse_csv(args.status),
+                privacy=_parse_csv(args.privacy),
+                stats=stats,
+            )
+        except (RuntimeError, ValueError) as exc:
+            print(str(exc))
+            return 1
+    elif args.mode == "hybrid":
+        try:
+            results = hybrid_search(
+                Path(args.vault),
+                args.query,
+                status=_parse_csv(args.status),
+                privacy=_parse_csv(args.privacy),
+                time_budget=args.budget_ms / 1000 if args.budget_ms else None,
+                stats=stats,
+            )
+        except (RuntimeError, ValueError) as exc:
+            print(str(exc))
+            return 1
+    else:
+        results = search_items(
+            Path(args.vault),
+            args.query,
+            status=_parse_csv(args.status),
+            privacy=_parse_csv(args.privacy),
+            time_budget=args.budget_ms / 1000 if args.budget_ms else None,
+            stats=stats,
+        )
+    if stats.partial:
+        print(f"partial results: scanned {stats.scanned} documents", file=sys.stderr)
+    payload = [result.to_dict() for result in results]
+    if args.explain:
+        plan = {
+            "query": parse_query(args.query).to_dict() if args.mode != "semantic" else {"text": args.query},
+            "stages": [stage.to_dict() for stage in stats.plan],
+        }
+        print(json.dumps({"results": payload, "plan": plan}, indent=2))
+        return 0
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def cmd_retrieve(args: argparse.Namespace) -> int:
+    try:
+        payload = retrieve_view(
+            Path(args.vault),
+            args.query,
+            k=args.k,
+            mode=args.mode,
+            status=_parse_csv(args.status),
+            privacy=_parse_csv(args.privacy),
+        )
+    except (RuntimeError, ValueError) as exc:
+        print(str(exc))
+        return 1
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def cmd_graph_neighbors(args: argparse.Namespace) -> int:
+    try:
+        payload = graph_neighbors_view(Path(args.vault), args.id, depth=args.depth, direction=args.direction)
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def cmd_dedupe_scan(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+    index = DedupeIndex(vault_root, threshold=args.threshold)
+    count = 0
+    lines = []
+    for group in index.groups(min_size=args.min_size):
+        line = json.dumps(group.to_dict(), ensure_ascii=True)
+        lines.append(line)
+        print(line, flush=True)
+        count += 1
+    safe_write_text(index.directory / "groups.jsonl", "".join(line + "\n" for line in lines))
+    append_ops_log(vault_root, "dedupe.scan", {"groups": count, "threshold": args.threshold})
+    return 0
+
+
+def cmd_ingest(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+
+    def _print_record(record) -> None:
+        print(json.dumps(asdict(record)), flush=True)
+
+    report = ingest_files(
+        vault_root,
+        [Path(source) for source in args.sources],
+        workers=args.workers,
+        on_record=_print_record if args.verbose else None,
     )
+    summary = report.to_dict()
+    append_ops_log(vault_root, "raw.ingest", {key: value for key, value in summary.items() if key != "errors"})
+    print(json.dumps(summary, indent=2))
+    return 1 if report.errors else 0
+
+
+def _print_job_progress(progress: dict) -> None:
+    stages = " ".join(f"{name}={stage['done'] + stage['skipped']}(q{stage['queue']})" for name, stage in progress["stages"].items())
     print(
-        json.dumps(
-            [
-                {
-                    "path": str(result.path),
-                    "title": result.title,
-                    "type": result.type,
-                    "status": result.status,
-                    "privacy": result.privacy,
-                    "updated": result.updated,
-                    "snippet": result.snippet,
-                    "score": result.score,
-                }
-                for result in results
-            ],
-            indent=2,
-        )
+        f"[{progress['state']}] {stages} {progress['items_per_s']} items/s {progress['bytes_per_s']} B/s",
+        file=sys.stderr,
+        flush=True,
     )
+
+
+def _run_job(vault_root: Path, job, args: argparse.Namespace) -> int:
+    progress = job.run(workers=args.workers, on_progress=None if args.quiet else _print_job_progress)
+    append_ops_log(
+        vault_root,
+        "job.run",
+        {"id": job.id, "state": progress["state"], "completed": progress["completed"], "errors": progress["errors"]},
+    )
+    print(json.dumps(progress, indent=2))
+    return 1 if progress["errors"] else 0
+
+
+def cmd_jobs_import(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+    try:
+        job = create_import_job(vault_root, [Path(source) for source in args.sources], job_id=args.job_id)
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+    return _run_job(vault_root, job, args)
+
+
+def cmd_jobs_resume(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+    try:
+        job = open_job(vault_root, args.id)
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+    return _run_job(vault_root, job, args)
+
+
+def cmd_jobs_status(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+    if args.id:
+        try:
+            print(json.dumps(open_job(vault_root, args.id).progress(), indent=2))
+        except ValueError as exc:
+            print(str(exc))
+            return 1
+        return 0
+    print(json.dumps(list_jobs(vault_root), indent=2))
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault).resolve()
+    try:
+        watcher = Watcher(vault_root, backend=args.backend, interval=args.interval)
+    except (OSError, ValueError) as exc:
+        print(str(exc))
+        return 1
+
+    def _print_batch(generation: int, events) -> None:
+        print(json.dumps({"generation": generation, "events": [event.to_dict() for event in events]}), flush=True)
+
+    print(json.dumps({"watching": str(vault_root), "backend": watcher.backend}), flush=True)
+    try:
+        watcher.run(on_batch=_print_batch)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_vectors_build(args: argparse.Namespace) -> int:
+    vault_root = Path(args.vault)
+    try:
+        options = {"nlist": args.nlist, "batch_size": args.batch_size, "workers": args.workers}
+        report = {
+            "documents": asdict(build_document_vectors(vault_root, **options)),
+            "passages": asdict(build_passage_vectors(vault_root, **options)),
+        }
+    except RuntimeError as exc:
+        print(str(exc))
+        return 1
+    append_ops_log(vault_root, "vectors.build", report)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def cmd_perf_slow(args: argparse.Namespace) -> int:
+    try:
+        summary = summarize_slow_log(Path(args.vault), since=args.since, op=args.op, top=args.top)
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def cmd_perf_memory(args: argparse.Namespace) -> int:
+    try:
+        snapshot = load_snapshot(Path(args.snapshot))
+        against = load_snapshot(Path(args.against)) if args.against else None
+    except (OSError, EOFError, ValueError) as exc:
+        print(f"cannot load snapshot: {exc}")
+        return 1
+    payload = {"snapshot": args.snapshot, "traced_bytes": traced_bytes(snapshot)}
+    payload["top"] = top_sites(snapshot, limit=args.top, group=args.group)
+    if against is not None:
+        payload["against"] = args.against
+        payload["diff"] = diff_sites(against, snapshot, limit=args.top, group=args.group)
+    print(json.dumps(payload, indent=2))
     return 0
 
 
@@ -509,15 +750,120 @@ def build_parser() -> argparse.ArgumentParser:
     p_inbox_view.add_argument("--sort", default="updated_desc")
     p_inbox_view.add_argument("--status", help="Comma-separated status filter")
     p_inbox_view.add_argument("--privacy", help="Comma-separated privacy filter")
+    p_inbox_view.add_argument("--cursor", help="Opaque next_cursor from a previous page")
     p_inbox_view.set_defaults(func=cmd_inbox_view)
 
-    p_search = sub.add_parser("search", help="Search vault (basic scan)")
+    p_search = sub.add_parser("search", help="Search vault (fielded query language)")
     p_search.add_argument("vault")
     p_search.add_argument("query")
     p_search.add_argument("--status", help="Comma-separated status filter")
     p_search.add_argument("--privacy", help="Comma-separated privacy filter")
+    p_search.add_argument("--budget-ms", type=int, help="Stop scanning after this many milliseconds")
+    p_search.add_argument("--explain", action="store_true", help="Include the query plan and stage timings")
+    p_search.add_argument("--mode", choices=["lexical", "semantic", "hybrid"], default="lexical")
     p_search.set_defaults(func=cmd_search)
 
+    p_retrieve = sub.add_parser("retrieve", help="Top-k passages with citation spans")
+    p_retrieve.add_argument("vault")
+    p_retrieve.add_argument("query")
+    p_retrieve.add_argument("-k", type=int, default=10)
+    p_retrieve.add_argument("--mode", choices=["lexical", "semantic", "hybrid"], default="lexical")
+    p_retrieve.add_argument("--status", help="Comma-separated status filter")
+    p_retrieve.add_argument("--privacy", help="Comma-separated privacy filter")
+    p_retrieve.set_defaults(func=cmd_retrieve)
+
+    p_graph = sub.add_parser("graph", help="Query the link graph")
+    graph_sub = p_graph.add_subparsers(dest="graph_cmd", required=True)
+
+    p_graph_neighbors = graph_sub.add_parser("neighbors", help="Items linked to or from an item")
+    p_graph_neighbors.add_argument("vault")
+    p_graph_neighbors.add_argument("id")
+    p_graph_neighbors.add_argument("--depth", type=int, default=1)
+    p_graph_neighbors.add_argument("--direction", choices=["out", "in", "both"], default="both")
+    p_graph_neighbors.set_defaults(func=cmd_graph_neighbors)
+
+    p_dedupe = sub.add_parser("dedupe", help="Near-duplicate detection")
+    dedupe_sub = p_dedupe.add_subparsers(dest="dedupe_cmd", required=True)
+
+    p_dedupe_scan = dedupe_sub.add_parser("scan", help="Stream near-duplicate groups as JSONL")
+    p_dedupe_scan.add_argument("vault")
+    p_dedupe_scan.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum estimated Jaccard")
+    p_dedupe_scan.add_argument("--min-size", type=int, default=2)
+    p_dedupe_scan.set_defaults(func=cmd_dedupe_scan)
+
+    p_ingest = sub.add_parser("ingest", help="Copy files into the content-addressed raw archive")
+    p_ingest.add_argument("vault")
+    p_ingest.add_argument("sources", nargs="+", help="Files or directories to import")
+    p_ingest.add_argument("--workers", type=int, help="Hashing processes (default: CPU count)")
+    p_ingest.add_argument("--verbose", action="store_true", help="Print one JSON line per file")
+    p_ingest.set_defaults(func=cmd_ingest)
+
+    p_items = sub.add_parser("items", help="Manage the canonical items directory")
+    items_sub = p_items.add_subparsers(dest="items_cmd", required=True)
+
+    p_items_migrate = items_sub.add_parser("migrate", help="Move items to another directory layout, in batches")
+    p_items_migrate.add_argument("vault")
+    p_items_migrate.add_argument("--layout", choices=ITEM_LAYOUTS, required=True)
+    p_items_migrate.add_argument("--shard-chars", type=int, help="ULID prefix length per shard (sharded layout)")
+    p_items_migrate.add_argument("--batch-size", type=int, default=MIGRATE_BATCH_SIZE)
+    p_items_migrate.set_defaults(func=cmd_items_migrate)
+
+    p_jobs = sub.add_parser("jobs", help="Resumable import jobs")
+    jobs_sub = p_jobs.add_subparsers(dest="jobs_cmd", required=True)
+
+    p_jobs_import = jobs_sub.add_parser("import", help="Import files through the staged pipeline")
+    p_jobs_import.add_argument("vault")
+    p_jobs_import.add_argument("sources", nargs="+", help="Files or directories to import")
+    p_jobs_import.add_argument("--job-id", help="Job id (default: new ULID)")
+    p_jobs_import.add_argument("--workers", type=int, help="Workers for the hash and extract stages")
+    p_jobs_import.add_argument("--quiet", action="store_true", help="Do not print progress to stderr")
+    p_jobs_import.set_defaults(func=cmd_jobs_import)
+
+    p_jobs_resume = jobs_sub.add_parser("resume", help="Resume an interrupted job from its checkpoints")
+    p_jobs_resume.add_argument("vault")
+    p_jobs_resume.add_argument("id")
+    p_jobs_resume.add_argument("--workers", type=int, help="Workers for the hash and extract stages")
+    p_jobs_resume.add_argument("--quiet", action="store_true", help="Do not print progress to stderr")
+    p_jobs_resume.set_defaults(func=cmd_jobs_resume)
+
+    p_jobs_status = jobs_sub.add_parser("status", help="Show job progress")
+    p_jobs_status.add_argument("vault")
+    p_jobs_status.add_argument("id", nargs="?")
+    p_jobs_status.set_defaults(func=cmd_jobs_status)
+
+    p_watch = sub.add_parser("watch", help="Watch the vault and print coalesced change batches")
+    p_watch.add_argument("vault")
+    p_watch.add_argument("--backend", choices=WATCH_BACKENDS, default="auto")
+    p_watch.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    p_watch.set_defaults(func=cmd_watch)
+
+    p_vectors = sub.add_parser("vectors", help="Manage the semantic vector index")
+    vectors_sub = p_vectors.add_subparsers(dest="vectors_cmd", required=True)
+
+    p_vectors_build = vectors_sub.add_parser("build", help="Embed documents and passages and rebuild both indexes")
+    p_vectors_build.add_argument("vault")
+    p_vectors_build.add_argument("--nlist", type=int, help="Number of IVF lists (default: sqrt of document count)")
+    p_vectors_build.add_argument("--batch-size", type=int, default=64, help="Texts per embedding batch")
+    p_vectors_build.add_argument("--workers", type=int, default=4, help="Embedding worker threads (no speedup for the pure-Python hashing embedder)")
+    p_vectors_build.set_defaults(func=cmd_vectors_build)
+
+    p_perf = sub.add_parser("perf", help="Performance logs")
+    perf_sub = p_perf.add_subparsers(dest="perf_cmd", required=True)
+
+    p_perf_slow = perf_sub.add_parser("slow", help="Summarize operations recorded in slow.jsonl")
+    p_perf_slow.add_argument("vault")
+    p_perf_slow.add_argument("--since", help="Only records at or after this ISO 8601 time (UTC if no offset)")
+    p_perf_slow.add_argument("--op", help="Only operations whose name starts with this prefix")
+    p_perf_slow.add_argument("--top", type=int, default=10, help="Number of slowest records to include")
+    p_perf_slow.set_defaults(func=cmd_perf_slow)
+
+    p_perf_memory = perf_sub.add_parser("memory", help="Top allocation sites of a .tracemalloc snapshot")
+    p_perf_memory.add_argument("snapshot")
+    p_perf_memory.add_argument("--against", help="Older snapshot to diff against")
+    p_perf_memory.add_argument("--top", type=int, default=20)
+    p_perf_memory.add_argument("--group", choices=SITE_GROUPS, default="module")
+    p_perf_memory.set_defaults(func=cmd_perf_memory)
+
     p_token = sub.add_parser("api-token", help="Manage API token")
     token_sub = p_token.add_subparsers(dest="token_cmd", required=True)
 
@@ -531,13 +877,57 @@ def build_parser() -> argparse.ArgumentParser:
     p_promote.add_argument("--status", default="canonical")
     p_promote.set_defaults(func=cmd_promote)
 
+    _add_profile_flags(parser)
     return parser
 
 
+def _add_profile_flags(parser: argparse.ArgumentParser) -> None:
+    """Give every leaf subcommand ``--profile`` / ``--profile-mode``."""
+    actions = [action for action in parser._actions if isinstance(action, argparse._SubParsersAction)]
+    if not actions:
+        parser.add_argument("--profile", action="store_true", help="Profile this command into _system/logs/profiles/")
+        parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="cprofile")
+        return
+    for action in actions:
+        for child in {id(child): child for child in action.choices.values()}.values():
+            _add_profile_flags(child)
+
+
+def _command_vault(args: argparse.Namespace) -> Path | None:
+    for name in ("vault", "root", "file", "path"):
+        value = getattr(args, name, None)
+        if value:
+            found = find_vault_root(Path(value))
+            if found is not None:
+                return found
+    return None
+
+
+def _profile_dir(args: argparse.Namespace) -> Path:
+    """``_system/logs/profiles`` of the vault the command targets, else the working directory."""
+    found = _command_vault(args) or find_vault_root(Path.cwd())
+    return profiles_dir(found) if found is not None else Path.cwd()
+
+
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
-    return args.func(args)
+    label = "-".join(str(value) for key, value in vars(args).items() if key.endswith("cmd") and value)
+    params = {
+        key: value
+        for key, value in vars(args).items()
+        if not key.endswith("cmd") and key not in ("func", "profile", "profile_mode")
+    }
+
+    def _run() -> int:
+        with slow_op(_command_vault(args), f"cli.{label}", params):
+            return args.func(args)
+
+    if not getattr(args, "profile", False):
+        return _run()
+    status, path = profile_call(lambda: _profile_dir(args), label, args.profile_mode, _run)
+    print(f"profile written to {path}", file=sys.stderr)
+    return status
 
 
 if __name__ == "__main__":
@@ -29,6 +29,16 @@ def load_config(vault_root: Path) -> dict[str, Any]:
     return data
 
 
+def config_value(config: dict[str, Any], key: str, default: Any = None) -> Any:
+    """Look up a dotted key such as ``search.time_budget_ms``."""
+    node: Any = config
+    for part in key.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return default
+        node = node[part]
+    return node
+
+
 def save_config(vault_root: Path, config: dict[str, Any]) -> None:
     if yaml is None:
         raise RuntimeError("PyYAML is required to save config")
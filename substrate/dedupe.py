@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import threading
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - dependency guard
+    np = None
+
+from .cache import change_token
+from .io import parse_frontmatter, safe_read_text, safe_write_text
+from .vault import iter_markdown_files
+
+DEDUPE_DIR = Path("_system/dedupe")
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 5
+DEFAULT_THRESHOLD = 0.8
+
+# Fold changes.jsonl into a rewrite past max(_JOURNAL_MIN, files // _JOURNAL_FRACTION) entries.
+_JOURNAL_MIN = 256
+_JOURNAL_FRACTION = 8
+
+# Universal hashing h(x) = (a * x + b) mod P over 32-bit shingle hashes;
+# a < 2**31 keeps a * x inside uint64 for the NumPy path.
+_PRIME = 4294967311
+_MAX_HASH = (1 << 32) - 1
+_SEED = 4049
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _permutations(num_perm: int) -> tuple[list[int], list[int]]:
+    rng = random.Random(_SEED)
+    return (
+        [rng.randrange(1, 1 << 31) for _ in range(num_perm)],
+        [rng.randrange(0, 1 << 31) for _ in range(num_perm)],
+    )
+
+
+_A, _B = _permutations(NUM_PERM)
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[int]:
+    """32-bit hashes of overlapping ``size``-word shingles (case-folded)."""
+    words = _WORD_RE.findall(text.casefold())
+    if not words:
+        return set()
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {zlib.crc32(" ".join(words[i : i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def minhash(hashes: set[int]) -> array:
+    """MinHash signature (``NUM_PERM`` uint32 values) of a shingle set."""
+    if np is not None:
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        a = np.array(_A, dtype=np.uint64)[:, None]
+        b = np.array(_B, dtype=np.uint64)[:, None]
+        mins = ((a * values[None, :] + b) % np.uint64(_PRIME)).min(axis=1) & np.uint64(_MAX_HASH)
+        return array("I", mins.astype(np.uint32).tobytes())
+    return array("I", (min((a * x + b) % _PRIME for x in hashes) & _MAX_HASH for a, b in zip(_A, _B)))
+
+
+def estimate_jaccard(first: array, second: array) -> float:
+    return sum(1 for left, right in zip(first, second) if left == right) / len(first)
+
+
+def _band_keys(signature: array, bands: int = BANDS) -> list[tuple[int, bytes]]:
+    rows = len(signature) // bands
+    raw = signature.tobytes()
+    width = rows * signature.itemsize
+    return [(band, raw[band * width : (band + 1) * width]) for band in range(bands)]
+
+
+@dataclass(frozen=True)
+class DedupeMember:
+    path: str
+    id: str
+    title: str
+
+    def to_dict(self) -> dict[str, str]:
+        return {"path": self.path, "id": self.id, "title": self.title}
+
+
+@dataclass(frozen=True)
+class DedupeGroup:
+    members: list[DedupeMember]
+    similarity: float
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.members[0].id,
+            "size": len(self.members),
+            "similarity": round(self.similarity, 4),
+            "members": [member.to_dict() for member in self.members],
+        }
+
+
+class DedupeIndex:
+    """MinHash/LSH near-duplicate index over vault bodies.
+
+    Signatures are cached per file by stat signature: ``signatures.bin``
+    holds one row per signature and ``files.json`` maps files to rows as of
+    the last compaction. Later changes append their signature rows and a
+    line to ``changes.jsonl``; the journal is folded into a full rewrite
+    once it grows past a fraction of the vault or most rows are dead.
+    Candidates come from LSH band collisions and are verified by estimated
+    Jaccard; groups are the connected components of the verified pairs, so
+    a changed or deleted file only moves its own band entries and edges.
+    """
+
+    def __init__(self, vault_root: Path, *, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.vault_root = vault_root
+        self.threshold = threshold
+        self.directory = vault_root / "vault" / DEDUPE_DIR
+        self._files: dict[str, dict] = {}
+        self._signatures: dict[str, array] = {}
+        # Built on first use from the signatures, then patched per file.
+        self._buckets: dict[tuple[int, bytes], set[str]] | None = None
+        self._edges: dict[str, dict[str, float]] = {}
+        self._rows = 0
+        self._journaled = 0
+        self._loaded = False
+        self._state: tuple | None = None
+        self._lock = threading.RLock()
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            meta = json.loads(safe_read_text(self.directory / "files.json"))
+            raw = (self.directory / "signatures.bin").read_bytes()
+        except (OSError, ValueError):
+            return
+        if meta.get("num_perm") != NUM_PERM or meta.get("shingle_words") != SHINGLE_WORDS:
+            return
+        width = NUM_PERM * 4
+        self._rows = len(raw) // width
+        for key, info in meta["files"].items():
+            self._set(key, info, raw)
+        try:
+            lines = (self.directory / "changes.jsonl").read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                change = json.loads(line)
+                key, info = change["key"], change["file"]
+            except (ValueError, KeyError, TypeError):
+                break  # torn final write; the stat walk re-reads anything missed
+            if info is not None and info["row"] >= self._rows:
+                break
+            self._set(key, info, raw)
+            self._journaled += 1
+
+    def _set(self, key: str, info: dict | None, raw: bytes) -> None:
+        if info is None:
+            self._files.pop(key, None)
+            self._signatures.pop(key, None)
+            return
+        self._files[key] = info
+        row = info["row"]
+        if row < 0:
+            self._signatures.pop(key, None)
+            return
+        width = NUM_PERM * 4
+        signature = array("I")
+        signature.frombytes(raw[row * width : (row + 1) * width])
+        self._signatures[key] = signature
+
+    def _journal_limit(self) -> int:
+        return max(_JOURNAL_MIN, len(self._files) // _JOURNAL_FRACTION)
+
+    def _journal(self, keys: list[str]) -> None:
+        """Persist changes to ``keys``: append their new signature rows, then
+        one journal line each (rows first, so a line never points past the
+        file)."""
+        if not keys:
+            return
+        self._journaled += len(keys)
+        dead_rows = self._rows - len(self._signatures)
+        if (
+            self._journaled > self._journal_limit()
+            or dead_rows > max(_JOURNAL_MIN, len(self._signatures))
+            or not (self.directory / "files.json").exists()
+        ):
+            self._save()
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        with (self.directory / "signatures.bin").open("ab") as handle:
+            for key in keys:
+                info = self._files.get(key)
+                if info is not None:
+                    signature = self._signatures.get(key)
+                    info["row"] = -1 if signature is None else self._rows
+                    if signature is not None:
+                        handle.write(signature.tobytes())
+                        self._rows += 1
+                lines.append(json.dumps({"key": key, "file": info}, ensure_ascii=True) + "\n")
+        with (self.directory / "changes.jsonl").open("a", encoding="utf-8", newline="\n") as handle:
+            handle.write("".join(lines))
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Drop the journal first: its rows refer to the file being replaced,
+        # and after a crash the stat walk re-reads whatever it would have held.
+        (self.directory / "changes.jsonl").unlink(missing_ok=True)
+        files = {}
+        blob = bytearray()
+        row = 0
+        for key, info in sorted(self._files.items()):
+            signature = self._signatures.get(key)
+            info["row"] = row if signature is not None else -1
+            files[key] = info
+            if signature is not None:
+                blob += signature.tobytes()
+                row += 1
+        tmp = self.directory / "signatures.bin.tmp"
+        tmp.write_bytes(bytes(blob))
+        os.replace(tmp, self.directory / "signatures.bin")
+        meta = {"num_perm": NUM_PERM, "shingle_words": SHINGLE_WORDS, "files": files}
+        safe_write_text(self.directory / "files.json", json.dumps(meta, ensure_ascii=True) + "\n")
+        self._rows = row
+        self._journaled = 0
+
+    def refresh(self, *, force: bool = False) -> bool:
+        state = change_token(self.vault_root)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not force and state is not None and state == self._state:
+                return False
+            seen: set[str] = set()
+            changed: list[str] = []
+            for path in iter_markdown_files(self.vault_root):
+                key = path.relative_to(self.vault_root).as_posix()
+                seen.add(key)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                cached = self._files.get(key)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    continue
+                self._replace(key, self._read(path, stat.st_mtime_ns, stat.st_size))
+                changed.append(key)
+            for key in [key for key in self._files if key not in seen]:
+                self._replace(key, None)
+                changed.append(key)
+            self._journal(changed)
+            self._state = state
+            return bool(changed)
+
+    def _read(self, path: Path, mtime_ns: int, size: int) -> tuple[dict, array | None]:
+        try:
+            parsed = parse_frontmatter(safe_read_text(path))
+        except Exception:
+            return {"mtime_ns": mtime_ns, "size": size, "id": path.stem, "title": ""}, None
+        fm = parsed.frontmatter
+        info = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "id": str(fm.get("id", "")) or path.stem,
+            "title": str(fm.get("title", "")),
+        }
+        hashes = shingles(parsed.body or "")
+        return info, minhash(hashes) if hashes else None
+
+    def _replace(self, key: str, entry: tuple[dict, array | None] | None) -> None:
+        """Swap one file's signature, moving only its band entries and edges."""
+        if self._buckets is not None:
+            self._unlink(key)
+        if entry is None:
+            self._files.pop(key, None)
+            self._signatures.pop(key, None)
+            return
+        info, signature = entry
+        self._files[key] = info
+        if signature is None:
+            self._signatures.pop(key, None)
+            return
+        self._signatures[key] = signature
+        if self._buckets is not None:
+            self._link(key)
+
+    def _link(self, key: str) -> None:
+        signature = self._signatures[key]
+        checked: set[str] = set()
+        for band_key in _band_keys(signature):
+            bucket = self._buckets.setdefault(band_key, set())
+            for other in bucket:
+                if other in checked:
+                    continue
+                checked.add(other)
+                similarity = estimate_jaccard(signature, self._signatures[other])
+                if similarity >= self.threshold:
+                    self._edges.setdefault(key, {})[other] = similarity
+                    self._edges.setdefault(other, {})[key] = similarity
+            bucket.add(key)
+
+    def _unlink(self, key: str) -> None:
+        signature = self._signatures.get(key)
+        if signature is None:
+            return
+        for band_key in _band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        for other in self._edges.pop(key, {}):
+            neighbors = self._edges[other]
+            del neighbors[key]
+            if not neighbors:
+                del self._edges[other]
+
+    def _bucket_all(self) -> None:
+        if self._buckets is not None:
+            return
+        self._buckets = {}
+        self._edges = {}
+        for key in sorted(self._signatures):
+            self._link(key)
+
+    def update(self, path: Path) -> None:
+        """Fold one new, changed or deleted file into the index."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            key = path.relative_to(self.vault_root).as_posix()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                if key not in self._files:
+                    return
+                self._replace(key, None)
+            else:
+                self._replace(key, self._read(path, stat.st_mtime_ns, stat.st_size))
+            self._journal([key])
+
+    def groups(self, *, min_size: int = 2) -> Iterator[DedupeGroup]:
+        self.refresh()
+        with self._lock:
+            self._bucket_all()
+            snapshot = []
+            seen: set[str] = set()
+            for start in sorted(self._signatures):
+                if start in seen:
+                    continue
+                seen.add(start)
+                keys, similarity, queue = [start], 1.0, [start]
+                while queue:
+                    for other, value in self._edges.get(queue.pop(), {}).items():
+                        similarity = min(similarity, value)
+                        if other not in seen:
+                            seen.add(other)
+                            keys.append(other)
+                            queue.append(other)
+                if len(keys) < min_size:
+                    continue
+                keys.sort()
+                snapshot.append(
+                    DedupeGroup(
+                        members=[
+                            DedupeMember(path=key, id=self._files[key]["id"], title=self._files[key]["title"])
+                            for key in keys
+                        ],
+                        similarity=similarity,
+                    )
+                )
+        yield from snapshot
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from .embeddings import Embedder, require_numpy
+from .io import safe_write_text
+from .ops_log import utc_now_iso
+
+EMBEDDINGS_DIR = Path("_system/embeddings")
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_WORKERS = 4
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _model_dirname(model_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", model_id)
+
+
+@dataclass(frozen=True)
+class EmbeddingJobResult:
+    total: int
+    reused: int
+    embedded: int
+    batches: int
+
+
+class EmbeddingStore:
+    """Append-only embeddings for one model, keyed by content hash.
+
+    ``vectors.f32`` holds raw float32 rows and ``keys.txt`` the matching
+    hashes, one per line. Rows are written before their keys, so after a
+    crash any vectors without a key are ignored and truncated on open.
+    """
+
+    def __init__(self, vault_root: Path, model_id: str, dim: int) -> None:
+        self.directory = vault_root / "vault" / EMBEDDINGS_DIR / _model_dirname(model_id)
+        self.model_id = model_id
+        self.dim = dim
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def keys_path(self) -> Path:
+        return self.directory / "keys.txt"
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        keys: list[str] = []
+        if self.keys_path.exists():
+            with self.keys_path.open("r", encoding="utf-8") as handle:
+                keys = [line.strip() for line in handle]
+            if keys and not keys[-1]:
+                keys.pop()
+        row_bytes = self.dim * 4
+        stored = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        count = min(len(keys), stored)
+        if stored != count or len(keys) != count:
+            with self.vectors_path.open("ab") as handle:
+                handle.truncate(count * row_bytes)
+            safe_write_text(self.keys_path, "".join(f"{key}\n" for key in keys[:count]))
+        self._rows = {key: row for row, key in enumerate(keys[:count])}
+
+    def add(self, keys: Sequence[str], vectors: Any) -> None:
+        np = require_numpy()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            fresh = [(key, row) for row, key in enumerate(keys) if key not in self._rows]
+            if not fresh:
+                return
+            with self.vectors_path.open("ab") as handle:
+                handle.write(vectors[[row for _, row in fresh]].tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            with self.keys_path.open("a", encoding="utf-8", newline="\n") as handle:
+                handle.write("".join(f"{key}\n" for key, _ in fresh))
+            base = len(self._rows)
+            for offset, (key, _) in enumerate(fresh):
+                self._rows[key] = base + offset
+
+    def get(self, keys: Sequence[str]) -> Any:
+        """Vectors for ``keys`` in order; every key must be present."""
+        np = require_numpy()
+        if not keys:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        with self._lock:
+            rows = [self._rows[key] for key in keys]
+            count = len(self._rows)
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        return np.asarray(matrix[rows])
+
+
+def _write_progress(store: EmbeddingStore, **fields: Any) -> None:
+    payload = {"model_id": store.model_id, "updated": utc_now_iso(), **fields}
+    safe_write_text(store.directory / "job.json", json.dumps(payload, indent=2) + "\n")
+
+
+def embed_with_store(
+    store: EmbeddingStore,
+    embedder: Embedder,
+    texts: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> tuple[Any, EmbeddingJobResult]:
+    """Embed only texts whose hash is not stored yet, then return all vectors.
+
+    ``texts`` is consumed as a stream: missing texts are grouped into
+    fixed-size batches and handed to a worker pool as they arrive, with at
+    most ``2 * workers`` batches in flight, so only their hashes outlive the
+    batch. Each finished batch is appended to the store before the next is
+    collected, so an interrupted job resumes from the last stored batch.
+    Workers only overlap for embedders that release the GIL (NumPy-heavy
+    or remote models); the pure-Python ``HashingEmbedder`` runs at the
+    speed of one worker.
+    """
+    keys: list[str] = []
+    pending: set[str] = set()
+    batch: list[tuple[str, str]] = []
+    batches = 0
+    done = 0
+    running: set[Future] = set()
+
+    def collect(limit: int) -> None:
+        nonlocal running, done
+        while len(running) > limit:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch_keys, vectors = future.result()
+                store.add(batch_keys, vectors)
+                done += len(batch_keys)
+                _write_progress(store, total=len(pending), done=done, state="running")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+
+        def submit() -> None:
+            nonlocal batch, batches
+            if not batches:
+                _write_progress(store, total=len(pending), done=0, state="running")
+            running.add(pool.submit(_embed_batch, embedder, batch))
+            batches += 1
+            batch = []
+            collect(max(1, workers) * 2 - 1)
+
+        for text in texts:
+            key = content_hash(text)
+            keys.append(key)
+            if key in store or key in pending:
+                continue
+            pending.add(key)
+            batch.append((key, text))
+            if len(batch) >= batch_size:
+                submit()
+        if batch:
+            submit()
+        collect(0)
+    if batches:
+        _write_progress(store, total=len(pending), done=done, state="complete")
+    result = EmbeddingJobResult(
+        total=len(keys),
+        reused=len(keys) - sum(1 for key in keys if key in pending),
+        embedded=done,
+        batches=batches,
+    )
+    return store.get(keys), result
+
+
+def _embed_batch(embedder: Embedder, batch: list[tuple[str, str]]) -> tuple[list[str], Any]:
+    return [key for key, _ in batch], embedder.embed([text for _, text in batch])
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from typing import Any, Protocol, Sequence
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - dependency guard
+    np = None
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def require_numpy() -> Any:
+    if np is None:
+        raise RuntimeError("NumPy is required for semantic search")
+    return np
+
+
+class Embedder(Protocol):
+    """Maps texts to L2-normalized float32 vectors of a fixed dimension."""
+
+    model_id: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> Any:  # returns np.ndarray (len(texts), dim)
+        ...
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: hashed word and character n-grams
+    with sublinear TF, projected to ``dim`` with a seeded Gaussian matrix.
+
+    No vocabulary or model download is needed, and the same text always
+    produces the same vector across processes and machines.
+    """
+
+    def __init__(
+        self,
+        dim: int = 256,
+        *,
+        n_features: int = 4096,
+        char_ngrams: tuple[int, ...] = (3, 4),
+        seed: int = 1729,
+    ) -> None:
+        self.dim = dim
+        self.n_features = n_features
+        self.char_ngrams = char_ngrams
+        self.seed = seed
+        self.model_id = f"hash-ngram-v1-d{dim}-f{n_features}"
+        self._projection = None
+
+    def _matrix(self) -> Any:
+        if self._projection is None:
+            numpy = require_numpy()
+            rng = numpy.random.default_rng(self.seed)
+            projection = rng.standard_normal((self.n_features, self.dim)).astype(numpy.float32)
+            self._projection = projection / numpy.float32(math.sqrt(self.dim))
+        return self._projection
+
+    def _features(self, text: str) -> dict[int, float]:
+        counts: dict[int, int] = {}
+        words = _WORD_RE.findall(text.casefold())
+        grams: list[str] = list(words)
+        for word in words:
+            padded = f" {word} "
+            for n in self.char_ngrams:
+                grams.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode("utf-8"))
+            # The top bit picks the sign so colliding features tend to cancel.
+            signed = -(bucket % self.n_features + 1) if bucket & 0x80000000 else bucket % self.n_features + 1
+            counts[signed] = counts.get(signed, 0) + 1
+        return {key: 1.0 + math.log(count) for key, count in counts.items()}
+
+    def embed(self, texts: Sequence[str]) -> Any:
+        numpy = require_numpy()
+        sparse = numpy.zeros((len(texts), self.n_features), dtype=numpy.float32)
+        for row, text in enumerate(texts):
+            for signed, weight in self._features(text).items():
+                column = abs(signed) - 1
+                sparse[row, column] += weight if signed > 0 else -weight
+        dense = sparse @ self._matrix()
+        norms = numpy.linalg.norm(dense, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (dense / norms).astype(numpy.float32)
+
+
+def default_embedder() -> HashingEmbedder:
+    return HashingEmbedder()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import config_value, load_config
+from .io import parse_frontmatter, safe_read_text
+from .query import TEXT, Query, parse_query
+from .search import (
+    CancelToken,
+    PlanStage,
+    SearchResult,
+    SearchStats,
+    document_matches,
+    iter_search_results,
+    result_sort_key,
+)
+from .semantic import SEMANTIC_TOP_K, semantic_search
+from .text_index import TrigramIndex
+
+DEFAULT_RRF_K = 60
+
+HYBRID_STAGES = ("lexical", "semantic", "fusion")
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="substrate-hybrid")
+
+
+@dataclass(frozen=True)
+class FusionWeights:
+    lexical: float = 1.0
+    semantic: float = 1.0
+    k: int = DEFAULT_RRF_K
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "FusionWeights":
+        return cls(
+            lexical=float(config_value(config, "search.hybrid.lexical_weight", 1.0)),
+            semantic=float(config_value(config, "search.hybrid.semantic_weight", 1.0)),
+            k=int(config_value(config, "search.hybrid.rrf_k", DEFAULT_RRF_K)),
+        )
+
+
+def rrf_scores(rankings: list[tuple[list[str], float]], *, k: int = DEFAULT_RRF_K) -> dict[str, float]:
+    """Each key scores ``sum(weight / (k + rank))`` over the lists it appears in."""
+    scores: dict[str, float] = {}
+    for ranked, weight in rankings:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    return scores
+
+
+def reciprocal_rank_fusion(
+    rankings: list[tuple[list[SearchResult], float]],
+    *,
+    k: int = DEFAULT_RRF_K,
+) -> list[SearchResult]:
+    """Fuse ranked result lists by path with :func:`rrf_scores`."""
+    scores = rrf_scores([([str(result.path) for result in ranked], weight) for ranked, weight in rankings], k=k)
+    results: dict[str, SearchResult] = {}
+    for ranked, _ in rankings:
+        for result in ranked:
+            # Keep the first retriever's snippet (lexical highlights are exact).
+            results.setdefault(str(result.path), result)
+    fused = [
+        SearchResult(
+            path=result.path,
+            title=result.title,
+            type=result.type,
+            status=result.status,
+            privacy=result.privacy,
+            updated=result.updated,
+            snippet=result.snippet,
+            score=round(scores[key], 6),
+            highlights=result.highlights,
+        )
+        for key, result in results.items()
+    ]
+    fused.sort(key=result_sort_key, reverse=True)
+    return fused
+
+
+def _lexical(
+    vault_root: Path,
+    query: str,
+    pool: int,
+    status: list[str] | None,
+    privacy: list[str] | None,
+    time_budget: float | None,
+    cancel: CancelToken | None,
+    index: TrigramIndex | None,
+    stats: SearchStats,
+) -> list[SearchResult]:
+    results = iter_search_results(
+        vault_root,
+        query,
+        status=status,
+        privacy=privacy,
+        time_budget=time_budget,
+        cancel=cancel,
+        stats=stats,
+        index=index,
+    )
+    return heapq.nlargest(pool, results, key=result_sort_key)
+
+
+def _field_filter(parsed: Query, results: list[SearchResult]) -> list[SearchResult]:
+    """Drop semantic hits that fail the query's field clauses (tag:, type:, ...)
+    or contain a negated term (``-secret``).
+
+    Positive text terms are left to the embedding: a semantic hit need not
+    contain the words it was retrieved for.
+    """
+    residual = Query(clauses=tuple(clause for clause in parsed.clauses if clause.field != TEXT or clause.negated))
+    if residual.is_empty():
+        return results
+    kept = []
+    for result in results:
+        try:
+            parsed_file = parse_frontmatter(safe_read_text(result.path))
+        except Exception:
+            continue
+        fm = parsed_file.frontmatter
+        if document_matches(residual, fm, str(fm.get("title", "")), parsed_file.body or ""):
+            kept.append(result)
+    return kept
+
+
+def hybrid_search(
+    vault_root: Path,
+    query: str,
+    *,
+    pool: int = SEMANTIC_TOP_K,
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+    time_budget: float | None = None,
+    cancel: CancelToken | None = None,
+    index: TrigramIndex | None = None,
+    weights: FusionWeights | None = None,
+    stats: SearchStats | None = None,
+) -> list[SearchResult]:
+    """Run lexical and semantic retrieval concurrently and fuse them with RRF.
+
+    Both retrievers apply the status/privacy filters themselves, so fusion
+    only ranks documents that are allowed to appear.
+    """
+    stats = stats if stats is not None else SearchStats()
+    weights = weights or FusionWeights.from_config(load_config(vault_root))
+    parsed = parse_query(query)
+    semantic_text = " ".join(parsed.text_terms)
+    lexical_stats = SearchStats()
+    semantic_stats = SearchStats()
+
+    def timed(func, *args, **kwargs):
+        started = time.perf_counter()
+        value = func(*args, **kwargs)
+        return value, (time.perf_counter() - started) * 1000
+
+    lexical_future = _executor.submit(
+        timed, _lexical, vault_root, query, pool, status, privacy, time_budget, cancel, index, lexical_stats
+    )
+    semantic_future = _executor.submit(
+        timed,
+        semantic_search,
+        vault_root,
+        semantic_text,
+        k=pool,
+        status=status,
+        privacy=privacy,
+        stats=semantic_stats,
+    )
+    lexical, lexical_ms = lexical_future.result()
+    semantic, semantic_ms = semantic_future.result()
+
+    started = time.perf_counter()
+    semantic = _field_filter(parsed, semantic)
+    fused = reciprocal_rank_fusion([(lexical, weights.lexical), (semantic, weights.semantic)], k=weights.k)
+    fusion_ms = (time.perf_counter() - started) * 1000
+
+    stats.scanned += lexical_stats.scanned
+    stats.partial = stats.partial or lexical_stats.partial
+    stats.plan.extend(lexical_stats.plan)
+    stats.plan.extend(semantic_stats.plan)
+    stats.plan.extend(
+        [
+            PlanStage(stage="lexical", clauses=[query], output=len(lexical), elapsed_ms=lexical_ms),
+            PlanStage(stage="semantic", clauses=[semantic_text], output=len(semantic), elapsed_ms=semantic_ms),
+            PlanStage(
+                stage="fusion",
+                clauses=[f"rrf k={weights.k} lexical={weights.lexical} semantic={weights.semantic}"],
+                estimate=len(lexical) + len(semantic),
+                output=len(fused),
+                elapsed_ms=fusion_ms,
+            ),
+        ]
+    )
+    return fused
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
 from .io import parse_frontmatter, safe_read_text
+from .vault import iter_markdown_dir
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InboxItem:
     path: Path
     title: str
@@ -16,6 +18,16 @@ class InboxItem:
     updated: str
     privacy: str
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "title": self.title,
+            "status": self.status,
+            "privacy": self.privacy,
+            "created": self.created,
+            "updated": self.updated,
+        }
+
 
 def list_inbox(vault_root: Path) -> list[InboxItem]:
     inbox_dir = vault_root / "vault" / "inbox"
@@ -23,7 +35,7 @@ def list_inbox(vault_root: Path) -> list[InboxItem]:
         return []
 
     items: list[InboxItem] = []
-    for path in sorted(inbox_dir.glob("*.md")):
+    for path in iter_markdown_dir(inbox_dir):
         text = safe_read_text(path)
         parsed = parse_frontmatter(text)
         fm = parsed.frontmatter
@@ -31,10 +43,11 @@ def list_inbox(vault_root: Path) -> list[InboxItem]:
             InboxItem(
                 path=path,
                 title=str(fm.get("title", "")),
-                status=str(fm.get("status", "")),
+                # Interned: a handful of distinct values shared by every item.
+                status=sys.intern(str(fm.get("status", ""))),
                 created=str(fm.get("created", "")),
                 updated=str(fm.get("updated", "")),
-                privacy=str(fm.get("privacy", "")),
+                privacy=sys.intern(str(fm.get("privacy", ""))),
             )
         )
     return items
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Tuple
@@ -12,6 +13,8 @@ except Exception:  # pragma: no cover - dependency guard
     yaml = None
 
 from .constants import FRONTMATTER_DELIM, MAX_FRONTMATTER_BYTES
+from .metrics import metrics
+from .perf import span
 
 
 class FrontmatterError(ValueError):
@@ -38,24 +41,34 @@ def canonicalize_path(vault_root: Path, target: Path) -> Path:
     return target_path
 
 
-def safe_read_text(path: Path) -> str:
-    text = path.read_text(encoding="utf-8")
+def safe_read_raw_text(path: Path) -> str:
+    """File text with its original line endings (for byte-offset citations)."""
+    with span("read"):
+        data = path.read_bytes()
+    metrics.inc("files_read_total")
+    metrics.inc("bytes_read_total", len(data))
+    text = data.decode("utf-8")
     if "\x00" in text:
         raise ValueError("NUL byte not allowed in text files")
-    return normalize_text(text)
+    return text
+
+
+def safe_read_text(path: Path) -> str:
+    return normalize_text(safe_read_raw_text(path))
 
 
 def safe_write_text(path: Path, text: str) -> None:
     text = normalize_text(text)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fd, tmp_path = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as tmp:
-            tmp.write(text)
-        os.replace(tmp_path, path)
-    finally:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+    with span("write"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as tmp:
+                tmp.write(text)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
 
 def parse_frontmatter(text: str) -> ParsedDocument:
@@ -93,7 +106,10 @@ def parse_frontmatter(text: str) -> ParsedDocument:
         yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _construct_mapping
     )
 
-    data = yaml.load(yaml_block, Loader=_UniqueKeyLoader) or {}
+    started = time.perf_counter()
+    with span("yaml"):
+        data = yaml.load(yaml_block, Loader=_UniqueKeyLoader) or {}
+    metrics.observe("yaml_parse_seconds", time.perf_counter() - started)
     if not isinstance(data, dict):
         raise FrontmatterError("Frontmatter must be a YAML mapping")
 
@@ -1,28 +1,39 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from .cache import bump_generation
+from .config import load_config, save_config
 from .constants import DEFAULT_SCHEMA_PATH
 from .io import dump_frontmatter, parse_frontmatter, safe_read_text, safe_write_text
+from .layout import DEFAULT_SHARD_CHARS, ITEM_LAYOUTS, ItemLayout, item_files, item_path, shard_dirs
 from .ops_log import utc_now_iso
+from .perf import span
 from .schema import load_schema, validate_frontmatter
 from .status import StatusTransitionError, validate_status_transition
 from .ulid import new_ulid
 
+MIGRATE_BATCH_SIZE = 500
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Item:
     path: Path
     frontmatter: dict[str, Any]
     body: str
 
+    def to_dict(self) -> dict[str, Any]:
+        return {"path": str(self.path), "frontmatter": self.frontmatter, "body": self.body}
+
 
 def _validate_frontmatter_or_raise(frontmatter: dict[str, Any], schema_path: Path | None = None) -> None:
     schema = load_schema(schema_path or DEFAULT_SCHEMA_PATH)
-    errors = validate_frontmatter(frontmatter, schema)
+    with span("validate"):
+        errors = validate_frontmatter(frontmatter, schema)
     if errors:
         raise ValueError("; ".join(errors))
 
@@ -31,10 +42,6 @@ def _vault_inbox_dir(vault_root: Path) -> Path:
     return vault_root / "vault" / "inbox"
 
 
-def _vault_items_dir(vault_root: Path) -> Path:
-    return vault_root / "vault" / "items"
-
-
 def _vault_daily_dir(vault_root: Path) -> Path:
     return vault_root / "vault" / "daily"
 
@@ -46,13 +53,16 @@ def create_inbox_note(
     body: str = "",
     tags: list[str] | None = None,
     privacy: str = "private",
+    item_type: str = "note",
+    sources: list[dict[str, Any]] | None = None,
+    item_id: str | None = None,
 ) -> Path:
     now = utc_now_iso()
-    item_id = new_ulid()
+    item_id = item_id or new_ulid()
     frontmatter: dict[str, Any] = {
         "schema_version": "0.1",
         "id": item_id,
-        "type": "note",
+        "type": item_type,
         "title": title,
         "created": now,
         "updated": now,
@@ -61,12 +71,15 @@ def create_inbox_note(
     }
     if tags:
         frontmatter["tags"] = tags
+    if sources:
+        frontmatter["sources"] = sources
 
     _validate_frontmatter_or_raise(frontmatter)
 
     content = dump_frontmatter(frontmatter, body)
     target = _vault_inbox_dir(vault_root) / f"{item_id}.md"
     safe_write_text(target, content)
+    bump_generation()
     return target
 
 
@@ -95,6 +108,7 @@ def update_frontmatter(
     _validate_frontmatter_or_raise(frontmatter, schema_path=schema_path)
     content = dump_frontmatter(frontmatter, item.body)
     safe_write_text(path, content)
+    bump_generation()
     return Item(path=path, frontmatter=frontmatter, body=item.body)
 
 
@@ -135,6 +149,7 @@ def open_daily_note(
     _validate_frontmatter_or_raise(frontmatter)
     content = dump_frontmatter(frontmatter, "")
     safe_write_text(daily_path, content)
+    bump_generation()
     return daily_path
 
 
@@ -155,6 +170,7 @@ def append_daily_note(
     _validate_frontmatter_or_raise(frontmatter)
     content = dump_frontmatter(frontmatter, body)
     safe_write_text(daily_path, content)
+    bump_generation()
     return daily_path
 
 
@@ -178,10 +194,80 @@ def promote_inbox_item(
     item_id = str(frontmatter.get("id", "")).strip()
     if not item_id:
         raise ValueError("Missing id in frontmatter")
-    target = _vault_items_dir(vault_root) / f"{item_id}.md"
+    target = item_path(vault_root, item_id)
     if target.exists():
         raise ValueError("Target item already exists")
     content = dump_frontmatter(frontmatter, item.body)
     safe_write_text(target, content)
     path.unlink()
+    bump_generation()
     return target
+
+
+@dataclass(frozen=True)
+class MigrationResult:
+    layout: str
+    moved: int
+    batches: int
+    conflicts: list[str]
+
+
+def migrate_items(
+    vault_root: Path,
+    layout_name: str,
+    *,
+    shard_chars: int | None = None,
+    batch_size: int = MIGRATE_BATCH_SIZE,
+    on_batch: Callable[[int, int], None] | None = None,
+) -> MigrationResult:
+    """Move items into ``layout_name`` while the vault stays online.
+
+    The config is switched first so new items land in the target layout and
+    ``resolve_item`` finds items in either place. Files are then renamed in
+    batches; ``on_batch(batch, moved)`` runs after each batch. Re-running
+    finishes an interrupted migration.
+    """
+    if layout_name not in ITEM_LAYOUTS:
+        raise ValueError(f"layout must be one of: {', '.join(ITEM_LAYOUTS)}")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    config = load_config(vault_root)
+    items_config = dict(config.get("items") or {})
+    items_config["layout"] = layout_name
+    items_config["shard_chars"] = shard_chars or int(items_config.get("shard_chars", DEFAULT_SHARD_CHARS))
+    config["items"] = items_config
+    save_config(vault_root, config)
+    layout = ItemLayout(layout_name, items_config["shard_chars"])
+
+    moved = 0
+    batches = 0
+    pending = 0
+    conflicts: list[str] = []
+    for path in sorted(item_files(vault_root)):
+        target = item_path(vault_root, path.stem, layout)
+        if target == path:
+            continue
+        if target.exists():
+            conflicts.append(str(path))
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(path, target)
+        moved += 1
+        pending += 1
+        if pending == batch_size:
+            batches += 1
+            bump_generation()
+            if on_batch is not None:
+                on_batch(batches, pending)
+            pending = 0
+    if pending:
+        batches += 1
+        bump_generation()
+        if on_batch is not None:
+            on_batch(batches, pending)
+    for entry in shard_dirs(vault_root):
+        try:
+            os.rmdir(entry.path)  # only succeeds for shards emptied by the move
+        except OSError:
+            pass
+    return MigrationResult(layout=layout_name, moved=moved, batches=batches, conflicts=conflicts)
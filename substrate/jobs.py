@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import json
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .cache import bump_generation
+from .dedupe import DedupeIndex
+from .embedding_store import EmbeddingStore, embed_with_store
+from .embeddings import default_embedder, require_numpy
+from .io import FrontmatterError, dump_frontmatter, parse_frontmatter, safe_read_text, safe_write_text
+from .items import create_inbox_note
+from .layout import resolve_item
+from .links import record_link_writes
+from .ops_log import append_ops_log, utc_now_iso
+from .passages import PASSAGE_INDEX, active_passage_index, passage_texts
+from .raw_archive import archive_file, hash_algorithm, hash_file, iter_source_files, read_raw_meta, write_raw_meta
+from .semantic import DOCUMENT_INDEX, document_record
+from .text_index import active_trigram_index
+from .ulid import new_ulid
+from .vector_index import vector_index_dir
+
+JOBS_DIR = Path("_system/jobs")
+
+STAGES = ("discover", "hash", "extract", "canonicalize", "enrich", "index")
+DEFAULT_STAGE_WORKERS = {"hash": 4, "extract": 4, "canonicalize": 2, "enrich": 2, "index": 1}
+DEFAULT_QUEUE_SIZE = 256
+PROGRESS_INTERVAL = 0.5
+
+TEXT_SUFFIXES = {".md", ".markdown", ".txt"}
+MAX_TEXT_BYTES = 4 * 1024 * 1024
+SUMMARY_MAX_CHARS = 200
+
+_TYPE_BY_SUFFIX = {
+    **{suffix: "note" for suffix in TEXT_SUFFIXES},
+    **{suffix: "photo" for suffix in (".jpg", ".jpeg", ".png", ".gif", ".heic", ".webp", ".tif", ".tiff")},
+    **{suffix: "audio" for suffix in (".mp3", ".m4a", ".wav", ".flac", ".ogg", ".opus")},
+    **{suffix: "document" for suffix in (".pdf", ".doc", ".docx", ".odt", ".rtf", ".epub")},
+    **{suffix: "web_clip" for suffix in (".html", ".htm", ".mhtml")},
+}
+
+_JOB_ID_RE = re.compile(r"^[0-9A-Za-z_-]{1,64}$")
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_DONE = object()
+
+
+def jobs_dir(vault_root: Path) -> Path:
+    return vault_root / "vault" / JOBS_DIR
+
+
+def _job_dir(vault_root: Path, job_id: str) -> Path:
+    if not _JOB_ID_RE.match(job_id):
+        raise ValueError(f"invalid job id: {job_id}")
+    return jobs_dir(vault_root) / job_id
+
+
+class _StageStats:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def to_dict(self, queue_depth: int) -> dict[str, int]:
+        return {
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "workers": self.workers,
+            "queue": queue_depth,
+        }
+
+
+class ImportJob:
+    """Resumable import of external files into the vault.
+
+    Stages run as thread pools joined by bounded queues, so a slow stage
+    throttles the ones before it instead of buffering the whole import. Every
+    stage appends finished records to ``<stage>.jsonl`` under
+    ``_system/jobs/<id>/``; on resume those records are forwarded without
+    redoing the work, and items that failed are retried. Content-addressed
+    raw storage keeps repeat imports of the same bytes from creating
+    duplicate notes.
+    """
+
+    def __init__(self, vault_root: Path, job_id: str) -> None:
+        self.vault_root = vault_root
+        self.id = job_id
+        self.directory = _job_dir(vault_root, job_id)
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(64)]
+        self._handles: dict[str, Any] = {}
+        self._checkpoints: dict[str, dict[str, dict[str, Any]]] = {}
+        self._stats: dict[str, _StageStats] = {}
+        self._queues: dict[str, queue.Queue] = {}
+        self._remaining: dict[str, int] = {}
+        self._errors = 0
+        self._started = 0.0
+        self._sources: list[str] = []
+        self._dedupe: DedupeIndex | None = None
+        self._embedding: tuple[EmbeddingStore, Any, tuple[str, ...]] | None = None
+
+    @property
+    def manifest(self) -> dict[str, Any]:
+        return json.loads(safe_read_text(self.directory / "job.json"))
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        safe_write_text(self.directory / "job.json", json.dumps(manifest, indent=2) + "\n")
+
+    def progress(self) -> dict[str, Any]:
+        try:
+            return json.loads(safe_read_text(self.directory / "progress.json"))
+        except FileNotFoundError:
+            manifest = self.manifest
+            return {"id": self.id, "state": manifest["state"], "sources": manifest["sources"]}
+
+    # -- checkpoints -------------------------------------------------------
+
+    def _load_checkpoint(self, stage: str) -> dict[str, dict[str, Any]]:
+        records: dict[str, dict[str, Any]] = {}
+        path = self.directory / f"{stage}.jsonl"
+        if not path.exists():
+            return records
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash
+                records[record["key"]] = record
+        return records
+
+    def _checkpoint(self, stage: str, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=True) + "\n"
+        with self._lock:
+            handle = self._handles.get(stage)
+            if handle is None:
+                handle = self._handles[stage] = (self.directory / f"{stage}.jsonl").open("a", encoding="utf-8")
+            handle.write(line)
+            handle.flush()
+
+    def _fail(self, stage: str, key: str, exc: Exception) -> None:
+        entry = {"timestamp": utc_now_iso(), "stage": stage, "key": key, "error": str(exc) or type(exc).__name__}
+        with self._lock:
+            self._errors += 1
+            self._stats[stage].failed += 1
+            with (self.directory / "errors.jsonl").open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=True) + "\n")
+
+    # -- stages ------------------------------------------------------------
+
+    def _discover(self) -> None:
+        outbox = self._queues["hash"]
+        stats = self._stats["discover"]
+        checkpoint = self._checkpoints["discover"]
+        if (self.directory / "discover.done").exists():
+            for record in checkpoint.values():
+                stats.skipped += 1
+                outbox.put(record)
+        else:
+            for path in iter_source_files(Path(source) for source in self._sources):
+                key = str(path.resolve())
+                record = checkpoint.get(key)
+                if record is not None:
+                    stats.skipped += 1
+                else:
+                    try:
+                        stat = path.stat()
+                    except OSError as exc:
+                        self._fail("discover", key, exc)
+                        continue
+                    record = {"key": key, "source": key, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                    self._checkpoint("discover", record)
+                    stats.done += 1
+                outbox.put(record)
+            (self.directory / "discover.done").write_text(utc_now_iso() + "\n", encoding="utf-8")
+        for _ in range(self._stats["hash"].workers):
+            outbox.put(_DONE)
+
+    def _hash(self, record: dict[str, Any]) -> dict[str, Any]:
+        algorithm = hash_algorithm()
+        digest, size = hash_file(Path(record["source"]), algorithm)
+        with self._lock:
+            self._stats["hash"].bytes += size
+        return {**record, "algorithm": algorithm, "hash": digest, "size": size}
+
+    def _extract(self, record: dict[str, Any]) -> dict[str, Any]:
+        source = Path(record["source"])
+        with self._stripes[int(record["hash"][:2], 16) % len(self._stripes)]:
+            archived = archive_file(self.vault_root, source, record["algorithm"], record["hash"], record["size"])
+        if archived.copied:
+            with self._lock:
+                self._stats["extract"].bytes += record["size"]
+        stored = Path(archived.stored).relative_to(self.vault_root).as_posix()
+        kind = _TYPE_BY_SUFFIX.get(source.suffix.lower(), "import_stub")
+        return {**record, "stored": stored, "type": kind}
+
+    def _canonicalize(self, record: dict[str, Any]) -> dict[str, Any]:
+        owner = {"job": self.id, "source": record["key"]}
+        with self._stripes[int(record["hash"][:2], 16) % len(self._stripes)]:
+            meta = read_raw_meta(self.vault_root, record["algorithm"], record["hash"]) or {}
+            existing = resolve_item(self.vault_root, meta["item_id"]) if meta.get("item_id") else None
+            created = meta.get("created_by") == owner
+            if existing is None:
+                if not created:
+                    # Claim the id before writing, so a crash in between
+                    # re-creates this note on resume instead of a second one.
+                    meta.update(item_id=new_ulid(), created_by=owner)
+                    write_raw_meta(self.vault_root, meta)
+                    created = True
+                existing = self._write_note(record, meta["item_id"])
+        return {**record, "item": existing.relative_to(self.vault_root).as_posix(), "created": created}
+
+    def _write_note(self, record: dict[str, Any], item_id: str) -> Path:
+        source = Path(record["source"])
+        title = source.stem
+        body = ""
+        if record["type"] == "note" and record["size"] <= MAX_TEXT_BYTES:
+            try:
+                body = safe_read_text(self.vault_root / record["stored"])
+            except (UnicodeDecodeError, ValueError):
+                body = ""
+            try:
+                parsed = parse_frontmatter(body)
+                body = parsed.body
+                title = str(parsed.frontmatter.get("title") or title)
+            except FrontmatterError:
+                pass
+        path = create_inbox_note(
+            self.vault_root,
+            title=title,
+            body=body,
+            item_type=record["type"],
+            sources=[
+                {
+                    "raw": record["stored"],
+                    "hash": f"{record['algorithm']}:{record['hash']}",
+                    "path": record["source"],
+                }
+            ],
+            item_id=item_id,
+        )
+        append_ops_log(self.vault_root, "import.note", {"file": str(path), "job": self.id, "source": record["source"]})
+        return path
+
+    def _enrich(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Title from the first heading and a one-line summary, if missing.
+
+        Only notes this job created are touched; a deduplicated import must
+        not rewrite an item that already existed.
+        """
+        if not record.get("created"):
+            return record
+        path = self.vault_root / record["item"]
+        parsed = parse_frontmatter(safe_read_text(path))
+        frontmatter = dict(parsed.frontmatter)
+        body = parsed.body or ""
+        heading = _HEADING_RE.search(body)
+        if heading and frontmatter.get("title") == Path(record["source"]).stem:
+            frontmatter["title"] = heading.group(1)
+        if "summary" not in frontmatter:
+            for line in body.splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    frontmatter["summary"] = line[:SUMMARY_MAX_CHARS]
+                    break
+        if frontmatter != parsed.frontmatter:
+            safe_write_text(path, dump_frontmatter(frontmatter, body))
+        return record
+
+    def _index(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Patch every index the vault has built with this note.
+
+        In-memory indexes are only updated when this process has them
+        loaded; persisted ones (links, dedupe) are patched on disk, and the
+        note's texts go into the embedding store so the next ``vectors
+        build`` reuses them. An index the vault never built stays unbuilt.
+        """
+        path = self.vault_root / record["item"]
+        for index in (active_trigram_index(self.vault_root), active_passage_index(self.vault_root)):
+            if index is not None:
+                index.update(path)
+        record_link_writes(self.vault_root, path)
+        if self._dedupe is not None:
+            self._dedupe.update(path)
+        if self._embedding is not None:
+            store, embedder, names = self._embedding
+            texts = []
+            if DOCUMENT_INDEX in names:
+                document = document_record(self.vault_root, path)
+                if document is not None:
+                    texts.append(document[0])
+            if PASSAGE_INDEX in names:
+                texts.extend(passage_texts(path))
+            embed_with_store(store, embedder, texts, workers=1)
+        return record
+
+    def _open_indexes(self) -> None:
+        dedupe = DedupeIndex(self.vault_root)
+        self._dedupe = dedupe if (dedupe.directory / "files.json").exists() else None
+        self._embedding = None
+        embedder = default_embedder()
+        names = []
+        for name in (DOCUMENT_INDEX, PASSAGE_INDEX):
+            try:
+                manifest = json.loads(safe_read_text(vector_index_dir(self.vault_root, name) / "index.json"))
+            except (OSError, ValueError):
+                continue
+            if manifest.get("model_id") == embedder.model_id:
+                names.append(name)
+        if not names:
+            return
+        try:
+            require_numpy()
+        except RuntimeError:
+            return
+        self._embedding = (EmbeddingStore(self.vault_root, embedder.model_id, embedder.dim), embedder, tuple(names))
+
+    def _worker(self, stage: str, fn: Callable[[dict[str, Any]], dict[str, Any]], outbox: queue.Queue | None) -> None:
+        inbox = self._queues[stage]
+        stats = self._stats[stage]
+        checkpoint = self._checkpoints[stage]
+        try:
+            while True:
+                record = inbox.get()
+                if record is _DONE:
+                    break
+                result = checkpoint.get(record["key"])
+                if result is not None:
+                    with self._lock:
+                        stats.skipped += 1
+                else:
+                    try:
+                        result = fn(record)
+                        self._checkpoint(stage, result)
+                    except Exception as exc:
+                        self._fail(stage, record["key"], exc)
+                        continue
+                    with self._lock:
+                        stats.done += 1
+                if outbox is not None:
+                    outbox.put(result)
+        finally:
+            # Always hand _DONE on, or the following stages (and run()) wait forever.
+            with self._lock:
+                self._remaining[stage] -= 1
+                last = self._remaining[stage] == 0
+            if last and outbox is not None:
+                following = STAGES[STAGES.index(stage) + 1]
+                for _ in range(self._stats[following].workers):
+                    outbox.put(_DONE)
+
+    # -- running -----------------------------------------------------------
+
+    def snapshot(self, state: str) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        with self._lock:
+            stages = {
+                stage: self._stats[stage].to_dict(self._queues[stage].qsize() if stage in self._queues else 0)
+                for stage in STAGES
+            }
+            errors = self._errors
+        finished = stages["index"]["done"]
+        return {
+            "id": self.id,
+            "state": state,
+            "sources": self._sources,
+            "updated": utc_now_iso(),
+            "elapsed_s": round(elapsed, 3),
+            "items": stages["discover"]["done"] + stages["discover"]["skipped"],
+            "completed": stages["index"]["done"] + stages["index"]["skipped"],
+            "errors": errors,
+            "items_per_s": round(finished / elapsed, 2) if elapsed else 0.0,
+            "bytes_per_s": round(stages["hash"]["bytes"] / elapsed, 1) if elapsed else 0.0,
+            "stages": stages,
+        }
+
+    def _publish(self, state: str, on_progress: Callable[[dict[str, Any]], None] | None) -> dict[str, Any]:
+        progress = self.snapshot(state)
+        safe_write_text(self.directory / "progress.json", json.dumps(progress, indent=2) + "\n")
+        if on_progress is not None:
+            on_progress(progress)
+        return progress
+
+    def run(
+        self,
+        *,
+        workers: int | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """Run (or resume) the job to completion; returns the final progress."""
+        stage_workers = dict(DEFAULT_STAGE_WORKERS)
+        if workers:
+            stage_workers["hash"] = stage_workers["extract"] = workers
+        self._checkpoints = {stage: self._load_checkpoint(stage) for stage in STAGES}
+        self._stats = {stage: _StageStats(stage_workers.get(stage, 1)) for stage in STAGES}
+        self._queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES[1:]}
+        self._remaining = {stage: stage_workers[stage] for stage in STAGES[1:]}
+        self._errors = 0
+        self._open_indexes()
+        self._started = time.perf_counter()
+
+        manifest = self.manifest
+        self._sources = manifest["sources"]
+        manifest.update(state="running", started=utc_now_iso())
+        self._write_manifest(manifest)
+
+        functions = {
+            "hash": self._hash,
+            "extract": self._extract,
+            "canonicalize": self._canonicalize,
+            "enrich": self._enrich,
+            "index": self._index,
+        }
+        threads = [threading.Thread(target=self._discover, name="job-discover", daemon=True)]
+        for position, stage in enumerate(STAGES[1:], start=1):
+            outbox = self._queues.get(STAGES[position + 1]) if position + 1 < len(STAGES) else None
+            for number in range(stage_workers[stage]):
+                threads.append(
+                    threading.Thread(
+                        target=self._worker,
+                        args=(stage, functions[stage], outbox),
+                        name=f"job-{stage}-{number}",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                self._publish("running", on_progress)
+                threads[-1].join(PROGRESS_INTERVAL)
+            for thread in threads:
+                thread.join()
+        finally:
+            with self._lock:
+                for handle in self._handles.values():
+                    handle.close()
+                self._handles.clear()
+        if self._stats["canonicalize"].done:
+            bump_generation()
+        state = "completed" if not self._errors else "completed_with_errors"
+        manifest.update(state=state, finished=utc_now_iso())
+        self._write_manifest(manifest)
+        return self._publish(state, on_progress)
+
+
+def create_import_job(vault_root: Path, sources: list[Path], *, job_id: str | None = None) -> ImportJob:
+    job = ImportJob(vault_root, job_id or new_ulid())
+    if (job.directory / "job.json").exists():
+        raise ValueError(f"job already exists: {job.id}")
+    job.directory.mkdir(parents=True, exist_ok=True)
+    job._write_manifest(
+        {
+            "id": job.id,
+            "kind": "import",
+            "sources": [str(source.expanduser().resolve()) for source in sources],
+            "created": utc_now_iso(),
+            "state": "pending",
+        }
+    )
+    return job
+
+
+def open_job(vault_root: Path, job_id: str) -> ImportJob:
+    job = ImportJob(vault_root, job_id)
+    if not (job.directory / "job.json").exists():
+        raise ValueError(f"unknown job: {job_id}")
+    return job
+
+
+def list_jobs(vault_root: Path) -> list[dict[str, Any]]:
+    """Progress of every job, newest first."""
+    root = jobs_dir(vault_root)
+    if not root.exists():
+        return []
+    jobs = []
+    for directory in sorted(root.iterdir(), reverse=True):
+        if (directory / "job.json").exists():
+            jobs.append(ImportJob(vault_root, directory.name).progress())
+    return jobs
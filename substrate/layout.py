@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import config_path, config_value, load_config
+
+ITEM_LAYOUTS = ("flat", "sharded")
+
+# Five ULID characters are the top 25 of its 48 timestamp bits: one shard
+# per ~9.3 hours of item creation.
+DEFAULT_SHARD_CHARS = 5
+
+_ULID_RE = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+
+
+@dataclass(frozen=True)
+class ItemLayout:
+    """Where canonical items live under ``vault/items``.
+
+    ``flat`` is ``items/<ULID>.md``; ``sharded`` is
+    ``items/<first shard_chars of the ULID>/<ULID>.md``, so each shard holds
+    the items created in one window of time.
+    """
+
+    name: str = "flat"
+    shard_chars: int = DEFAULT_SHARD_CHARS
+
+    def relative(self, item_id: str) -> Path:
+        if self.name == "sharded" and _ULID_RE.match(item_id):
+            return Path(item_id[: self.shard_chars]) / f"{item_id}.md"
+        return Path(f"{item_id}.md")
+
+
+_layouts: dict[str, tuple[int, ItemLayout]] = {}
+_layouts_lock = threading.Lock()
+
+
+def item_layout(vault_root: Path) -> ItemLayout:
+    """Configured layout (``items.layout`` / ``items.shard_chars``), cached by config mtime."""
+    try:
+        mtime_ns = config_path(vault_root).stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    key = str(vault_root)
+    with _layouts_lock:
+        cached = _layouts.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    config = load_config(vault_root) if mtime_ns else {}
+    name = str(config_value(config, "items.layout", "flat"))
+    if name not in ITEM_LAYOUTS:
+        raise ValueError(f"items.layout must be one of: {', '.join(ITEM_LAYOUTS)}")
+    layout = ItemLayout(name, int(config_value(config, "items.shard_chars", DEFAULT_SHARD_CHARS)))
+    with _layouts_lock:
+        _layouts[key] = (mtime_ns, layout)
+    return layout
+
+
+def items_dir(vault_root: Path) -> Path:
+    return vault_root / "vault" / "items"
+
+
+def item_path(vault_root: Path, item_id: str, layout: ItemLayout | None = None) -> Path:
+    """Path a canonical item with ``item_id`` is written to."""
+    return items_dir(vault_root) / (layout or item_layout(vault_root)).relative(item_id)
+
+
+def resolve_item(vault_root: Path, item_id: str) -> Path | None:
+    """Existing file for ``item_id``: items (either layout, so mid-migration works), then inbox."""
+    layout = item_layout(vault_root)
+    other = ItemLayout("flat" if layout.name == "sharded" else "sharded", layout.shard_chars)
+    for candidate in (
+        item_path(vault_root, item_id, layout),
+        item_path(vault_root, item_id, other),
+        vault_root / "vault" / "inbox" / f"{item_id}.md",
+    ):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def shard_dirs(vault_root: Path) -> list[os.DirEntry]:
+    try:
+        with os.scandir(items_dir(vault_root)) as entries:
+            return [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return []
+
+
+def item_files(vault_root: Path) -> list[Path]:
+    """Every item file, flat or in a shard (unsorted)."""
+    files: list[Path] = []
+    root = items_dir(vault_root)
+    if not root.exists():
+        return files
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                with os.scandir(entry.path) as shard:
+                    files.extend(Path(item.path) for item in shard if item.name.endswith(".md") and item.is_file())
+            elif entry.name.endswith(".md") and entry.is_file():
+                files.append(Path(entry.path))
+    return files
@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote
+
+from .cache import change_token
+from .io import parse_frontmatter, safe_read_text, safe_write_text
+from .vault import iter_markdown_files
+
+LINK_INDEX_DIR = Path("_system/index/links")
+
+_WIKILINK_RE = re.compile(r"\[\[([^\]|#\n]+)(?:#[^\]|\n]*)?(?:\|[^\]\n]*)?\]\]")
+_MDLINK_RE = re.compile(r"\[[^\]\n]*\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+_ULID_RE = re.compile(r"(?<![0-9A-Za-z])[0-9A-HJKMNP-TV-Z]{26}(?![0-9A-Za-z])")
+
+DIRECTIONS = ("out", "in", "both")
+
+# Fold the change journal into a full state rewrite past this many entries
+# (or this fraction of the vault's files, whichever is larger).
+_JOURNAL_MIN = 256
+_JOURNAL_FRACTION = 8
+
+
+def extract_links(body: str, source: Path, vault_root: Path) -> list[list[str]]:
+    """Unresolved references in ``body`` as ``[kind, value]`` pairs.
+
+    Kinds are ``id`` (bare ULID), ``wiki`` (``[[target]]`` text) and
+    ``path`` (markdown link to a vault file, relative to the vault root).
+    """
+    refs: set[tuple[str, str]] = set()
+    for match in _WIKILINK_RE.finditer(body):
+        refs.add(("wiki", match.group(1).strip()))
+    for match in _MDLINK_RE.finditer(body):
+        target = unquote(match.group(1))
+        if "://" in target or target.startswith(("#", "mailto:")):
+            continue
+        target = target.split("#", 1)[0]
+        if not target:
+            continue
+        resolved = (source.parent / target).resolve() if not target.startswith("/") else vault_root / target.lstrip("/")
+        try:
+            refs.add(("path", resolved.relative_to(vault_root.resolve()).as_posix()))
+        except ValueError:
+            continue
+    for match in _ULID_RE.finditer(body):
+        refs.add(("id", match.group(0)))
+    return [list(ref) for ref in sorted(refs)]
+
+
+@dataclass(frozen=True)
+class LinkNode:
+    id: str
+    path: str
+    title: str
+
+    def to_dict(self) -> dict[str, str]:
+        return {"id": self.id, "path": self.path, "title": self.title}
+
+
+def _claim_keys(node: LinkNode) -> set[str]:
+    """Lookup keys a reference can resolve to ``node`` through."""
+    keys = {"path:" + node.path, "id:" + node.id, "name:" + Path(node.path).stem.casefold()}
+    if node.title:
+        keys.add("name:" + node.title.casefold())
+    return keys
+
+
+def _ref_keys(kind: str, value: str) -> tuple[str, ...]:
+    if kind == "path":
+        return ("path:" + value,)
+    if kind == "id":
+        return ("id:" + value,)
+    return ("id:" + value, "name:" + value.casefold(), "name:" + Path(value).stem.casefold())
+
+
+def _discard(mapping: dict[str, tuple[int, ...]], key: str, number: int) -> None:
+    remaining = tuple(item for item in mapping.get(key, ()) if item != number)
+    if remaining:
+        mapping[key] = remaining
+    else:
+        mapping.pop(key, None)
+
+
+def _rows(csr: tuple[array, array]) -> list[tuple[int, ...]]:
+    offsets, targets = csr
+    return [tuple(targets[offsets[number] : offsets[number + 1]]) for number in range(len(offsets) - 1)]
+
+
+def _csr(edges: list[tuple[int, ...]]) -> tuple[array, array]:
+    offsets = array("I", [0])
+    targets = array("I")
+    for neighbors in edges:
+        targets.extend(sorted(neighbors))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _write_array(path: Path, values: array) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        values.tofile(handle)
+    os.replace(tmp, path)
+
+
+def _read_array(path: Path) -> array:
+    values = array("I")
+    values.frombytes(path.read_bytes())
+    return values
+
+
+class LinkIndex:
+    """Forward and reverse link adjacency over vault items.
+
+    Extracted references are cached per file (by stat signature) in
+    ``state.json``, with resolved edges in CSR form (``offsets`` + ``targets``
+    arrays of node numbers) for both directions. A changed file only
+    re-resolves its own references and those of files whose references
+    could now land elsewhere (found through ``_referrers``); the per-file
+    changes are appended to ``changes.jsonl`` and folded into a full
+    rewrite only once the journal grows past a fraction of the vault.
+    """
+
+    def __init__(self, vault_root: Path) -> None:
+        self.vault_root = vault_root
+        self.directory = vault_root / "vault" / LINK_INDEX_DIR
+        self._files: dict[str, dict[str, Any]] = {}
+        self._nodes: list[LinkNode | None] = []
+        self._numbers: dict[str, int] = {}
+        # "id:<id>" / "name:<casefolded stem or title>" -> nodes claiming it.
+        self._claims: dict[str, tuple[int, ...]] = {}
+        # Lookup key -> nodes with a reference that resolves through it.
+        self._referrers: dict[str, tuple[int, ...]] = {}
+        self._forward: list[tuple[int, ...]] = []
+        self._reverse: list[tuple[int, ...]] = []
+        self._journaled = 0
+        self._state: tuple | None = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            state = json.loads(safe_read_text(self.directory / "state.json"))
+            nodes = [LinkNode(**node) for node in state["nodes"]]
+            forward = (_read_array(self.directory / "forward.offsets"), _read_array(self.directory / "forward.targets"))
+            reverse = (_read_array(self.directory / "reverse.offsets"), _read_array(self.directory / "reverse.targets"))
+        except (OSError, ValueError, KeyError, TypeError):
+            state = None
+        if state is not None and len(forward[0]) == len(nodes) + 1 and len(reverse[0]) == len(nodes) + 1:
+            self._files = state["files"]
+            self._nodes = list(nodes)
+            for number, node in enumerate(nodes):
+                self._numbers[node.path] = number
+                self._claim(number, _claim_keys(node))
+                self._register(number, self._files[node.path]["refs"])
+            self._forward = _rows(forward)
+            self._reverse = _rows(reverse)
+        try:
+            lines = (self.directory / "changes.jsonl").read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                change = json.loads(line)
+                key, info = change["key"], change["file"]
+            except (ValueError, KeyError, TypeError):
+                break  # torn final write; the stat walk re-reads anything missed
+            self._apply(key, info)
+            self._journaled += 1
+
+    def refresh(self, *, force: bool = False) -> bool:
+        state = change_token(self.vault_root)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not force and state is not None and state == self._state:
+                return False
+            changes: dict[str, dict[str, Any] | None] = {}
+            seen: set[str] = set()
+            for path in iter_markdown_files(self.vault_root):
+                key = path.relative_to(self.vault_root).as_posix()
+                seen.add(key)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                cached = self._files.get(key)
+                if not force and cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    continue
+                changes[key] = self._extract(path, stat.st_mtime_ns, stat.st_size)
+            for key in self._files:
+                if key not in seen:
+                    changes[key] = None
+            if force or len(changes) > self._journal_limit():
+                for key, info in changes.items():
+                    if info is None:
+                        del self._files[key]
+                    else:
+                        self._files[key] = info
+                self._resolve()
+                self._save()
+            elif changes:
+                for key, info in changes.items():
+                    self._apply(key, info)
+                self._journal(changes)
+            self._state = state
+            return bool(changes)
+
+    def update(self, path: Path) -> None:
+        """Re-read one file (or drop it if it no longer exists) and patch its edges."""
+        try:
+            key = path.relative_to(self.vault_root).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                info = None
+            else:
+                info = self._extract(path, stat.st_mtime_ns, stat.st_size)
+            if info is None and key not in self._files:
+                return
+            self._apply(key, info)
+            self._journal({key: info})
+
+    def remove(self, path: Path) -> None:
+        self.update(path)
+
+    def mark_current(self) -> None:
+        """Record that change events up to now were applied, so the next
+        query does not re-walk the vault."""
+        with self._lock:
+            self._state = change_token(self.vault_root)
+
+    def _extract(self, path: Path, mtime_ns: int, size: int) -> dict[str, Any]:
+        try:
+            parsed = parse_frontmatter(safe_read_text(path))
+        except Exception:
+            return {"mtime_ns": mtime_ns, "size": size, "id": path.stem, "title": "", "refs": []}
+        fm = parsed.frontmatter
+        return {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "id": str(fm.get("id", "")) or path.stem,
+            "title": str(fm.get("title", "")),
+            "refs": extract_links(parsed.body or "", path, self.vault_root),
+        }
+
+    def _claim(self, number: int, keys: set[str]) -> None:
+        for key in keys:
+            if not key.startswith("path:"):
+                self._claims[key] = self._claims.get(key, ()) + (number,)
+
+    def _unclaim(self, number: int, keys: set[str]) -> None:
+        for key in keys:
+            _discard(self._claims, key, number)
+
+    def _register(self, number: int, refs: list[list[str]]) -> None:
+        for kind, value in refs:
+            for key in _ref_keys(kind, value):
+                current = self._referrers.get(key, ())
+                if number not in current:
+                    self._referrers[key] = current + (number,)
+
+    def _unregister(self, number: int, refs: list[list[str]]) -> None:
+        for kind, value in refs:
+            for key in _ref_keys(kind, value):
+                _discard(self._referrers, key, number)
+
+    def _pick(self, key: str, *, last: bool = False) -> int | None:
+        # Same winners as a full sorted build: the first path claiming a
+        # name, the last path claiming an id.
+        claimants = self._claims.get(key)
+        if not claimants:
+            return None
+        if len(claimants) == 1:
+            return claimants[0]
+        choose = max if last else min
+        return choose(claimants, key=lambda number: self._nodes[number].path)
+
+    def _target(self, kind: str, value: str) -> int | None:
+        if kind == "path":
+            return self._numbers.get(value)
+        target = self._pick("id:" + value, last=True)
+        if target is None and kind == "wiki":
+            target = self._pick("name:" + value.casefold())
+            if target is None:
+                target = self._pick("name:" + Path(value).stem.casefold())
+        return target
+
+    def _targets(self, number: int) -> tuple[int, ...]:
+        targets = {self._target(kind, value) for kind, value in self._files[self._nodes[number].path]["refs"]}
+        targets.discard(None)
+        targets.discard(number)
+        return tuple(sorted(targets))
+
+    def _relink(self, source: int) -> None:
+        old, new = self._forward[source], self._targets(source)
+        if old == new:
+            return
+        for target in set(old).difference(new):
+            self._reverse[target] = tuple(number for number in self._reverse[target] if number != source)
+        for target in set(new).difference(old):
+            self._reverse[target] = tuple(sorted(self._reverse[target] + (source,)))
+        self._forward[source] = new
+
+    def _apply(self, key: str, info: dict[str, Any] | None) -> None:
+        """Replace one file's entry and re-resolve the edges it can affect."""
+        number = self._numbers.get(key)
+        old_claims: set[str] = set()
+        if number is not None:
+            old_claims = _claim_keys(self._nodes[number])
+            self._unregister(number, self._files[key]["refs"])
+        if info is None:
+            if number is None:
+                return
+            del self._files[key]
+            del self._numbers[key]
+            self._unclaim(number, old_claims)
+            for target in self._forward[number]:
+                self._reverse[target] = tuple(source for source in self._reverse[target] if source != number)
+            self._forward[number] = ()
+            self._reverse[number] = ()
+            self._nodes[number] = None
+            changed = old_claims
+        else:
+            self._files[key] = info
+            node = LinkNode(id=info["id"], path=key, title=info["title"])
+            if number is None:
+                number = self._numbers[key] = len(self._nodes)
+                self._nodes.append(node)
+                self._forward.append(())
+                self._reverse.append(())
+            else:
+                self._nodes[number] = node
+            new_claims = _claim_keys(node)
+            self._unclaim(number, old_claims - new_claims)
+            self._claim(number, new_claims - old_claims)
+            self._register(number, info["refs"])
+            changed = old_claims ^ new_claims
+        affected = {number} if info is not None else set()
+        for claim in changed:
+            affected.update(self._referrers.get(claim, ()))
+        for source in affected:
+            if self._nodes[source] is not None:
+                self._relink(source)
+
+    def _resolve(self) -> None:
+        """Renumber live files in path order and resolve every edge."""
+        self._nodes, self._numbers, self._claims, self._referrers = [], {}, {}, {}
+        for key, info in sorted(self._files.items()):
+            number = self._numbers[key] = len(self._nodes)
+            node = LinkNode(id=info["id"], path=key, title=info["title"])
+            self._nodes.append(node)
+            self._claim(number, _claim_keys(node))
+            self._register(number, info["refs"])
+        self._forward = [self._targets(number) for number in range(len(self._nodes))]
+        reverse: list[list[int]] = [[] for _ in self._nodes]
+        for source, targets in enumerate(self._forward):
+            for target in targets:
+                reverse[target].append(source)
+        self._reverse = [tuple(sources) for sources in reverse]
+
+    def _journal_limit(self) -> int:
+        return max(_JOURNAL_MIN, len(self._files) // _JOURNAL_FRACTION)
+
+    def _journal(self, changes: dict[str, dict[str, Any] | None]) -> None:
+        self._journaled += len(changes)
+        if self._journaled > self._journal_limit() or len(self._nodes) > 2 * max(len(self._numbers), 1):
+            self._resolve()
+            self._save()
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with (self.directory / "changes.jsonl").open("a", encoding="utf-8", newline="\n") as handle:
+            for key, info in changes.items():
+                handle.write(json.dumps({"key": key, "file": info}, ensure_ascii=True) + "\n")
+
+    def _save(self) -> None:
+        # Only called right after _resolve(), so node numbers are dense.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        forward, reverse = _csr(self._forward), _csr(self._reverse)
+        _write_array(self.directory / "forward.offsets", forward[0])
+        _write_array(self.directory / "forward.targets", forward[1])
+        _write_array(self.directory / "reverse.offsets", reverse[0])
+        _write_array(self.directory / "reverse.targets", reverse[1])
+        state = {"files": self._files, "nodes": [node.to_dict() for node in self._nodes]}
+        safe_write_text(self.directory / "state.json", json.dumps(state, ensure_ascii=True) + "\n")
+        (self.directory / "changes.jsonl").unlink(missing_ok=True)
+        self._journaled = 0
+
+    def node(self, item_id: str) -> LinkNode | None:
+        number = self._pick("id:" + item_id, last=True)
+        return self._nodes[number] if number is not None else None
+
+    def _adjacent(self, number: int, direction: str) -> list[int]:
+        neighbors: list[int] = []
+        if direction in ("out", "both"):
+            neighbors.extend(self._forward[number])
+        if direction in ("in", "both"):
+            neighbors.extend(self._reverse[number])
+        return neighbors
+
+    def _linked(self, item_id: str, direction: str, refresh: bool) -> list[LinkNode]:
+        if refresh:
+            self.refresh()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            number = self._pick("id:" + item_id, last=True)
+            if number is None:
+                return []
+            return sorted((self._nodes[other] for other in self._adjacent(number, direction)), key=lambda node: node.path)
+
+    def backlinks(self, item_id: str, *, refresh: bool = True) -> list[LinkNode]:
+        return self._linked(item_id, "in", refresh)
+
+    def outlinks(self, item_id: str, *, refresh: bool = True) -> list[LinkNode]:
+        return self._linked(item_id, "out", refresh)
+
+    def neighbors(self, item_id: str, *, depth: int = 1, direction: str = "both") -> list[tuple[LinkNode, int]]:
+        """Breadth-first walk up to ``depth`` hops; returns ``(node, distance)``."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of: {', '.join(DIRECTIONS)}")
+        self.refresh()
+        with self._lock:
+            start = self._pick("id:" + item_id, last=True)
+            if start is None:
+                raise ValueError(f"unknown item id: {item_id}")
+            distances = {start: 0}
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                if distances[current] >= depth:
+                    continue
+                for neighbor in self._adjacent(current, direction):
+                    if neighbor not in distances:
+                        distances[neighbor] = distances[current] + 1
+                        queue.append(neighbor)
+            del distances[start]
+            ordered = sorted(distances.items(), key=lambda pair: (pair[1], self._nodes[pair[0]].path))
+            return [(self._nodes[number], distance) for number, distance in ordered]
+
+
+_indexes: dict[str, LinkIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def link_index(vault_root: Path) -> LinkIndex:
+    key = str(vault_root)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LinkIndex(vault_root)
+    return index
+
+
+def active_link_index(vault_root: Path) -> LinkIndex | None:
+    return _indexes.get(str(vault_root))
+
+
+def record_link_writes(vault_root: Path, *paths: Path) -> None:
+    """Patch the link index after this process wrote (or removed) ``paths``.
+
+    Only an index that is loaded or was persisted by an earlier build is
+    touched, so a vault that never built one pays nothing per write.
+    """
+    index = active_link_index(vault_root)
+    if index is None:
+        directory = vault_root / "vault" / LINK_INDEX_DIR
+        if not ((directory / "state.json").exists() or (directory / "changes.jsonl").exists()):
+            return
+        index = link_index(vault_root)
+    for path in paths:
+        index.update(path)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+TRACE_FRAMES = 25
+SNAPSHOT_SUFFIX = ".tracemalloc"
+SITE_GROUPS = ("module", "line")
+OTHER_SITE = "<other>"
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# tracemalloc's own bookkeeping and import machinery are noise in every snapshot.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def start_tracing(frames: int = TRACE_FRAMES) -> bool:
+    """Start tracemalloc; ``False`` when it was already running."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    return True
+
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+
+
+def take_snapshot(path: Path) -> tracemalloc.Snapshot:
+    """Snapshot the traced allocations and dump them to ``path``."""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("memory tracing is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    snapshot.dump(str(path))
+    return snapshot
+
+
+def load_snapshot(path: Path) -> tracemalloc.Snapshot:
+    return tracemalloc.Snapshot.load(str(path))
+
+
+def _site(traceback: tracemalloc.Traceback, group: str) -> str:
+    # Attribute to the innermost substrate frame, so json/pathlib/yaml
+    # allocations count against the substrate code that asked for them.
+    for frame in reversed(traceback):
+        if frame.filename.startswith(_PACKAGE_DIR):
+            relative = os.path.relpath(frame.filename, os.path.dirname(_PACKAGE_DIR))
+            if group == "line":
+                return f"{relative}:{frame.lineno}"
+            return os.path.splitext(relative)[0].replace(os.sep, ".")
+    return OTHER_SITE
+
+
+def _grouped(snapshot: tracemalloc.Snapshot, group: str) -> dict[str, list[int]]:
+    if group not in SITE_GROUPS:
+        raise ValueError(f"group must be one of: {', '.join(SITE_GROUPS)}")
+    sites: dict[str, list[int]] = {}
+    for stat in snapshot.statistics("traceback"):
+        totals = sites.setdefault(_site(stat.traceback, group), [0, 0])
+        totals[0] += stat.size
+        totals[1] += stat.count
+    return sites
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, *, limit: int = 20, group: str = "module") -> list[dict[str, Any]]:
+    """Largest allocation sites by live bytes."""
+    rows = [
+        {"site": site, "size_bytes": size, "count": count}
+        for site, (size, count) in _grouped(snapshot, group).items()
+    ]
+    rows.sort(key=lambda row: -row["size_bytes"])
+    return rows[:limit]
+
+
+def diff_sites(
+    old: tracemalloc.Snapshot,
+    new: tracemalloc.Snapshot,
+    *,
+    limit: int = 20,
+    group: str = "module",
+) -> list[dict[str, Any]]:
+    """Sites whose live bytes changed most between two snapshots."""
+    before, after = _grouped(old, group), _grouped(new, group)
+    rows = []
+    for site in before.keys() | after.keys():
+        size, count = after.get(site, [0, 0])
+        old_size, old_count = before.get(site, [0, 0])
+        if size == old_size and count == old_count:
+            continue
+        rows.append(
+            {
+                "site": site,
+                "size_bytes": size,
+                "size_diff_bytes": size - old_size,
+                "count": count,
+                "count_diff": count - old_count,
+            }
+        )
+    rows.sort(key=lambda row: -abs(row["size_diff_bytes"]))
+    return rows[:limit]
+
+
+def traced_bytes(snapshot: tracemalloc.Snapshot) -> int:
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+_lock = threading.Lock()
+_previous: tracemalloc.Snapshot | None = None
+_previous_path: Path | None = None
+
+
+def snapshot_and_diff(path: Path, *, limit: int = 20, group: str = "module") -> dict[str, Any]:
+    """Take a snapshot and compare it with the one taken by the previous call."""
+    global _previous, _previous_path
+    with _lock:
+        snapshot = take_snapshot(path)
+        current, peak = tracemalloc.get_traced_memory()
+        payload = {
+            "path": str(path),
+            "previous": str(_previous_path) if _previous_path else None,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": top_sites(snapshot, limit=limit, group=group),
+            "diff": diff_sites(_previous, snapshot, limit=limit, group=group) if _previous is not None else None,
+        }
+        _previous, _previous_path = snapshot, path
+    return payload
+
+
+def forget_snapshots() -> None:
+    global _previous, _previous_path
+    with _lock:
+        _previous, _previous_path = None, None
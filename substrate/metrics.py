@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any
+
+# Seconds; Prometheus' default buckets with finer steps below 10ms.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_requests_total": "API requests by route, method and status",
+    "http_request_duration_seconds": "API request latency by route",
+    "http_requests_in_flight": "API requests currently being handled",
+    "files_read_total": "Markdown files read",
+    "bytes_read_total": "Bytes read from markdown files",
+    "yaml_parse_seconds": "Time spent parsing YAML frontmatter",
+    "ops_log_append_seconds": "Ops log append latency",
+}
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class _Shard:
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: threading.Thread) -> None:
+        self.thread = thread
+        self.counters: dict[_Key, float] = {}
+        # Per-bucket counts (the last slot is +Inf), then sum and count.
+        self.histograms: dict[_Key, list[float]] = {}
+
+
+class Metrics:
+    """Process-wide counters and histograms.
+
+    Each thread updates its own shard without locking; the lock is only
+    taken when a thread first records something and when a scrape merges
+    the shards. Shards of finished threads are folded into ``_retired``.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._retired = _Shard(threading.current_thread())
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0.0] * (len(self.buckets) + 3)
+        values[bisect.bisect_left(self.buckets, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    def _merge(self) -> tuple[dict[_Key, float], dict[_Key, list[float]]]:
+        counters: dict[_Key, float] = {}
+        histograms: dict[_Key, list[float]] = {}
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    retired = self._retired
+                    _fold_into(retired.counters, retired.histograms, shard.counters.copy(), shard.histograms.copy())
+            self._shards = live
+            for shard in [self._retired, *live]:
+                # dict.copy() is atomic under the GIL, so owners keep writing lock-free.
+                _fold_into(counters, histograms, shard.counters.copy(), shard.histograms.copy())
+        return counters, histograms
+
+    def snapshot(self) -> dict[str, Any]:
+        counters, histograms = self._merge()
+        out: dict[str, Any] = {"counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            out["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), values in sorted(histograms.items()):
+            cumulative, running = {}, 0.0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], values[: len(self.buckets) + 1]):
+                running += count
+                cumulative[bound] = int(running)
+            out["histograms"].setdefault(name, []).append(
+                {"labels": dict(labels), "buckets": cumulative, "sum": round(values[-2], 6), "count": int(values[-1])}
+            )
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in [self._retired, *self._shards]:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+
+def _fold_into(
+    counters: dict[_Key, float],
+    histograms: dict[_Key, list[float]],
+    more_counters: dict[_Key, float],
+    more_histograms: dict[_Key, list[float]],
+) -> None:
+    for key, value in more_counters.items():
+        counters[key] = counters.get(key, 0) + value
+    for key, values in more_histograms.items():
+        merged = histograms.get(key)
+        if merged is None:
+            histograms[key] = list(values)
+        else:
+            for idx, value in enumerate(values):
+                merged[idx] += value
+
+
+metrics = Metrics()
+
+
+def _labels(labels: dict[str, Any], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(payload: dict[str, Any], prefix: str = "substrate_") -> str:
+    """Prometheus text exposition (format 0.0.4) of an ``api_metrics`` payload."""
+    lines: list[str] = []
+
+    def _header(name: str, kind: str) -> None:
+        if name in HELP:
+            lines.append(f"# HELP {prefix}{name} {HELP[name]}")
+        lines.append(f"# TYPE {prefix}{name} {kind}")
+
+    for name, series in payload["counters"].items():
+        _header(name, "counter" if name.endswith("_total") else "gauge")
+        lines += [f"{prefix}{name}{_labels(row['labels'])} {_number(row['value'])}" for row in series]
+    for name, series in payload["histograms"].items():
+        _header(name, "histogram")
+        for row in series:
+            for bound, count in row["buckets"].items():
+                le = f'le="{bound}"'
+                lines.append(f"{prefix}{name}_bucket{_labels(row['labels'], le)} {count}")
+            lines.append(f"{prefix}{name}_sum{_labels(row['labels'])} {_number(row['sum'])}")
+            lines.append(f"{prefix}{name}_count{_labels(row['labels'])} {row['count']}")
+    for name, value in payload["gauges"].items():
+        lines.append(f"# TYPE {prefix}{name} gauge")
+        lines.append(f"{prefix}{name} {_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
 import json
+import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Iterable
 
+from .metrics import metrics
+from .perf import span
+from .slow_log import tracked
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class OpsEntry:
     timestamp: str
     op: str
     data: dict[str, Any]
 
+    def to_dict(self) -> dict[str, Any]:
+        return {"timestamp": self.timestamp, "op": self.op, "data": self.data}
+
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -38,8 +47,10 @@ def append_ops_log(vault_root: Path, op: str, data: dict[str, Any]) -> None:
     log_path = log_dir / "ops.jsonl"
 
     entry = OpsEntry(timestamp=utc_now_iso(), op=op, data=data)
-    with log_path.open("a", encoding="utf-8", newline="\n") as handle:
-        handle.write(json.dumps(entry.__dict__, ensure_ascii=True) + "\n")
+    started = time.perf_counter()
+    with span("ops_log"), log_path.open("a", encoding="utf-8", newline="\n") as handle:
+        handle.write(json.dumps(entry.to_dict(), ensure_ascii=True) + "\n")
+    metrics.observe("ops_log_append_seconds", time.perf_counter() - started)
 
 
 def iter_ops_log(vault_root: Path) -> Iterable[OpsEntry]:
@@ -54,19 +65,22 @@ def iter_ops_log(vault_root: Path) -> Iterable[OpsEntry]:
             if not line:
                 continue
             data = json.loads(line)
-            entries.append(OpsEntry(**data))
+            entries.append(OpsEntry(timestamp=data["timestamp"], op=sys.intern(data["op"]), data=data["data"]))
     return entries
 
 
+@tracked("ops_log.tail")
 def tail_ops_log(vault_root: Path, limit: int = 20) -> list[OpsEntry]:
     entries = list(iter_ops_log(vault_root))
     return entries[-limit:]
 
 
+@tracked("ops_log.filter")
 def filter_ops_log(vault_root: Path, op: str) -> list[OpsEntry]:
     return [entry for entry in iter_ops_log(vault_root) if entry.op == op]
 
 
+@tracked("ops_log.since")
 def filter_ops_since(vault_root: Path, since: str) -> list[OpsEntry]:
     try:
         since_dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_CURSOR_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    total: int
+    items: list[T]
+    next_key: tuple | None
+
+
+def cursor_scope(name: str, **params: object) -> str:
+    """Scope string binding a cursor to ``name`` and a digest of ``params``.
+
+    List values are sorted and empty values dropped, so ``status=a,b`` and
+    ``status=b,a`` (or an omitted filter and an empty one) share cursors.
+    """
+    canonical = {
+        key: sorted(value) if isinstance(value, (list, tuple)) else value
+        for key, value in sorted(params.items())
+        if value not in (None, "", [], ())
+    }
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"{name}:{digest}"
+
+
+def encode_cursor(scope: str, key: tuple) -> str:
+    payload = json.dumps({"v": _CURSOR_VERSION, "s": scope, "k": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> tuple:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(data, dict) or data.get("v") != _CURSOR_VERSION or not isinstance(data.get("k"), list):
+        raise ValueError("invalid cursor")
+    if data.get("s") != scope:
+        raise ValueError("cursor does not match request")
+    return tuple(data["k"])
+
+
+def _is_after(key: tuple, after: tuple, reverse: bool) -> bool:
+    return key < after if reverse else key > after
+
+
+def select_page(
+    items: Iterable[T],
+    *,
+    key: Callable[[T], tuple],
+    reverse: bool,
+    offset: int = 0,
+    limit: int | None = None,
+    after: tuple | None = None,
+) -> Page[T]:
+    """Return one page of ``items`` ordered by ``key``.
+
+    Keys must be unique (callers append the path as a tiebreaker) so that a
+    cursor identifies exactly one position. When ``limit`` is set only the
+    first ``offset + limit`` entries are kept in a bounded heap instead of
+    sorting the full result set.
+    """
+    total = 0
+    remaining = 0
+
+    def _candidates() -> Iterable[T]:
+        nonlocal total, remaining
+        for item in items:
+            total += 1
+            if after is not None:
+                try:
+                    if not _is_after(key(item), after, reverse):
+                        continue
+                except TypeError as exc:
+                    raise ValueError("invalid cursor") from exc
+            remaining += 1
+            yield item
+
+    if limit is None:
+        ordered = sorted(_candidates(), key=key, reverse=reverse)
+        window = ordered[offset:]
+    else:
+        k = max(offset, 0) + max(limit, 0)
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        window = select(k, _candidates(), key=key)[offset:]
+
+    next_key = None
+    if window and remaining > offset + len(window):
+        next_key = key(window[-1])
+    return Page(total=total, items=window, next_key=next_key)
+
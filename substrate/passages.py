@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+from array import array
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cache import bump_generation, change_token
+from .chunks import Chunk, chunk_text
+from .embedding_store import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, EmbeddingJobResult
+from .embeddings import Embedder, default_embedder
+from .config import load_config
+from .hybrid import FusionWeights, rrf_scores
+from .io import normalize_text, parse_frontmatter, safe_read_raw_text
+from .semantic import vector_hits
+from .vault import iter_markdown_files
+from .vector_index import build_vector_index
+
+PASSAGE_INDEX = "passages"
+RETRIEVE_MODES = ("lexical", "semantic", "hybrid")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rebuild postings once this fraction of chunk ids belongs to removed files.
+_COMPACT_RATIO = 0.5
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+@dataclass(frozen=True)
+class Passage:
+    id: str
+    path: Path
+    title: str
+    status: str
+    privacy: str
+    text: str
+    score: float
+    citation: dict[str, int]
+
+
+@dataclass(frozen=True)
+class _ChunkedDoc:
+    path: Path
+    mtime_ns: int
+    size: int
+    title: str
+    status: str
+    privacy: str
+    chunks: list[Chunk]
+
+
+def _chunk_file(path: Path) -> _ChunkedDoc | None:
+    try:
+        stat = path.stat()
+        raw = safe_read_raw_text(path)
+        text = normalize_text(raw)
+        parsed = parse_frontmatter(text)
+    except Exception:
+        return None
+    fm = parsed.frontmatter
+    body_start = len(text) - len(parsed.body or "")
+    doc_id = str(fm.get("id", "")) or path.stem
+    return _ChunkedDoc(
+        path=path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        title=str(fm.get("title", "")),
+        status=str(fm.get("status", "")),
+        privacy=str(fm.get("privacy", "")),
+        chunks=chunk_text(text, body_start, doc_id, raw=raw, daily=fm.get("type") == "daily"),
+    )
+
+
+def iter_chunked_documents(vault_root: Path) -> Iterator[_ChunkedDoc]:
+    for path in iter_markdown_files(vault_root):
+        doc = _chunk_file(path)
+        if doc is not None:
+            yield doc
+
+
+def read_passage(path: Path, chunk_id: str, byte_start: int, byte_end: int) -> str | None:
+    """Passage text at the cited span, or None if the file no longer matches."""
+    try:
+        with path.open("rb") as handle:
+            handle.seek(byte_start)
+            text = normalize_text(handle.read(byte_end - byte_start).decode("utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return None
+    digest = chunk_id.split("#", 1)[-1].split("-", 1)[0]
+    if hashlib.sha1(text.encode("utf-8")).hexdigest()[:16] != digest:
+        return None
+    return text
+
+
+class PassageIndex:
+    """In-memory BM25 postings over passages of every vault file.
+
+    Kept fresh the same way as the trigram index: files are re-chunked by
+    stat signature whenever the vault generation or directory signature moves.
+    Passage text is not held in memory; results are read back from the cited
+    byte span.
+    """
+
+    def __init__(self, vault_root: Path) -> None:
+        self.vault_root = vault_root
+        self._docs: dict[str, _ChunkedDoc] = {}
+        self._doc_chunks: dict[str, range] = {}
+        self._chunks: list[tuple[Chunk, _ChunkedDoc] | None] = []
+        self._lengths = array("I")
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._live = 0
+        self._total_length = 0
+        self._state: tuple | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def refresh(self, *, force: bool = False) -> bool:
+        state = change_token(self.vault_root)
+        with self._lock:
+            if not force and state is not None and state == self._state:
+                return False
+            seen: set[str] = set()
+            for path in iter_markdown_files(self.vault_root):
+                key = str(path)
+                seen.add(key)
+                doc = self._docs.get(key)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if doc is not None and doc.mtime_ns == stat.st_mtime_ns and doc.size == stat.st_size:
+                    continue
+                self.update(path)
+            for key in [key for key in self._docs if key not in seen]:
+                self.remove(Path(key))
+            self._state = state
+            return True
+
+    def update(self, path: Path) -> None:
+        with self._lock:
+            self.remove(path)
+            doc = _chunk_file(path)
+            if doc is not None:
+                self._add(doc)
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            if self._docs.pop(str(path), None) is None:
+                return
+            for chunk_id in self._doc_chunks.pop(str(path)):
+                self._chunks[chunk_id] = None
+                self._live -= 1
+                self._total_length -= self._lengths[chunk_id]
+            if len(self._chunks) - self._live > len(self._chunks) * _COMPACT_RATIO:
+                self._rebuild()
+
+    def _add(self, doc: _ChunkedDoc) -> None:
+        meta = replace(doc, chunks=[])
+        self._docs[str(doc.path)] = meta
+        self._doc_chunks[str(doc.path)] = range(len(self._chunks), len(self._chunks) + len(doc.chunks))
+        for chunk in doc.chunks:
+            chunk_id = len(self._chunks)
+            tokens = tokenize(chunk.text)
+            self._chunks.append((replace(chunk, text=""), meta))
+            self._lengths.append(len(tokens))
+            self._live += 1
+            self._total_length += len(tokens)
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = (array("I"), array("I"))
+                posting[0].append(chunk_id)
+                posting[1].append(count)
+
+    def _rebuild(self) -> None:
+        docs = list(self._docs.values())
+        self._docs = {}
+        self._doc_chunks = {}
+        self._chunks = []
+        self._lengths = array("I")
+        self._postings = {}
+        self._live = 0
+        self._total_length = 0
+        for doc in docs:
+            fresh = _chunk_file(doc.path)
+            if fresh is not None:
+                self._add(fresh)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        *,
+        status: list[str] | None = None,
+        privacy: list[str] | None = None,
+    ) -> list[tuple[Chunk, _ChunkedDoc, float]]:
+        self.refresh()
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._live:
+                return []
+            avg_length = self._total_length / self._live
+            scores: dict[int, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                ids, tfs = posting
+                idf = math.log(1 + (self._live - len(ids) + 0.5) / (len(ids) + 0.5))
+                for chunk_id, tf in zip(ids, tfs):
+                    if self._chunks[chunk_id] is None:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            # Case-insensitive, like the query language's field clauses.
+            allowed_status = {value.casefold() for value in status or ()}
+            allowed_privacy = {value.casefold() for value in privacy or ()}
+            ranked = []
+            for chunk_id, score in sorted(scores.items(), key=lambda pair: -pair[1]):
+                chunk, doc = self._chunks[chunk_id]  # type: ignore[misc]
+                if allowed_status and doc.status.casefold() not in allowed_status:
+                    continue
+                if allowed_privacy and doc.privacy.casefold() not in allowed_privacy:
+                    continue
+                ranked.append((chunk, doc, score))
+                if len(ranked) >= k:
+                    break
+            return ranked
+
+
+_indexes: dict[str, PassageIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def passage_index(vault_root: Path) -> PassageIndex:
+    key = str(vault_root)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PassageIndex(vault_root)
+    return index
+
+
+def active_passage_index(vault_root: Path) -> PassageIndex | None:
+    return _indexes.get(str(vault_root))
+
+
+def passage_texts(path: Path) -> list[str]:
+    """Chunk texts of one file, as the passage vector index embeds them."""
+    doc = _chunk_file(path)
+    return [chunk.text for chunk in doc.chunks] if doc is not None else []
+
+
+def _passage_records(vault_root: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    for doc in iter_chunked_documents(vault_root):
+        for chunk in doc.chunks:
+            yield chunk.text, {
+                "key": chunk.id,
+                "path": doc.path.relative_to(vault_root).as_posix(),
+                "mtime_ns": doc.mtime_ns,
+                "size": doc.size,
+                "title": doc.title,
+                "status": doc.status,
+                "privacy": doc.privacy,
+                **chunk.citation(),
+            }
+
+
+def build_passage_vectors(
+    vault_root: Path,
+    *,
+    embedder: Embedder | None = None,
+    nlist: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> EmbeddingJobResult:
+    """Embed every passage and rebuild the passage vector index."""
+    result = build_vector_index(
+        vault_root,
+        PASSAGE_INDEX,
+        _passage_records(vault_root),
+        embedder or default_embedder(),
+        nlist=nlist,
+        batch_size=batch_size,
+        workers=workers,
+    )
+    bump_generation()
+    return result
+
+
+def retrieve_passages(
+    vault_root: Path,
+    query: str,
+    *,
+    k: int = 10,
+    mode: str = "lexical",
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+    weights: FusionWeights | None = None,
+) -> list[Passage]:
+    """Top-k passages with citation spans, re-read from the files they cite."""
+    if mode not in RETRIEVE_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(RETRIEVE_MODES)}")
+    pool = k if mode != "hybrid" else max(k * 4, 50)
+    candidates: dict[str, Passage] = {}
+    rankings: list[list[str]] = []
+    if mode in ("lexical", "hybrid"):
+        ranked = []
+        for chunk, doc, score in passage_index(vault_root).search(query, pool, status=status, privacy=privacy):
+            ranked.append(chunk.id)
+            candidates.setdefault(
+                chunk.id,
+                Passage(chunk.id, doc.path, doc.title, doc.status, doc.privacy, "", round(score, 6), chunk.citation()),
+            )
+        rankings.append(ranked)
+    if mode in ("semantic", "hybrid"):
+        _, hits = vector_hits(vault_root, PASSAGE_INDEX, query, pool, status=status, privacy=privacy)
+        ranked = []
+        for hit in hits:
+            meta = hit.meta
+            ranked.append(hit.key)
+            candidates.setdefault(
+                hit.key,
+                Passage(
+                    id=hit.key,
+                    path=vault_root / str(meta["path"]),
+                    title=str(meta.get("title", "")),
+                    status=str(meta.get("status", "")),
+                    privacy=str(meta.get("privacy", "")),
+                    text="",
+                    score=round(hit.score, 6),
+                    citation={field: int(meta[field]) for field in ("byte_start", "byte_end", "line_start", "line_end")},
+                ),
+            )
+        rankings.append(ranked)
+
+    if mode == "hybrid":
+        weights = weights or FusionWeights.from_config(load_config(vault_root))
+        fused = rrf_scores([(rankings[0], weights.lexical), (rankings[1], weights.semantic)], k=weights.k)
+        order = sorted(fused, key=lambda key: (-fused[key], key))
+    else:
+        order = rankings[0]
+    passages: list[Passage] = []
+    for key in order:
+        passage = candidates[key]
+        text = read_passage(passage.path, passage.id, passage.citation["byte_start"], passage.citation["byte_end"])
+        if text is None:
+            continue
+        score = round(fused[key], 6) if mode == "hybrid" else passage.score
+        passages.append(replace(passage, text=text, score=score))
+        if len(passages) >= k:
+            break
+    return passages
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+PERF_LOG = "perf.jsonl"
+
+
+class Timings:
+    """Span durations collected for one request or command, summed per name."""
+
+    __slots__ = ("started", "spans")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: dict[str, list[float]] = {}
+
+    def add(self, name: str, elapsed: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms(), 3),
+            "spans": {
+                name: {"ms": round(elapsed * 1000, 3), "count": int(count)}
+                for name, (elapsed, count) in self.spans.items()
+            },
+        }
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value; nested spans overlap, ``total`` is wall time."""
+        parts = [
+            f'{name};dur={elapsed * 1000:.2f};desc="{int(count)}x"' for name, (elapsed, count) in self.spans.items()
+        ]
+        parts.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Timings | None] = ContextVar("substrate_timings", default=None)
+
+
+class _Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: Timings, name: str) -> None:
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str) -> _Span | _NoSpan:
+    """Time a block into the active collector; a shared no-op when none is active."""
+    timings = _current.get()
+    if timings is None:
+        return _NO_SPAN
+    return _Span(timings, name)
+
+
+def current_timings() -> Timings | None:
+    return _current.get()
+
+
+@contextmanager
+def collect() -> Iterator[Timings]:
+    """Collect spans from this context (and threads started from a copy of it)."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+_log_lock = threading.Lock()
+
+
+def append_perf_log(vault_root: Path, op: str, timings: Timings, data: dict[str, Any] | None = None) -> None:
+    """Append one record to ``vault/_system/logs/perf.jsonl``."""
+    log_dir = vault_root / "vault" / "_system" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "op": op, **timings.to_dict(), "data": data or {}}
+    line = json.dumps(entry, ensure_ascii=True) + "\n"
+    with _log_lock, (log_dir / PERF_LOG).open("a", encoding="utf-8", newline="\n") as handle:
+        handle.write(line)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from .memory import (
+    SNAPSHOT_SUFFIX,
+    TRACE_FRAMES,
+    forget_snapshots,
+    snapshot_and_diff,
+    start_tracing,
+    stop_tracing,
+    take_snapshot,
+)
+
+PROFILE_MODES = ("cprofile", "sample", "memory")
+DEFAULT_SAMPLE_INTERVAL = 0.005
+DEFAULT_CAPTURE_SECONDS = 10
+MAX_CAPTURE_SECONDS = 300
+
+# Leaf frames of threads that are blocked waiting for work; sampling them
+# would bury the request stacks under idle server threads.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("socketserver.py", "serve_forever"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def profiles_dir(vault_root: Path) -> Path:
+    return vault_root / "vault" / "_system" / "logs" / "profiles"
+
+
+def _profile_path(directory: Path, label: str, suffix: str) -> Path:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{stamp}-{label}{suffix}"
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    parent, name = os.path.split(code.co_filename)
+    return f"{os.path.basename(parent)}/{name}:{code.co_name}"
+
+
+class StackSampler:
+    """Samples the Python stacks of other threads every ``interval`` seconds.
+
+    Stacks are aggregated in collapsed form (``root;...;leaf count``), the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL, threads: set[int] | None = None) -> None:
+        self.interval = interval
+        self.threads = threads
+        self.counts: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me or (self.threads is not None and ident not in self.threads):
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float | None = None) -> None:
+        deadline = time.monotonic() + seconds if seconds is not None else None
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+    def start(self) -> StackSampler:
+        self._thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def write(self, path: Path) -> Path:
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
+
+
+def profile_call(
+    directory: Callable[[], Path], label: str, mode: str, func: Callable[[], Any]
+) -> tuple[Any, Path]:
+    """Run ``func`` under cProfile (``.prof``), the stack sampler (``.collapsed``)
+    or tracemalloc (a ``.tracemalloc`` snapshot of what is still live at the end).
+
+    ``directory`` is resolved after ``func`` returns, so commands that
+    create the vault can profile into it.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"profile mode must be one of: {', '.join(PROFILE_MODES)}")
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func)
+        finally:
+            path = _profile_path(directory(), label, ".prof")
+            profiler.dump_stats(str(path))
+        return result, path
+    if mode == "memory":
+        started = start_tracing(TRACE_FRAMES)
+        try:
+            result = func()
+        finally:
+            path = _profile_path(directory(), label, SNAPSHOT_SUFFIX)
+            take_snapshot(path)
+            if started:
+                stop_tracing()
+        return result, path
+    sampler = StackSampler(threads={threading.get_ident()}).start()
+    try:
+        result = func()
+    finally:
+        sampler.stop()
+        path = sampler.write(_profile_path(directory(), label, ".collapsed"))
+    return result, path
+
+
+_capture_lock = threading.Lock()
+_capture: threading.Thread | None = None
+
+
+def start_capture(
+    vault_root: Path,
+    seconds: float = DEFAULT_CAPTURE_SECONDS,
+    *,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+    on_done: Callable[[Path, StackSampler], None] | None = None,
+) -> Path:
+    """Sample every thread of this process for ``seconds`` in the background.
+
+    Returns the ``.collapsed`` path, written when the capture ends. Raises
+    ``RuntimeError`` while another capture is still running.
+    """
+    global _capture
+    if not 1 <= seconds <= MAX_CAPTURE_SECONDS:
+        raise ValueError(f"seconds must be between 1 and {MAX_CAPTURE_SECONDS}")
+    path = _profile_path(profiles_dir(vault_root), "server", ".collapsed")
+    sampler = StackSampler(interval)
+
+    def _run() -> None:
+        sampler.run(seconds)
+        sampler.write(path)
+        if on_done is not None:
+            on_done(path, sampler)
+
+    with _capture_lock:
+        if _capture is not None and _capture.is_alive():
+            raise RuntimeError("a profile capture is already running")
+        _capture = threading.Thread(target=_run, name="profile-capture", daemon=True)
+        _capture.start()
+    return path
+
+
+def capture_memory(vault_root: Path, *, limit: int = 20, group: str = "module") -> dict[str, Any]:
+    """Snapshot this process's traced allocations, starting tracemalloc on first use.
+
+    The first call only establishes a baseline; later calls also diff
+    against the previous snapshot.
+    """
+    if start_tracing(TRACE_FRAMES):
+        return {"status": "tracing", "frames": TRACE_FRAMES}
+    path = _profile_path(profiles_dir(vault_root), "server", SNAPSHOT_SUFFIX)
+    return {"status": "snapshot", **snapshot_and_diff(path, limit=limit, group=group)}
+
+
+def stop_memory_capture() -> None:
+    if tracemalloc.is_tracing():
+        stop_tracing()
+    forget_snapshots()
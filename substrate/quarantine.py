@@ -5,17 +5,26 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+from .cache import bump_generation
 from .constants import QUARANTINE_DIR
 from .ulid import new_ulid
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QuarantineEntry:
     id: str
     original_path: str
     reason: str
     timestamp: str
 
+    def to_dict(self) -> dict[str, str]:
+        return {
+            "id": self.id,
+            "original_path": self.original_path,
+            "reason": self.reason,
+            "timestamp": self.timestamp,
+        }
+
 
 def quarantine_file(vault_root: Path, file_path: Path, reason: str) -> QuarantineEntry:
     vault_root = vault_root.expanduser().resolve()
@@ -30,6 +39,7 @@ def quarantine_file(vault_root: Path, file_path: Path, reason: str) -> Quarantin
 
     target = qdir / file_path.name
     file_path.replace(target)
+    bump_generation()
 
     entry = QuarantineEntry(
         id=qid,
@@ -37,7 +47,7 @@ def quarantine_file(vault_root: Path, file_path: Path, reason: str) -> Quarantin
         reason=reason,
         timestamp=datetime.now(timezone.utc).isoformat(),
     )
-    (qdir / "meta.json").write_text(json.dumps(entry.__dict__, indent=2), encoding="utf-8")
+    (qdir / "meta.json").write_text(json.dumps(entry.to_dict(), indent=2), encoding="utf-8")
     return entry
 
 
@@ -71,4 +81,5 @@ def restore_quarantined(vault_root: Path, qid: str, destination: Path | None = N
         raise RuntimeError("Expected exactly one quarantined file")
 
     quarantined_files[0].replace(dest)
+    bump_generation()
     return dest
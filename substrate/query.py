@@ -0,0 +1,139 @@
+"""Search query language.
+
+    tag:travel type:photo created:2024-01..2024-06 -privacy:sensitive "exact phrase"
+
+Clauses are ANDed. ``field:a,b`` matches either value, a leading ``-`` negates
+a clause, quoted text is a phrase, and anything else is a case-folded
+substring that must occur in the title or body. ``created``/``updated`` take a
+prefix (``2024-03``) or an inclusive range (``2024-01..2024-06``, either side
+optional). Unknown ``field:value`` pairs are searched as literal text.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+TEXT = "text"
+
+# Exact-match fields, compared case-insensitively.
+KEYWORD_FIELDS = {"status", "privacy", "type", "id", "tag"}
+DATE_FIELDS = {"created", "updated"}
+FIELD_ALIASES = {"tags": "tag", "is": "status"}
+FIELDS = KEYWORD_FIELDS | DATE_FIELDS | {"title"}
+
+
+@dataclass(frozen=True)
+class Clause:
+    field: str
+    values: tuple[str, ...]
+    negated: bool = False
+    low: str | None = None
+    high: str | None = None
+
+    def describe(self) -> str:
+        prefix = "-" if self.negated else ""
+        if self.field in DATE_FIELDS:
+            if self.low == self.high:
+                return f"{prefix}{self.field}:{self.low}"
+            return f"{prefix}{self.field}:{self.low or ''}..{self.high or ''}"
+        if self.field == TEXT:
+            value = self.values[0]
+            return prefix + (f'"{value}"' if " " in value else value)
+        return f"{prefix}{self.field}:{','.join(self.values)}"
+
+    def matches_value(self, value: str) -> bool:
+        """Evaluate the (non-negated) predicate against one field value."""
+        if self.field in DATE_FIELDS:
+            if self.low is not None and value[: len(self.low)] < self.low:
+                return False
+            if self.high is not None and value[: len(self.high)] > self.high:
+                return False
+            return bool(value)
+        folded = value.casefold()
+        if self.field in (TEXT, "title"):
+            return self.values[0] in folded
+        return folded in self.values
+
+
+@dataclass(frozen=True)
+class Query:
+    clauses: tuple[Clause, ...]
+
+    @property
+    def text_terms(self) -> list[str]:
+        return [clause.values[0] for clause in self.clauses if clause.field == TEXT and not clause.negated]
+
+    def is_empty(self) -> bool:
+        return not self.clauses
+
+    def with_filters(self, *, status: list[str] | None = None, privacy: list[str] | None = None) -> Query:
+        extra = []
+        if status:
+            extra.append(Clause(field="status", values=tuple(value.casefold() for value in status)))
+        if privacy:
+            extra.append(Clause(field="privacy", values=tuple(value.casefold() for value in privacy)))
+        return Query(clauses=self.clauses + tuple(extra))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"clauses": [clause.describe() for clause in self.clauses]}
+
+
+def _tokenize(text: str) -> list[tuple[str, bool]]:
+    """Split on whitespace, keeping quoted sections together.
+
+    Returns ``(token, quoted)`` pairs; for ``field:"a b"`` the quotes are
+    removed but the token is not flagged as a bare phrase.
+    """
+    tokens: list[tuple[str, bool]] = []
+    buf: list[str] = []
+    quoted = False
+    in_quotes = False
+    for char in text:
+        if char == '"':
+            in_quotes = not in_quotes
+            if not buf or buf == ["-"]:
+                quoted = True
+            continue
+        if char.isspace() and not in_quotes:
+            if buf:
+                tokens.append(("".join(buf), quoted))
+            buf = []
+            quoted = False
+            continue
+        buf.append(char)
+    if buf:
+        tokens.append(("".join(buf), quoted))
+    return tokens
+
+
+def _parse_date(field: str, value: str, negated: bool) -> Clause:
+    if ".." in value:
+        low, high = value.split("..", 1)
+    else:
+        low = high = value
+    return Clause(field=field, values=(value,), negated=negated, low=low or None, high=high or None)
+
+
+def parse_query(text: str) -> Query:
+    clauses: list[Clause] = []
+    for token, quoted in _tokenize(text):
+        negated = False
+        if token.startswith("-") and len(token) > 1:
+            negated = True
+            token = token[1:]
+        if not quoted and ":" in token:
+            name, _, value = token.partition(":")
+            field = FIELD_ALIASES.get(name.casefold(), name.casefold())
+            if field in FIELDS and value:
+                if field in DATE_FIELDS:
+                    clauses.append(_parse_date(field, value, negated))
+                elif field == "title":
+                    clauses.append(Clause(field=field, values=(value.casefold(),), negated=negated))
+                else:
+                    values = tuple(part.casefold() for part in value.split(",") if part)
+                    clauses.append(Clause(field=field, values=values, negated=negated))
+                continue
+        if token:
+            clauses.append(Clause(field=TEXT, values=(token.casefold(),), negated=negated))
+    return Query(clauses=tuple(clauses))
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+try:
+    import blake3  # type: ignore
+except Exception:  # pragma: no cover - dependency guard
+    blake3 = None
+
+from .io import safe_write_text
+from .ops_log import utc_now_iso
+
+HASH_CHUNK_BYTES = 1 << 20
+MAX_EXTENSION_LEN = 16
+
+
+def hash_algorithm() -> str:
+    """``blake3`` when the package is installed, else ``sha256``."""
+    return "blake3" if blake3 is not None else "sha256"
+
+
+def hash_file(path: Path, algorithm: str | None = None) -> tuple[str, int]:
+    """Stream ``path`` through the hash in fixed-size chunks; returns (hex, size)."""
+    algorithm = algorithm or hash_algorithm()
+    if algorithm == "blake3":
+        if blake3 is None:
+            raise RuntimeError("blake3 is required for blake3 hashing")
+        hasher = blake3.blake3()
+    else:
+        hasher = hashlib.new(algorithm)
+    size = 0
+    buffer = bytearray(HASH_CHUNK_BYTES)
+    view = memoryview(buffer)
+    with path.open("rb") as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+            size += read
+    return hasher.hexdigest(), size
+
+
+def raw_dir(vault_root: Path, algorithm: str, digest: str) -> Path:
+    return vault_root / "raw" / algorithm / digest[:2] / digest
+
+
+def _extension(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if len(suffix) > MAX_EXTENSION_LEN or not suffix[1:].isalnum():
+        return ""
+    return suffix
+
+
+@dataclass(frozen=True)
+class IngestRecord:
+    source: str
+    hash: str
+    size: int
+    stored: str
+    copied: bool
+
+
+@dataclass
+class IngestReport:
+    algorithm: str
+    files: int = 0
+    copied: int = 0
+    skipped: int = 0
+    bytes_hashed: int = 0
+    bytes_copied: int = 0
+    seconds: float = 0.0
+    errors: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_hashed / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "algorithm": self.algorithm,
+            "files": self.files,
+            "copied": self.copied,
+            "skipped": self.skipped,
+            "bytes_hashed": self.bytes_hashed,
+            "bytes_copied": self.bytes_copied,
+            "seconds": round(self.seconds, 3),
+            "mb_per_s": round(self.mb_per_s, 2),
+            "errors": self.errors,
+        }
+
+
+def iter_source_files(sources: Iterable[Path]) -> Iterator[Path]:
+    """Regular files under ``sources`` (files or directories), depth-first, sorted."""
+    for source in sources:
+        if source.is_file():
+            yield source
+            continue
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                path = Path(root) / name
+                if path.is_file() and not path.is_symlink():
+                    yield path
+
+
+def _hash_job(path: str, algorithm: str) -> tuple[str, str, int]:
+    digest, size = hash_file(Path(path), algorithm)
+    return path, digest, size
+
+
+def read_raw_meta(vault_root: Path, algorithm: str, digest: str) -> dict | None:
+    meta_path = raw_dir(vault_root, algorithm, digest) / "meta.json"
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def write_raw_meta(vault_root: Path, meta: dict) -> None:
+    meta_path = raw_dir(vault_root, meta["algorithm"], meta["hash"]) / "meta.json"
+    safe_write_text(meta_path, json.dumps(meta, indent=2) + "\n")
+
+
+def archive_file(vault_root: Path, source: Path, algorithm: str, digest: str, size: int) -> IngestRecord:
+    """Copy an already-hashed file into the archive unless its hash is present."""
+    target_dir = raw_dir(vault_root, algorithm, digest)
+    meta = read_raw_meta(vault_root, algorithm, digest)
+    if meta is not None:
+        if str(source) not in meta.get("sources", []):
+            meta.setdefault("sources", []).append(str(source))
+            write_raw_meta(vault_root, meta)
+        return IngestRecord(str(source), digest, size, str(target_dir / meta["stored"]), copied=False)
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stored = f"original{_extension(source)}"
+    tmp = target_dir / f"{stored}.{os.getpid()}-{threading.get_ident()}.part"
+    shutil.copyfile(source, tmp)
+    os.replace(tmp, target_dir / stored)
+    meta = {
+        "hash": digest,
+        "algorithm": algorithm,
+        "size": size,
+        "stored": stored,
+        "original_name": source.name,
+        "sources": [str(source)],
+        "ingested": utc_now_iso(),
+    }
+    # meta.json is written last: its presence marks a complete object.
+    write_raw_meta(vault_root, meta)
+    return IngestRecord(str(source), digest, size, str(target_dir / stored), copied=True)
+
+
+def ingest_files(
+    vault_root: Path,
+    sources: Iterable[Path],
+    *,
+    workers: int | None = None,
+    on_record: Callable[[IngestRecord], None] | None = None,
+) -> IngestReport:
+    """Copy files into the content-addressed raw archive.
+
+    Files are hashed in a process pool (streamed, never loaded whole) with a
+    bounded number of in-flight jobs, so arbitrarily large imports run in
+    constant memory. Content already in the archive is not copied again.
+    """
+    algorithm = hash_algorithm()
+    report = IngestReport(algorithm=algorithm)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    files = iter_source_files(sources)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running: set[Future] = set()
+        exhausted = False
+        while running or not exhausted:
+            while not exhausted and len(running) < workers * 4:
+                path = next(files, None)
+                if path is None:
+                    exhausted = True
+                    break
+                future = pool.submit(_hash_job, str(path), algorithm)
+                future.source = path  # type: ignore[attr-defined]
+                running.add(future)
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                source: Path = future.source  # type: ignore[attr-defined]
+                report.files += 1
+                try:
+                    _, digest, size = future.result()
+                    record = archive_file(vault_root, source, algorithm, digest, size)
+                except (OSError, ValueError) as exc:
+                    report.errors.append({"source": str(source), "error": str(exc)})
+                    continue
+                report.bytes_hashed += size
+                if record.copied:
+                    report.copied += 1
+                    report.bytes_copied += size
+                else:
+                    report.skipped += 1
+                if on_record is not None:
+                    on_record(record)
+    report.seconds = time.perf_counter() - started
+    return report
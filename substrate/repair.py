@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Iterable
+from typing import Optional
 
+from .cache import bump_generation
 from .constants import DEFAULT_SCHEMA_PATH
 from .io import FrontmatterError, dump_frontmatter, parse_frontmatter, safe_read_text, safe_write_text
 from .quarantine import QuarantineEntry, quarantine_file
 from .schema import load_schema, validate_frontmatter
+from .slow_log import tracked
+from .vault import iter_markdown_tree
 
 
 @dataclass(frozen=True)
@@ -18,6 +21,7 @@ class RepairResult:
     quarantined: Optional[QuarantineEntry] = None
 
 
+@tracked("repair.file")
 def repair_file(
     vault_root: Path,
     file_path: Path,
@@ -49,22 +53,19 @@ def repair_file(
     if normalized != text:
         if not dry_run:
             safe_write_text(file_path, normalized)
+            bump_generation()
         return RepairResult(path=file_path, action="normalized", errors=[])
 
     return RepairResult(path=file_path, action="unchanged", errors=[])
 
 
-def _iter_markdown_files(root: Path, include_patterns: list[str]) -> Iterable[Path]:
-    seen: set[str] = set()
-    for pattern in include_patterns:
-        for path in sorted(root.rglob(pattern)):
-            if not path.is_file():
-                continue
-            key = str(path)
-            if key in seen:
-                continue
-            seen.add(key)
-            yield path
+def _iter_markdown_files(root: Path, include_patterns: list[str]) -> list[Path]:
+    # Listed up front so files quarantined during the run are not revisited.
+    return [
+        path
+        for path in iter_markdown_tree(root)
+        if any(path.relative_to(root).match(pattern) for pattern in include_patterns)
+    ]
 
 
 def repair_tree(
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, Iterator
 
+from .catalog import CODED_FIELDS, Catalog
 from .io import parse_frontmatter, safe_read_text
+from .perf import span
+from .query import TEXT, Clause, Query, parse_query
+from .slow_log import tracked
+from .snippets import build_snippet, find_term_offsets
+from .text_index import POSTING_FIELDS, TrigramIndex
+from .vault import iter_markdown_files
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchResult:
     path: Path
     title: str
@@ -16,82 +26,312 @@ class SearchResult:
     privacy: str
     updated: str
     snippet: str
-    score: int
+    score: float
+    highlights: tuple[tuple[int, int], ...] = ()
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "title": self.title,
+            "type": self.type,
+            "status": self.status,
+            "privacy": self.privacy,
+            "updated": self.updated,
+            "snippet": self.snippet,
+            "highlights": [list(span) for span in self.highlights],
+            "score": self.score,
+        }
 
-def _iter_markdown_files(vault_root: Path) -> Iterable[Path]:
-    roots = [
-        vault_root / "vault" / "inbox",
-        vault_root / "vault" / "items",
-        vault_root / "vault" / "daily",
-    ]
-    for root in roots:
-        if not root.exists():
+
+class CancelToken:
+    """Thread-safe flag checked by long-running scans between documents."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@dataclass
+class PlanStage:
+    stage: str
+    clauses: list[str]
+    estimate: int | None = None
+    output: int = 0
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "clauses": self.clauses,
+            "estimate": self.estimate,
+            "output": self.output,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+        }
+
+
+@dataclass
+class SearchStats:
+    scanned: int = 0
+    partial: bool = False
+    plan: list[PlanStage] = field(default_factory=list)
+
+
+def _should_stop(deadline: float | None, cancel: CancelToken | None) -> bool:
+    if cancel is not None and cancel.cancelled:
+        return True
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _values(source: Any, name: str) -> list[str]:
+    """Field values from a frontmatter dict or an IndexedDoc."""
+    if isinstance(source, dict):
+        if name == "tag":
+            tags = source.get("tags")
+            if isinstance(tags, list):
+                return [str(tag) for tag in tags]
+            return [str(tags)] if tags else []
+        return [str(source.get(name, ""))]
+    if name == "tag":
+        return list(source.tags)
+    return [str(getattr(source, name))]
+
+
+def clause_holds(clause: Clause, source: Any) -> bool:
+    matched = any(clause.matches_value(value) for value in _values(source, clause.field))
+    return matched != clause.negated
+
+
+def _index_estimate(index: TrigramIndex, clause: Clause) -> int | None:
+    """Estimated candidates for clauses the index can answer, else None."""
+    if clause.negated:
+        return None
+    if clause.field == TEXT:
+        return index.text_estimate(clause.values[0])
+    if clause.field in POSTING_FIELDS:
+        return index.field_estimate(clause.field, clause.values)
+    return None
+
+
+def _index_ids(index: TrigramIndex, clause: Clause) -> set[int]:
+    if clause.field == TEXT:
+        return index.text_ids(clause.values[0])
+    return index.field_ids(clause.field, clause.values)
+
+
+def _plan_candidates(
+    vault_root: Path,
+    query: Query,
+    index: TrigramIndex | None,
+    stats: SearchStats,
+    catalog: Catalog | None = None,
+) -> Iterable[Path]:
+    """Pick the files to verify, using the index for the selective clauses first."""
+    if index is None:
+        coded = [clause for clause in query.clauses if clause.field in CODED_FIELDS]
+        if catalog is None or not coded:
+            return iter_markdown_files(vault_root)
+        started = time.perf_counter()
+        with span("index"):
+            paths = catalog.paths_matching(coded)
+        stats.plan.append(
+            PlanStage(
+                stage="columnar",
+                clauses=[clause.describe() for clause in coded],
+                estimate=len(catalog),
+                output=len(paths),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        )
+        return paths
+
+    with span("index"):
+        index.refresh()
+    with span("index"), index.lock:
+        backed: list[tuple[int, Clause]] = []
+        residual: list[Clause] = []
+        for clause in query.clauses:
+            estimate = _index_estimate(index, clause)
+            if estimate is None:
+                residual.append(clause)
+            else:
+                backed.append((estimate, clause))
+        backed.sort(key=lambda pair: pair[0])
+
+        ids: set[int] | None = None
+        for estimate, clause in backed:
+            started = time.perf_counter()
+            clause_ids = _index_ids(index, clause)
+            ids = clause_ids if ids is None else ids & clause_ids
+            stats.plan.append(
+                PlanStage(
+                    stage="trigram" if clause.field == TEXT else "postings",
+                    clauses=[clause.describe()],
+                    estimate=estimate,
+                    output=len(ids),
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                )
+            )
+            if not ids:
+                break
+        docs = index.docs(ids if ids is not None else index.all_ids())
+
+    field_clauses = [clause for clause in residual if clause.field != TEXT]
+    if field_clauses and docs:
+        started = time.perf_counter()
+        estimate = len(docs)
+        docs = [doc for doc in docs if all(clause_holds(clause, doc) for clause in field_clauses)]
+        stats.plan.append(
+            PlanStage(
+                stage="catalog",
+                clauses=[clause.describe() for clause in field_clauses],
+                estimate=estimate,
+                output=len(docs),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        )
+    return [doc.path for doc in docs]
+
+
+def _score(query: Query, fm: dict[str, Any], title: str, folded_body: str) -> int | None:
+    """Evaluate every clause against fresh file data; None if it does not match."""
+    folded_title = title.casefold()
+    score = 0
+    for clause in query.clauses:
+        if clause.field != TEXT:
+            if not clause_holds(clause, fm):
+                return None
+            continue
+        term = clause.values[0]
+        in_title = term in folded_title
+        in_body = term in folded_body
+        if clause.negated:
+            if in_title or in_body:
+                return None
             continue
-        for path in sorted(root.glob("*.md")):
-            if path.is_file():
-                yield path
+        if not (in_title or in_body):
+            return None
+        score += (2 if in_title else 0) + (1 if in_body else 0)
+    return score
+
 
+def document_matches(query: Query, fm: dict[str, Any], title: str, body: str) -> bool:
+    """True when one document satisfies every clause of ``query``."""
+    return _score(query, fm, title, body.casefold()) is not None
 
-def _make_snippet(body: str, query: str, max_len: int = 120) -> str:
-    if not body:
-        return ""
-    lower = body.casefold()
-    idx = lower.find(query)
-    if idx == -1:
-        return body[:max_len]
-    start = max(0, idx - 30)
-    end = min(len(body), idx + max_len)
-    snippet = body[start:end]
-    return snippet.replace("\n", " ")
 
+def result_sort_key(result: SearchResult) -> tuple:
+    return (result.score, result.updated, str(result.path))
+
+
+def iter_search_results(
+    vault_root: Path,
+    query: str,
+    *,
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+    time_budget: float | None = None,
+    cancel: CancelToken | None = None,
+    stats: SearchStats | None = None,
+    index: TrigramIndex | None = None,
+    catalog: Catalog | None = None,
+) -> Iterator[SearchResult]:
+    parsed_query = parse_query(query)
+    if parsed_query.is_empty():
+        return
+    parsed_query = parsed_query.with_filters(status=status, privacy=privacy)
+    terms = parsed_query.text_terms
+    stats = stats if stats is not None else SearchStats()
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
 
+    candidates = _plan_candidates(vault_root, parsed_query, index, stats, catalog)
+    residual = PlanStage(
+        stage="scan" if index is None else "verify",
+        clauses=[clause.describe() for clause in parsed_query.clauses],
+        estimate=len(candidates) if isinstance(candidates, list) else None,
+    )
+    stats.plan.append(residual)
+
+    for path in candidates:
+        if _should_stop(deadline, cancel):
+            stats.partial = True
+            return
+        started = time.perf_counter()
+        stats.scanned += 1
+        result = _verify(path, parsed_query, terms)
+        residual.elapsed_ms += (time.perf_counter() - started) * 1000
+        if result is None:
+            continue
+        residual.output += 1
+        yield result
+
+
+def _verify(path: Path, query: Query, terms: list[str]) -> SearchResult | None:
+    try:
+        parsed = parse_frontmatter(safe_read_text(path))
+    except Exception:
+        return None
+    fm = parsed.frontmatter
+    title = str(fm.get("title", ""))
+    body = parsed.body or ""
+    folded_body = body.casefold()
+    with span("score"):
+        score = _score(query, fm, title, folded_body)
+    if score is None:
+        return None
+    with span("snippet"):
+        snippet = build_snippet(body, find_term_offsets(body, folded_body, terms))
+    return SearchResult(
+        path=path,
+        title=title,
+        type=sys.intern(str(fm.get("type", ""))),
+        status=sys.intern(str(fm.get("status", ""))),
+        privacy=sys.intern(str(fm.get("privacy", ""))),
+        updated=str(fm.get("updated", "")),
+        snippet=snippet.text,
+        score=score,
+        highlights=snippet.highlights,
+    )
+
+
+@tracked("search.items")
 def search_items(
     vault_root: Path,
     query: str,
     *,
     status: list[str] | None = None,
     privacy: list[str] | None = None,
+    time_budget: float | None = None,
+    cancel: CancelToken | None = None,
+    stats: SearchStats | None = None,
+    index: TrigramIndex | None = None,
+    catalog: Catalog | None = None,
 ) -> list[SearchResult]:
-    if not query:
-        return []
-    q = query.casefold()
-    results: list[SearchResult] = []
-
-    for path in _iter_markdown_files(vault_root):
-        try:
-            text = safe_read_text(path)
-            parsed = parse_frontmatter(text)
-        except Exception:
-            continue
-        fm = parsed.frontmatter
-        title = str(fm.get("title", ""))
-        body = parsed.body or ""
-        item_status = str(fm.get("status", ""))
-        item_privacy = str(fm.get("privacy", ""))
-        if status and item_status not in status:
-            continue
-        if privacy and item_privacy not in privacy:
-            continue
-        score = 0
-        if q in title.casefold():
-            score += 2
-        if q in body.casefold():
-            score += 1
-        if score == 0:
-            continue
-        results.append(
-            SearchResult(
-                path=path,
-                title=title,
-                type=str(fm.get("type", "")),
-                status=item_status,
-                privacy=item_privacy,
-                updated=str(fm.get("updated", "")),
-                snippet=_make_snippet(body, q),
-                score=score,
-            )
-        )
+    """Return matches for a query-language string sorted by score.
 
-    results.sort(key=lambda r: (r.score, r.updated), reverse=True)
+    ``time_budget`` (seconds) and ``cancel`` stop the scan early; pass a
+    ``SearchStats`` to learn whether the results are partial and which plan
+    ran. With a trigram ``index`` only candidate documents are read and
+    verified; without one, a ``catalog`` narrows the files to read by
+    status, privacy and type.
+    """
+    results = list(
+        iter_search_results(
+            vault_root,
+            query,
+            status=status,
+            privacy=privacy,
+            time_budget=time_budget,
+            cancel=cancel,
+            stats=stats,
+            index=index,
+            catalog=catalog,
+        )
+    )
+    results.sort(key=result_sort_key, reverse=True)
     return results
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cache import bump_generation
+from .embedding_store import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, EmbeddingJobResult
+from .embeddings import Embedder, default_embedder
+from .io import parse_frontmatter, safe_read_text
+from .search import PlanStage, SearchResult, SearchStats
+from .snippets import SNIPPET_MAX_LEN, build_snippet, find_term_offsets
+from .vault import iter_markdown_files
+from .vector_index import VectorHit, VectorIndex, build_vector_index, load_vector_index
+
+DOCUMENT_INDEX = "documents"
+
+# Semantic results are a ranked pool rather than an exhaustive match set;
+# paging walks this many hits unless the page itself reaches further.
+SEMANTIC_TOP_K = 200
+DEFAULT_NPROBE = 8
+
+# Row fields re-read from the file when it changed after the index was built.
+_LIVE_FIELDS = ("title", "type", "status", "privacy", "updated")
+
+
+def document_record(vault_root: Path, path: Path) -> tuple[str, dict[str, Any]] | None:
+    """The text embedded for one document and its index row (None if unreadable)."""
+    try:
+        stat = path.stat()
+        parsed = parse_frontmatter(safe_read_text(path))
+    except Exception:
+        return None
+    fm = parsed.frontmatter
+    title = str(fm.get("title", ""))
+    body = parsed.body or ""
+    row = {
+        "key": path.relative_to(vault_root).as_posix(),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "title": title,
+        "type": str(fm.get("type", "")),
+        "status": str(fm.get("status", "")),
+        "privacy": str(fm.get("privacy", "")),
+        "updated": str(fm.get("updated", "")),
+        "snippet": body[:SNIPPET_MAX_LEN].replace("\n", " "),
+    }
+    return title + "\n" + body, row
+
+
+def _document_records(vault_root: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    for path in iter_markdown_files(vault_root):
+        record = document_record(vault_root, path)
+        if record is not None:
+            yield record
+
+
+def build_document_vectors(
+    vault_root: Path,
+    *,
+    embedder: Embedder | None = None,
+    nlist: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> EmbeddingJobResult:
+    """Embed every vault document and rebuild the document vector index."""
+    result = build_vector_index(
+        vault_root,
+        DOCUMENT_INDEX,
+        _document_records(vault_root),
+        embedder or default_embedder(),
+        nlist=nlist,
+        batch_size=batch_size,
+        workers=workers,
+    )
+    bump_generation()
+    return result
+
+
+def vector_hits(
+    vault_root: Path,
+    name: str,
+    query: str,
+    k: int,
+    *,
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+    embedder: Embedder | None = None,
+    nprobe: int = DEFAULT_NPROBE,
+) -> tuple[VectorIndex, list[VectorHit]]:
+    """Query vector index ``name``; raises ValueError if it is missing or stale."""
+    embedder = embedder or default_embedder()
+    index = load_vector_index(vault_root, name)
+    if index is None:
+        raise ValueError("semantic index not built; run `substrate vectors build`")
+    if index.model_id != embedder.model_id:
+        raise ValueError(f"semantic index was built with {index.model_id}; rebuild it for {embedder.model_id}")
+    if not query.strip():
+        return index, []
+    filters = {field: values for field, values in (("status", status), ("privacy", privacy)) if values}
+    hits = index.search(embedder.embed([query])[0], k, nprobe=nprobe, filters=filters or None)
+    return index, _live_hits(vault_root, hits, filters)
+
+
+def _live_hits(vault_root: Path, hits: list[VectorHit], filters: dict[str, list[str]]) -> list[VectorHit]:
+    """Check hits against their files: row metadata is frozen at build time.
+
+    Hits whose file is gone are dropped. When a file's mtime or size no
+    longer matches its row, the row fields are re-read from the file and the
+    status/privacy filters applied again, so a note made private after the
+    build does not come back under a ``privacy=public`` filter.
+    """
+    allowed = {field: {value.casefold() for value in values} for field, values in filters.items()}
+    fresh: dict[str, dict[str, str] | None] = {}
+    live = []
+    for hit in hits:
+        meta = hit.meta
+        path = vault_root / str(meta.get("path", hit.key))
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if meta.get("mtime_ns") != stat.st_mtime_ns or meta.get("size") != stat.st_size:
+            key = str(path)
+            if key not in fresh:
+                fresh[key] = _read_row_fields(path)
+            fields = fresh[key]
+            if fields is None:
+                continue
+            hit = replace(hit, meta={**meta, **{name: value for name, value in fields.items() if name in meta}})
+        if any(str(hit.meta.get(field, "")).casefold() not in values for field, values in allowed.items()):
+            continue
+        live.append(hit)
+    return live
+
+
+def _read_row_fields(path: Path) -> dict[str, str] | None:
+    try:
+        parsed = parse_frontmatter(safe_read_text(path))
+    except Exception:
+        return None
+    fields = {name: str(parsed.frontmatter.get(name, "")) for name in _LIVE_FIELDS}
+    fields["snippet"] = (parsed.body or "")[:SNIPPET_MAX_LEN].replace("\n", " ")
+    return fields
+
+
+def semantic_search(
+    vault_root: Path,
+    query: str,
+    *,
+    k: int = SEMANTIC_TOP_K,
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+    embedder: Embedder | None = None,
+    nprobe: int = DEFAULT_NPROBE,
+    stats: SearchStats | None = None,
+) -> list[SearchResult]:
+    started = time.perf_counter()
+    index, hits = vector_hits(
+        vault_root,
+        DOCUMENT_INDEX,
+        query,
+        k,
+        status=status,
+        privacy=privacy,
+        embedder=embedder,
+        nprobe=nprobe,
+    )
+    if stats is not None:
+        stats.scanned += len(index)
+        stats.plan.append(
+            PlanStage(
+                stage="ann",
+                clauses=[query],
+                estimate=len(index),
+                output=len(hits),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        )
+    terms = [term for term in query.casefold().split() if term]
+    results = []
+    for hit in hits:
+        meta = hit.meta
+        text = str(meta.get("snippet", ""))
+        snippet = build_snippet(text, find_term_offsets(text, text.casefold(), terms))
+        results.append(
+            SearchResult(
+                path=vault_root / hit.key,
+                title=str(meta.get("title", "")),
+                type=str(meta.get("type", "")),
+                status=str(meta.get("status", "")),
+                privacy=str(meta.get("privacy", "")),
+                updated=str(meta.get("updated", "")),
+                snippet=snippet.text,
+                score=round(hit.score, 6),
+                highlights=snippet.highlights,
+            )
+        )
+    return results
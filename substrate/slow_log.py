@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from .cache import view_cache
+from .config import config_path, config_value, load_config
+from .perf import collect, current_timings
+
+SLOW_LOG = "slow.jsonl"
+DEFAULT_SLOW_MS = 1000
+
+_BODY_KEYS = {"body", "text", "content"}
+_DROPPED_KEYS = {"token", "token_required", "token_provided", "api_token", "cancel", "func"}
+_MAX_VALUE_CHARS = 500
+_NOT_SENSITIVE = {"private", "public"}
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def slow_log_path(vault_root: Path) -> Path:
+    return vault_root / "vault" / "_system" / "logs" / SLOW_LOG
+
+
+_thresholds: dict[str, tuple[int, float | None]] = {}
+
+
+def slow_threshold_ms(vault_root: Path) -> float | None:
+    """``perf.slow_ms`` (default 1000), cached by config mtime; ``None`` when set to 0."""
+    try:
+        mtime_ns = config_path(vault_root).stat().st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        mtime_ns = 0
+    key = str(vault_root)
+    cached = _thresholds.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    config = load_config(vault_root) if mtime_ns else {}
+    value = config_value(config, "perf.slow_ms", DEFAULT_SLOW_MS)
+    threshold = float(value) if value else None
+    _thresholds[key] = (mtime_ns, threshold)
+    return threshold
+
+
+def _privacy(params: Any) -> str | None:
+    if isinstance(params, dict):
+        if isinstance(params.get("privacy"), str):
+            return params["privacy"]
+        for value in params.values():
+            found = _privacy(value)
+            if found is not None:
+                return found
+    return None
+
+
+def redact(params: dict[str, Any]) -> dict[str, Any]:
+    """JSON-safe copy of ``params`` without secrets and, unless the privacy is
+    known to be ``private`` or ``public``, without note bodies."""
+    keep_bodies = _privacy(params) in _NOT_SENSITIVE
+
+    def _clean(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {
+                key: (
+                    f"[redacted {len(item)} chars]"
+                    if key in _BODY_KEYS and isinstance(item, str) and not keep_bodies
+                    else _clean(item)
+                )
+                for key, item in value.items()
+                if key not in _DROPPED_KEYS
+            }
+        if isinstance(value, (list, tuple)):
+            return [_clean(item) for item in value]
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        text = str(value)
+        return text if len(text) <= _MAX_VALUE_CHARS else text[:_MAX_VALUE_CHARS] + "..."
+
+    return _clean(params)
+
+
+_log_lock = threading.Lock()
+
+
+def append_slow_log(vault_root: Path, record: dict[str, Any]) -> None:
+    path = slow_log_path(vault_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=True) + "\n"
+    with _log_lock, path.open("a", encoding="utf-8", newline="\n") as handle:
+        handle.write(line)
+
+
+class _SlowOp:
+    # A class rather than a @contextmanager generator: re-raising through a
+    # generator assigns __traceback__, which frozen exceptions (ApiError) reject.
+
+    def __init__(
+        self,
+        vault_root: Path | None,
+        op: str,
+        params: dict[str, Any] | Callable[[], dict[str, Any]] | None = None,
+    ) -> None:
+        self.vault_root = vault_root
+        self.op = op
+        self.params = params
+        self.threshold = slow_threshold_ms(vault_root) if vault_root is not None else None
+
+    def __enter__(self) -> None:
+        if self.threshold is None:
+            return
+        outer = current_timings()
+        self._collector = collect() if outer is None else None
+        self.timings = outer if self._collector is None else self._collector.__enter__()
+        self.before = {name: tuple(entry) for name, entry in self.timings.spans.items()}
+        self.cache_before = view_cache.stats()
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self.threshold is None:
+            return
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if self._collector is not None:
+            self._collector.__exit__(None, None, None)
+        if elapsed_ms < self.threshold:
+            return
+        assert self.vault_root is not None
+        spans: dict[str, dict[str, float]] = {}
+        for name, (seconds, count) in list(self.timings.spans.items()):
+            prior = self.before.get(name, (0.0, 0))
+            if count - prior[1] > 0:
+                spans[name] = {"ms": round((seconds - prior[0]) * 1000, 3), "count": int(count - prior[1])}
+        cache_after = view_cache.stats()
+        hits = cache_after.hits - self.cache_before.hits
+        misses = cache_after.misses - self.cache_before.misses
+        lookups = hits + misses
+        params = self.params() if callable(self.params) else self.params or {}
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "op": self.op,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "threshold_ms": self.threshold,
+            "params": redact(params),
+            "spans": spans,
+            "files": {
+                "read": spans.get("read", {}).get("count", 0),
+                "written": spans.get("write", {}).get("count", 0),
+            },
+            "cache": {"hits": hits, "misses": misses, "hit_ratio": round(hits / lookups, 4) if lookups else None},
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        append_slow_log(self.vault_root, record)
+
+
+def slow_op(
+    vault_root: Path | None,
+    op: str,
+    params: dict[str, Any] | Callable[[], dict[str, Any]] | None = None,
+) -> _SlowOp:
+    """Log the enclosed operation to ``slow.jsonl`` when it exceeds the threshold.
+
+    ``params`` may be a callable so arguments are only collected for slow
+    calls. Spans come from the active collector (the part recorded inside
+    this block) or from a collector opened here.
+    """
+    return _SlowOp(vault_root, op, params)
+
+
+def tracked(op: str) -> Callable[[_F], _F]:
+    """Decorate a ``(vault_root, ...)`` function so slow calls are logged as ``op``."""
+
+    def decorate(func: _F) -> _F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(vault_root: Path, *args: Any, **kwargs: Any) -> Any:
+            def _params() -> dict[str, Any]:
+                bound = signature.bind(vault_root, *args, **kwargs).arguments
+                bound.pop(next(iter(signature.parameters)))
+                return dict(bound)
+
+            with slow_op(vault_root, op, _params):
+                return func(vault_root, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def iter_slow_log(vault_root: Path) -> Iterator[dict[str, Any]]:
+    path = slow_log_path(vault_root)
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line from a crash mid-append
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def summarize_slow_log(
+    vault_root: Path,
+    *,
+    since: str | None = None,
+    op: str | None = None,
+    top: int = 10,
+) -> dict[str, Any]:
+    """Per-operation counts, latency percentiles and dominant spans, plus the slowest records."""
+    since_dt = None
+    if since:
+        try:
+            since_dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        except ValueError as exc:
+            raise ValueError("since must be ISO 8601 date-time") from exc
+        if since_dt.tzinfo is None:
+            since_dt = since_dt.replace(tzinfo=timezone.utc)
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for record in iter_slow_log(vault_root):
+        if op and not record.get("op", "").startswith(op):
+            continue
+        if since_dt is not None:
+            try:
+                if datetime.fromisoformat(record["timestamp"]) < since_dt:
+                    continue
+            except (KeyError, ValueError):
+                continue
+        groups.setdefault(record.get("op", "?"), []).append(record)
+
+    operations = []
+    for name, records in groups.items():
+        elapsed = sorted(record["elapsed_ms"] for record in records)
+        span_totals: dict[str, float] = {}
+        for record in records:
+            for span_name, span in record.get("spans", {}).items():
+                span_totals[span_name] = span_totals.get(span_name, 0.0) + span["ms"]
+        operations.append(
+            {
+                "op": name,
+                "count": len(records),
+                "p50_ms": elapsed[len(elapsed) // 2],
+                "p95_ms": _percentile(elapsed, 0.95),
+                "max_ms": elapsed[-1],
+                "total_ms": round(sum(elapsed), 3),
+                "files_read": sum(record.get("files", {}).get("read", 0) for record in records),
+                "top_spans": {
+                    span_name: round(total, 3)
+                    for span_name, total in sorted(span_totals.items(), key=lambda pair: -pair[1])[:5]
+                },
+            }
+        )
+    operations.sort(key=lambda row: -row["total_ms"])
+    slowest = sorted((record for records in groups.values() for record in records), key=lambda r: -r["elapsed_ms"])
+    return {
+        "records": sum(row["count"] for row in operations),
+        "operations": operations,
+        "slowest": slowest[:top],
+    }
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+SNIPPET_MAX_LEN = 120
+SNIPPET_LEAD = 30
+
+# Upper bound on recorded occurrences per term so one result cannot dominate
+# the cost of a page (e.g. a one-letter term in a multi-megabyte body).
+MAX_HITS_PER_TERM = 64
+
+
+@dataclass(frozen=True)
+class Snippet:
+    text: str
+    highlights: tuple[tuple[int, int], ...]
+
+
+def _fold_map(text: str) -> list[int] | None:
+    """Map casefolded offsets back to ``text`` offsets when folding changes length."""
+    mapping: list[int] = []
+    for idx, char in enumerate(text):
+        mapping.extend([idx] * len(char.casefold()))
+    if len(mapping) == len(text):
+        return None
+    mapping.append(len(text))
+    return mapping
+
+
+def find_term_offsets(
+    text: str,
+    folded: str,
+    terms: list[str],
+    *,
+    max_hits: int = MAX_HITS_PER_TERM,
+) -> list[tuple[int, int, int]]:
+    """Return ``(start, end, term_index)`` hits in ``text`` sorted by start.
+
+    ``folded`` must be ``text.casefold()``; it is passed in because callers
+    already computed it to decide whether the document matches.
+    """
+    mapping = _fold_map(text) if len(folded) != len(text) else None
+    hits: list[tuple[int, int, int]] = []
+    for term_index, term in enumerate(terms):
+        if not term:
+            continue
+        found = 0
+        idx = folded.find(term)
+        while idx != -1 and found < max_hits:
+            end = idx + len(term)
+            if mapping is not None:
+                hits.append((mapping[idx], mapping[end], term_index))
+            else:
+                hits.append((idx, end, term_index))
+            found += 1
+            idx = folded.find(term, end)
+    hits.sort()
+    return hits
+
+
+def _densest_start(hits: list[tuple[int, int, int]], max_len: int) -> int:
+    best_idx = 0
+    best_score = (0, 0)
+    right = 0
+    counts: dict[int, int] = {}
+    for left, (start, _, _) in enumerate(hits):
+        # The hit at ``left`` always counts, even when it alone exceeds max_len.
+        while right < len(hits) and (right <= left or hits[right][1] - start <= max_len):
+            term_index = hits[right][2]
+            counts[term_index] = counts.get(term_index, 0) + 1
+            right += 1
+        score = (len(counts), right - left)
+        if score > best_score:
+            best_score = score
+            best_idx = left
+        term_index = hits[left][2]
+        counts[term_index] -= 1
+        if not counts[term_index]:
+            del counts[term_index]
+    return hits[best_idx][0]
+
+
+def build_snippet(
+    body: str,
+    hits: list[tuple[int, int, int]],
+    *,
+    max_len: int = SNIPPET_MAX_LEN,
+    lead: int = SNIPPET_LEAD,
+) -> Snippet:
+    """Cut the window with the most distinct terms (then most hits) and
+    return highlight ranges relative to the snippet text."""
+    if not body:
+        return Snippet(text="", highlights=())
+    if not hits:
+        return Snippet(text=body[:max_len], highlights=())
+    anchor = _densest_start(hits, max_len)
+    start = max(0, anchor - lead)
+    end = min(len(body), anchor + max_len)
+    highlights: list[tuple[int, int]] = []
+    for hit_start, hit_end, _ in hits:
+        if hit_start < start or hit_end > end:
+            continue
+        rel = (hit_start - start, hit_end - start)
+        if highlights and rel[0] <= highlights[-1][1]:
+            highlights[-1] = (highlights[-1][0], max(highlights[-1][1], rel[1]))
+        else:
+            highlights.append(rel)
+    return Snippet(text=body[start:end].replace("\n", " "), highlights=tuple(highlights))
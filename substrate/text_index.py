@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .cache import change_token
+from .io import parse_frontmatter, safe_read_text
+from .vault import iter_markdown_files
+
+TRIGRAM_LEN = 3
+
+# Frontmatter fields with exact-match postings (values are casefolded).
+POSTING_FIELDS = ("status", "privacy", "type", "tag")
+
+# Rebuild postings once this fraction of doc ids belongs to removed documents.
+_COMPACT_RATIO = 0.5
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + TRIGRAM_LEN] for i in range(len(text) - TRIGRAM_LEN + 1)}
+
+
+def _tags(value: object) -> tuple[str, ...]:
+    if isinstance(value, list):
+        return tuple(str(tag) for tag in value)
+    if value:
+        return (str(value),)
+    return ()
+
+
+@dataclass(frozen=True)
+class IndexedDoc:
+    path: Path
+    mtime_ns: int
+    size: int
+    id: str
+    title: str
+    type: str
+    status: str
+    privacy: str
+    created: str
+    updated: str
+    tags: tuple[str, ...]
+
+
+class TrigramIndex:
+    """In-memory trigram postings over casefolded title + body.
+
+    Candidate documents for a substring query are the intersection of the
+    postings of its trigrams; callers still verify the match against the
+    file, so the index only has to be a superset. Documents are refreshed by
+    stat signature on every query, or only when the change token moves while
+    a watcher runs for the vault.
+    """
+
+    def __init__(self, vault_root: Path) -> None:
+        self.vault_root = vault_root
+        self._docs: list[IndexedDoc | None] = []
+        self._ids: dict[str, int] = {}
+        self._postings: dict[str, array] = {}
+        self._fields: dict[tuple[str, str], array] = {}
+        self._state: tuple | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold while combining doc ids from several calls (ids shift on compaction)."""
+        return self._lock
+
+    @property
+    def trigram_count(self) -> int:
+        return len(self._postings)
+
+    def refresh(self, *, force: bool = False) -> bool:
+        state = change_token(self.vault_root)
+        with self._lock:
+            if not force and state is not None and state == self._state:
+                return False
+            seen: set[str] = set()
+            for path in iter_markdown_files(self.vault_root):
+                key = str(path)
+                seen.add(key)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                doc_id = self._ids.get(key)
+                if doc_id is not None:
+                    doc = self._docs[doc_id]
+                    if doc is not None and doc.mtime_ns == stat.st_mtime_ns and doc.size == stat.st_size:
+                        continue
+                self.remove(path)
+                self._add(path, stat.st_mtime_ns, stat.st_size)
+            for key in [key for key in self._ids if key not in seen]:
+                self.remove(Path(key))
+            self._state = state
+            return True
+
+    def update(self, path: Path) -> None:
+        """Re-index one file (or drop it if it no longer exists)."""
+        with self._lock:
+            self.remove(path)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return
+            self._add(path, stat.st_mtime_ns, stat.st_size)
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            doc_id = self._ids.pop(str(path), None)
+            if doc_id is None:
+                return
+            self._docs[doc_id] = None
+            dead = len(self._docs) - len(self._ids)
+            if dead > len(self._docs) * _COMPACT_RATIO:
+                self._compact()
+
+    def get(self, path: Path) -> IndexedDoc | None:
+        doc_id = self._ids.get(str(path))
+        return self._docs[doc_id] if doc_id is not None else None
+
+    def candidates(self, query: str) -> list[IndexedDoc] | None:
+        """Documents that may contain ``query`` (casefolded), or None if the
+        query is too short to use the index and a full scan is required."""
+        if not trigrams(query):
+            return None
+        self.refresh()
+        return self.docs(self.text_ids(query))
+
+    def text_estimate(self, term: str) -> int | None:
+        """Upper bound on documents containing ``term``; None if unindexable."""
+        grams = trigrams(term)
+        if not grams:
+            return None
+        with self._lock:
+            return min(len(self._postings.get(gram, ())) for gram in grams)
+
+    def text_ids(self, term: str) -> set[int]:
+        with self._lock:
+            lists: list[Iterable[int]] = []
+            for gram in trigrams(term):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    return set()
+                lists.append(posting)
+            lists.sort(key=len)
+            matched = set(lists[0]) if lists else set()
+            for posting in lists[1:]:
+                matched.intersection_update(posting)
+                if not matched:
+                    break
+            return matched
+
+    def field_estimate(self, field: str, values: Iterable[str]) -> int:
+        with self._lock:
+            return sum(len(self._fields.get((field, value), ())) for value in values)
+
+    def field_ids(self, field: str, values: Iterable[str]) -> set[int]:
+        matched: set[int] = set()
+        with self._lock:
+            for value in values:
+                matched.update(self._fields.get((field, value), ()))
+        return matched
+
+    def all_ids(self) -> set[int]:
+        with self._lock:
+            return set(self._ids.values())
+
+    def docs(self, ids: Iterable[int]) -> list[IndexedDoc]:
+        with self._lock:
+            found = [self._docs[doc_id] for doc_id in ids if doc_id < len(self._docs)]
+        live = [doc for doc in found if doc is not None]
+        live.sort(key=lambda doc: str(doc.path))
+        return live
+
+    def _add(self, path: Path, mtime_ns: int, size: int) -> None:
+        try:
+            parsed = parse_frontmatter(safe_read_text(path))
+        except Exception:
+            return
+        fm = parsed.frontmatter
+        doc = IndexedDoc(
+            path=path,
+            mtime_ns=mtime_ns,
+            size=size,
+            id=str(fm.get("id", "")),
+            title=str(fm.get("title", "")),
+            type=str(fm.get("type", "")),
+            status=str(fm.get("status", "")),
+            privacy=str(fm.get("privacy", "")),
+            created=str(fm.get("created", "")),
+            updated=str(fm.get("updated", "")),
+            tags=_tags(fm.get("tags")),
+        )
+        doc_id = len(self._docs)
+        self._docs.append(doc)
+        self._ids[str(path)] = doc_id
+        text = (doc.title + "\n" + (parsed.body or "")).casefold()
+        for gram in trigrams(text):
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("I")
+            posting.append(doc_id)
+        for field in POSTING_FIELDS:
+            values = doc.tags if field == "tag" else (getattr(doc, field),)
+            for value in {value.casefold() for value in values if value}:
+                posting = self._fields.get((field, value))
+                if posting is None:
+                    posting = self._fields[(field, value)] = array("I")
+                posting.append(doc_id)
+
+    def _compact(self) -> None:
+        # Doc ids are renumbered monotonically, so postings stay sorted and
+        # can be rewritten without re-reading any file.
+        remap: dict[int, int] = {}
+        docs: list[IndexedDoc | None] = []
+        for old_id, doc in enumerate(self._docs):
+            if doc is None:
+                continue
+            remap[old_id] = len(docs)
+            docs.append(doc)
+        self._docs = docs
+        self._postings = _remap_postings(self._postings, remap)
+        self._fields = _remap_postings(self._fields, remap)
+        self._ids = {str(doc.path): doc_id for doc_id, doc in enumerate(docs) if doc is not None}
+
+
+def _remap_postings(postings: dict, remap: dict[int, int]) -> dict:
+    result = {}
+    for key, posting in postings.items():
+        kept = array("I", (remap[doc_id] for doc_id in posting if doc_id in remap))
+        if kept:
+            result[key] = kept
+    return result
+
+
+_indexes: dict[str, TrigramIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def enable_trigram_index(vault_root: Path) -> TrigramIndex:
+    key = str(vault_root)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = TrigramIndex(vault_root)
+    index.refresh()
+    return index
+
+
+def active_trigram_index(vault_root: Path) -> TrigramIndex | None:
+    return _indexes.get(str(vault_root))
+
+
+def disable_trigram_index(vault_root: Path) -> None:
+    with _registry_lock:
+        _indexes.pop(str(vault_root), None)
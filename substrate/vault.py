@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
+from typing import Iterator
 
 from .constants import RAW_DIRS, VAULT_DIRS
+from .perf import span
 
 
 def init_vault(root: Path) -> None:
@@ -18,3 +21,42 @@ def vault_structure(root: Path) -> list[Path]:
     paths = [root / "vault" / rel for rel in VAULT_DIRS]
     paths += [root / rel for rel in RAW_DIRS]
     return paths
+
+
+MARKDOWN_DIRS = ("inbox", "items", "daily")
+
+
+def markdown_dirs(vault_root: Path) -> list[Path]:
+    return [vault_root / "vault" / name for name in MARKDOWN_DIRS]
+
+
+def _scan_markdown(directory: Path, depth: int) -> Iterator[Path]:
+    try:
+        with span("list"), os.scandir(directory) as scan:
+            entries = sorted(scan, key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.endswith(".md") and entry.is_file():
+            yield Path(entry.path)
+        elif depth and entry.is_dir(follow_symlinks=False):
+            yield from _scan_markdown(Path(entry.path), depth - 1)
+
+
+def iter_markdown_dir(directory: Path) -> Iterator[Path]:
+    """Markdown files directly in ``directory``, sorted by name."""
+    return _scan_markdown(directory, 0)
+
+
+def iter_markdown_tree(directory: Path) -> Iterator[Path]:
+    """Markdown files anywhere under ``directory``, sorted by name per level."""
+    return _scan_markdown(directory, -1)
+
+
+def iter_markdown_files(vault_root: Path) -> Iterator[Path]:
+    """Yield searchable markdown files (inbox, items, daily) in stable order.
+
+    ``items`` is walked one level deep so sharded layouts are included.
+    """
+    for root in markdown_dirs(vault_root):
+        yield from _scan_markdown(root, 1 if root.name == "items" else 0)
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from .embedding_store import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, EmbeddingJobResult, EmbeddingStore, embed_with_store
+from .embeddings import Embedder, require_numpy
+from .ops_log import utc_now_iso
+
+VECTOR_INDEX_DIR = Path("_system/index/vectors")
+
+# Row metadata fields that can be filtered inside the index (stored as codes).
+FILTER_FIELDS = ("status", "privacy")
+
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 64
+_ASSIGN_BATCH = 65536
+
+
+@dataclass(frozen=True)
+class VectorHit:
+    key: str
+    score: float
+    meta: dict[str, Any]
+
+
+def vector_index_dir(vault_root: Path, name: str) -> Path:
+    return vault_root / "vault" / VECTOR_INDEX_DIR / name
+
+
+def default_nlist(count: int) -> int:
+    return max(1, min(4096, int(math.sqrt(count))))
+
+
+def _train_centroids(vectors: Any, nlist: int, seed: int = 0) -> Any:
+    """Spherical k-means on a sample; vectors are already L2-normalized."""
+    np = require_numpy()
+    rng = np.random.default_rng(seed)
+    count = vectors.shape[0]
+    sample_size = min(count, nlist * _KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(count, size=sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for list_id in range(nlist):
+            members = sample[assign == list_id]
+            if len(members):
+                centroids[list_id] = members.sum(axis=0)
+            else:
+                centroids[list_id] = sample[rng.integers(sample_size)]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: Any, centroids: Any) -> Any:
+    np = require_numpy()
+    assign = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], _ASSIGN_BATCH):
+        block = np.asarray(vectors[start : start + _ASSIGN_BATCH])
+        assign[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def write_vector_index(
+    vault_root: Path,
+    name: str,
+    model_id: str,
+    vectors: Any,
+    rows: list[dict[str, Any]],
+    *,
+    nlist: int | None = None,
+) -> Path:
+    """Persist ``vectors`` (n x dim float32, normalized) as an IVF index.
+
+    Vectors are stored grouped by inverted list so a probe reads one
+    contiguous slice of the memory-mapped matrix; ``row_offsets`` holds the
+    byte offset of each row's metadata line in ``rows.jsonl`` so queries
+    read only the rows they return. The new index is built in a
+    sibling directory and swapped in, so readers never see a partial build.
+    """
+    np = require_numpy()
+    count = len(rows)
+    dim = int(vectors.shape[1]) if count else 0
+    nlist = min(nlist or default_nlist(count), max(count, 1))
+    target = vector_index_dir(vault_root, name)
+    building = target.with_name(target.name + ".building")
+    if building.exists():
+        shutil.rmtree(building)
+    building.mkdir(parents=True)
+
+    if count:
+        centroids = _train_centroids(vectors, nlist)
+        assign = _assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        out = np.memmap(building / "vectors.f32", dtype=np.float32, mode="w+", shape=(count, dim))
+        for start in range(0, count, _ASSIGN_BATCH):
+            out[start : start + _ASSIGN_BATCH] = vectors[order[start : start + _ASSIGN_BATCH]]
+        out.flush()
+        del out
+    else:
+        centroids = np.zeros((0, 0), dtype=np.float32)
+        order = np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(1, dtype=np.int64)
+        (building / "vectors.f32").write_bytes(b"")
+
+    vocab: dict[str, list[str]] = {}
+    codes: dict[str, Any] = {}
+    for field in FILTER_FIELDS:
+        values = sorted({str(row.get(field, "")) for row in rows})
+        lookup = {value: code for code, value in enumerate(values)}
+        vocab[field] = values
+        codes[field] = np.array([lookup[str(rows[i].get(field, ""))] for i in order], dtype=np.uint16)
+
+    row_offsets = np.zeros(count + 1, dtype=np.int64)
+    with (building / "rows.jsonl").open("wb") as handle:
+        for position, i in enumerate(order):
+            handle.write((json.dumps(rows[i], ensure_ascii=True) + "\n").encode("ascii"))
+            row_offsets[position + 1] = handle.tell()
+    np.savez(
+        building / "ivf.npz",
+        centroids=centroids,
+        offsets=offsets,
+        row_offsets=row_offsets,
+        **{f"codes_{k}": v for k, v in codes.items()},
+    )
+    manifest = {
+        "model_id": model_id,
+        "dim": dim,
+        "count": count,
+        "nlist": nlist if count else 0,
+        "vocab": vocab,
+        "built": utc_now_iso(),
+    }
+    (building / "index.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    previous = target.with_name(target.name + ".old")
+    if previous.exists():
+        shutil.rmtree(previous)
+    if target.exists():
+        os.replace(target, previous)
+    os.replace(building, target)
+    if previous.exists():
+        shutil.rmtree(previous)
+    return target
+
+
+def build_vector_index(
+    vault_root: Path,
+    name: str,
+    records: Iterable[tuple[str, dict[str, Any]]],
+    embedder: Embedder,
+    *,
+    nlist: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> EmbeddingJobResult:
+    """Embed ``(text, row)`` records and write them as index ``name``.
+
+    Embeddings are reused from the per-model store, so a rebuild only embeds
+    texts that changed since the last build with the same model. Texts are
+    streamed into the embedder; only the row metadata is kept for the write.
+    """
+    rows: list[dict[str, Any]] = []
+
+    def texts() -> Iterator[str]:
+        for text, row in records:
+            rows.append(row)
+            yield text
+
+    store = EmbeddingStore(vault_root, embedder.model_id, embedder.dim)
+    vectors, result = embed_with_store(store, embedder, texts(), batch_size=batch_size, workers=workers)
+    write_vector_index(vault_root, name, embedder.model_id, vectors, rows, nlist=nlist)
+    return result
+
+
+class VectorIndex:
+    def __init__(self, directory: Path) -> None:
+        np = require_numpy()
+        manifest = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+        self.directory = directory
+        self.model_id: str = manifest["model_id"]
+        self.dim: int = manifest["dim"]
+        self.count: int = manifest["count"]
+        self.vocab: dict[str, list[str]] = manifest["vocab"]
+        data = np.load(directory / "ivf.npz")
+        self.centroids = data["centroids"]
+        self.offsets = data["offsets"]
+        self.codes = {field: data[f"codes_{field}"] for field in FILTER_FIELDS}
+        self._row_offsets = data["row_offsets"] if "row_offsets" in data.files else None
+        if self.count:
+            self.vectors = np.memmap(directory / "vectors.f32", dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._rows_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _offsets(self) -> Any:
+        # Indexes written before row offsets were stored get them from one
+        # scan of rows.jsonl on first use.
+        if self._row_offsets is None:
+            with self._rows_lock:
+                if self._row_offsets is None:
+                    np = require_numpy()
+                    offsets = [0]
+                    with (self.directory / "rows.jsonl").open("rb") as handle:
+                        for line in handle:
+                            offsets.append(offsets[-1] + len(line))
+                    self._row_offsets = np.array(offsets, dtype=np.int64)
+        return self._row_offsets
+
+    def rows(self, positions: Sequence[int]) -> list[dict[str, Any]]:
+        """Metadata for ``positions``, read from ``rows.jsonl`` on demand."""
+        offsets = self._offsets()
+        found = []
+        with (self.directory / "rows.jsonl").open("rb") as handle:
+            for position in positions:
+                start, end = int(offsets[position]), int(offsets[position + 1])
+                handle.seek(start)
+                found.append(json.loads(handle.read(end - start)))
+        return found
+
+    def row(self, position: int) -> dict[str, Any]:
+        return self.rows([position])[0]
+
+    def _mask(self, start: int, end: int, filters: dict[str, list[str]]) -> Any:
+        np = require_numpy()
+        mask = np.ones(end - start, dtype=bool)
+        for field, allowed in filters.items():
+            if not allowed or field not in self.codes:
+                continue
+            # Case-insensitive, like the query language's field clauses.
+            folded = {value.casefold() for value in allowed}
+            allowed_codes = [code for code, value in enumerate(self.vocab[field]) if value.casefold() in folded]
+            mask &= np.isin(self.codes[field][start:end], allowed_codes)
+        return mask
+
+    def search(
+        self,
+        query: Any,
+        k: int,
+        *,
+        nprobe: int = 8,
+        filters: dict[str, list[str]] | None = None,
+    ) -> list[VectorHit]:
+        """Approximate top-k by inner product over the ``nprobe`` closest lists.
+
+        When filters leave fewer than ``k`` candidates, further lists are
+        probed in centroid order so filtered queries still fill the page.
+        """
+        np = require_numpy()
+        if not self.count or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        order = np.argsort(-(self.centroids @ query))
+        scores: list[Any] = []
+        positions: list[Any] = []
+        found = 0
+        for probed, list_id in enumerate(order):
+            if probed >= nprobe and found >= k:
+                break
+            start, end = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if start == end:
+                continue
+            block = self.vectors[start:end] @ query
+            index = np.arange(start, end)
+            if filters:
+                mask = self._mask(start, end, filters)
+                block, index = block[mask], index[mask]
+            scores.append(block)
+            positions.append(index)
+            found += len(block)
+        if not found:
+            return []
+        all_scores = np.concatenate(scores)
+        all_positions = np.concatenate(positions)
+        top = min(k, len(all_scores))
+        best = np.argpartition(-all_scores, top - 1)[:top]
+        best = best[np.argsort(-all_scores[best], kind="stable")]
+        rows = self.rows([int(all_positions[i]) for i in best])
+        return [
+            VectorHit(key=str(row.get("key", "")), score=float(all_scores[i]), meta=row) for i, row in zip(best, rows)
+        ]
+
+
+_loaded: dict[str, tuple[float, VectorIndex]] = {}
+_loaded_lock = threading.Lock()
+
+
+def load_vector_index(vault_root: Path, name: str) -> VectorIndex | None:
+    directory = vector_index_dir(vault_root, name)
+    manifest = directory / "index.json"
+    try:
+        mtime = manifest.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    key = str(directory)
+    with _loaded_lock:
+        cached = _loaded.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        index = VectorIndex(directory)
+        _loaded[key] = (mtime, index)
+        return index
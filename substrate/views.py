@@ -2,14 +2,24 @@ from __future__ import annotations
 
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
+from .catalog import Catalog
+from .hybrid import HYBRID_STAGES, hybrid_search
 from .inbox import InboxItem, list_inbox
 from .items import Item, read_item
-from .search import search_items
+from .links import active_link_index, link_index, record_link_writes
+from .ops_log import find_vault_root
+from .paging import cursor_scope, decode_cursor, encode_cursor, select_page
+from .passages import retrieve_passages
+from .perf import span
+from .query import parse_query
+from .search import CancelToken, SearchResult, SearchStats, iter_search_results, result_sort_key
+from .semantic import SEMANTIC_TOP_K, semantic_search
+from .text_index import TrigramIndex
 
 
-def item_view(item: Item) -> dict[str, Any]:
+def item_view(item: Item, backlinks: list[dict[str, str]] | None = None) -> dict[str, Any]:
     fm = item.frontmatter
     attachments = fm.get("attachments", [])
     if not isinstance(attachments, list):
@@ -26,7 +36,7 @@ def item_view(item: Item) -> dict[str, Any]:
         "frontmatter": fm,
         "body": item.body,
         "attachments": attachments,
-        "backlinks": [],
+        "backlinks": backlinks or [],
         "provenance": {
             "sources": fm.get("sources", []),
             "observed": fm.get("observed", []),
@@ -34,12 +44,42 @@ def item_view(item: Item) -> dict[str, Any]:
     }
 
 
-def load_item_view(path: Path) -> dict[str, Any]:
-    return item_view(read_item(path))
+def load_item_view(path: Path, vault_root: Path | None = None) -> dict[str, Any]:
+    """Item plus backlinks from the persisted link index.
+
+    The index is not refreshed here: writes (``record_link_writes``) and the
+    watcher keep it current, so opening an item costs O(degree), not a walk
+    of the vault. A vault whose graph was never built has no backlinks.
+    """
+    item = read_item(path)
+    vault_root = vault_root or find_vault_root(path)
+    item_id = str(item.frontmatter.get("id", ""))
+    backlinks = []
+    if vault_root is not None and item_id:
+        backlinks = [node.to_dict() for node in link_index(vault_root).backlinks(item_id, refresh=False)]
+    return item_view(item, backlinks)
+
+
+def written_item_view(path: Path, vault_root: Path) -> dict[str, Any]:
+    """View of a file this process just wrote.
+
+    Patches the link index from that one file rather than refreshing the
+    graph; with no index loaded or persisted, backlinks are left empty.
+    """
+    item = read_item(path)
+    item_id = str(item.frontmatter.get("id", ""))
+    record_link_writes(vault_root, path)
+    index = active_link_index(vault_root)
+    backlinks = []
+    if index is not None and item_id:
+        backlinks = [node.to_dict() for node in index.backlinks(item_id, refresh=False)]
+    return item_view(item, backlinks)
 
 
 _SORT_FIELDS = {"updated", "created", "title"}
 
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+
 
 def _parse_sort(sort: str) -> tuple[str, bool]:
     if sort.endswith("_desc"):
@@ -67,6 +107,25 @@ def _sort_key(item: InboxItem, field: str) -> str:
     return ""
 
 
+def _filter_inbox(
+    items: Iterable[InboxItem],
+    status: list[str] | None,
+    privacy: list[str] | None,
+) -> Iterator[InboxItem]:
+    for item in items:
+        if status and item.status not in status:
+            continue
+        if privacy and item.privacy not in privacy:
+            continue
+        yield item
+
+
+def _next_cursor(scope: str, key: tuple | None) -> str | None:
+    if key is None:
+        return None
+    return encode_cursor(scope, key)
+
+
 def inbox_view(
     vault_root: Path,
     *,
@@ -75,38 +134,45 @@ def inbox_view(
     sort: str = "updated_desc",
     status: list[str] | None = None,
     privacy: list[str] | None = None,
+    cursor: str | None = None,
+    catalog: Catalog | None = None,
 ) -> dict[str, Any]:
-    items = list_inbox(vault_root)
     field, reverse = _parse_sort(sort)
-    filtered: list[InboxItem] = []
-    for item in items:
-        if status and item.status not in status:
-            continue
-        if privacy and item.privacy not in privacy:
-            continue
-        filtered.append(item)
-    items_sorted = sorted(filtered, key=lambda item: _sort_key(item, field), reverse=reverse)
-
-    total = len(items_sorted)
-    window = items_sorted[offset : offset + limit if limit is not None else None]
+    scope = cursor_scope("inbox", sort=sort, status=status, privacy=privacy)
+    after = decode_cursor(cursor, scope) if cursor else None
+    if catalog is not None:
+        with span("sort"):
+            page = catalog.inbox_page(
+                field=field,
+                reverse=reverse,
+                status=status,
+                privacy=privacy,
+                offset=offset,
+                limit=limit,
+                after=after,
+            )
+    else:
+        items = list_inbox(vault_root)
+        with span("sort"):
+            page = select_page(
+                _filter_inbox(items, status, privacy),
+                key=lambda item: (_sort_key(item, field), str(item.path)),
+                reverse=reverse,
+                offset=offset,
+                limit=limit,
+                after=after,
+            )
+    window = page.items
 
     return {
-        "total": total,
+        "total": page.total,
         "offset": offset,
         "limit": limit,
         "sort": sort,
+        "cursor": cursor,
+        "next_cursor": _next_cursor(scope, page.next_key),
         "filters": {"status": status or [], "privacy": privacy or []},
-        "items": [
-            {
-                "path": str(item.path),
-                "title": item.title,
-                "status": item.status,
-                "privacy": item.privacy,
-                "created": item.created,
-                "updated": item.updated,
-            }
-            for item in window
-        ],
+        "items": [item.to_dict() for item in window],
     }
 
 
@@ -118,26 +184,126 @@ def search_view(
     offset: int = 0,
     status: list[str] | None = None,
     privacy: list[str] | None = None,
+    cursor: str | None = None,
+    time_budget: float | None = None,
+    cancel: CancelToken | None = None,
+    index: TrigramIndex | None = None,
+    explain: bool = False,
+    mode: str = "lexical",
+    catalog: Catalog | None = None,
 ) -> dict[str, Any]:
-    results = search_items(vault_root, query, status=status, privacy=privacy)
-    total = len(results)
-    window = results[offset : offset + limit if limit is not None else None]
-    return {
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}")
+    scope = cursor_scope("search", mode=mode, query=query, status=status, privacy=privacy)
+    after = decode_cursor(cursor, scope) if cursor else None
+    stats = SearchStats()
+    results: Iterable[SearchResult]
+    if mode == "semantic":
+        results = semantic_search(
+            vault_root,
+            query,
+            k=max(SEMANTIC_TOP_K, offset + (limit or 0) + 1),
+            status=status,
+            privacy=privacy,
+            stats=stats,
+        )
+    elif mode == "hybrid":
+        results = hybrid_search(
+            vault_root,
+            query,
+            pool=max(SEMANTIC_TOP_K, offset + (limit or 0) + 1),
+            status=status,
+            privacy=privacy,
+            time_budget=time_budget,
+            cancel=cancel,
+            index=index,
+            stats=stats,
+        )
+    else:
+        results = iter_search_results(
+            vault_root,
+            query,
+            status=status,
+            privacy=privacy,
+            time_budget=time_budget,
+            cancel=cancel,
+            stats=stats,
+            index=index,
+            catalog=catalog,
+        )
+    # ``results`` is lazy: "scan" covers reading, parsing and scoring as well as ranking.
+    with span("scan"):
+        page = select_page(
+            results,
+            key=result_sort_key,
+            reverse=True,
+            offset=offset,
+            limit=limit,
+            after=after,
+        )
+    window = page.items
+    payload = {
         "query": query,
-        "total": total,
+        "mode": mode,
+        "total": page.total,
         "offset": offset,
         "limit": limit,
+        "cursor": cursor,
+        "next_cursor": _next_cursor(scope, page.next_key),
+        "partial": stats.partial,
+        "scanned": stats.scanned,
         "filters": {"status": status or [], "privacy": privacy or []},
-        "results": [
+        "results": [result.to_dict() for result in window],
+    }
+    if mode == "hybrid":
+        payload["timings"] = {
+            stage.stage: round(stage.elapsed_ms, 3) for stage in stats.plan if stage.stage in HYBRID_STAGES
+        }
+    if explain:
+        payload["plan"] = {
+            "query": parse_query(query).to_dict() if mode != "semantic" else {"text": query},
+            "index": index is not None or mode == "semantic",
+            "stages": [stage.to_dict() for stage in stats.plan],
+        }
+    return payload
+
+
+def retrieve_view(
+    vault_root: Path,
+    query: str,
+    *,
+    k: int = 10,
+    mode: str = "lexical",
+    status: list[str] | None = None,
+    privacy: list[str] | None = None,
+) -> dict[str, Any]:
+    passages = retrieve_passages(vault_root, query, k=k, mode=mode, status=status, privacy=privacy)
+    return {
+        "query": query,
+        "mode": mode,
+        "k": k,
+        "filters": {"status": status or [], "privacy": privacy or []},
+        "passages": [
             {
-                "path": str(result.path),
-                "title": result.title,
-                "type": result.type,
-                "status": result.status,
-                "privacy": result.privacy,
-                "updated": result.updated,
-                "snippet": result.snippet,
+                "id": passage.id,
+                "path": str(passage.path),
+                "title": passage.title,
+                "status": passage.status,
+                "privacy": passage.privacy,
+                "score": passage.score,
+                "text": passage.text,
+                "citation": passage.citation,
             }
-            for result in window
+            for passage in passages
         ],
     }
+
+
+def graph_neighbors_view(vault_root: Path, item_id: str, *, depth: int = 1, direction: str = "both") -> dict[str, Any]:
+    neighbors = link_index(vault_root).neighbors(item_id, depth=depth, direction=direction)
+    return {
+        "id": item_id,
+        "depth": depth,
+        "direction": direction,
+        "neighbors": [{**node.to_dict(), "distance": distance} for node, distance in neighbors],
+    }
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .cache import bump_generation, set_watched
+from .catalog import active_catalog
+from .links import active_link_index
+from .ops_log import append_ops_log
+from .passages import active_passage_index
+from .text_index import active_trigram_index
+from .vault import markdown_dirs
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.2
+MAX_BATCH_DELAY = 2.0
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+# <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class WatchEvent:
+    """A coalesced change: ``modified``, ``deleted``, ``moved`` or ``rescan``.
+
+    ``rescan`` means individual paths were lost (queue overflow, directory
+    move); consumers fall back to their own stat-based refresh.
+    """
+
+    kind: str
+    path: Path
+    old_path: Path | None = None
+
+    def to_dict(self) -> dict[str, str | None]:
+        return {"kind": self.kind, "path": str(self.path), "old_path": str(self.old_path) if self.old_path else None}
+
+
+def _is_markdown(path: Path) -> bool:
+    return path.suffix == ".md" and not path.name.startswith(".")
+
+
+class _InotifyBackend:
+    """Recursive inotify watches over the markdown directories (Linux only)."""
+
+    def __init__(self, roots: list[Path]) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify requires Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        self._moves: dict[int, Path] = {}
+        for root in roots:
+            if root.exists():
+                self._watch_tree(root)
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, root: Path) -> list[tuple[str, Path, Path | None]]:
+        """Watch ``root`` and below; returns files already present (created before the watch)."""
+        found: list[tuple[str, Path, Path | None]] = []
+        for current, dirs, files in os.walk(root):
+            self._watch(Path(current))
+            found.extend(("modified", Path(current) / name, None) for name in files)
+        return found
+
+    def read(self, timeout: float) -> list[tuple[str, Path, Path | None]]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return self._flush_moves()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        raw: list[tuple[str, Path, Path | None]] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                raw.append(("rescan", Path("."), None))
+                continue
+            directory = self._dirs.get(wd)
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if directory is None or mask & _IN_DELETE_SELF:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    raw.extend(self._watch_tree(path))
+                if mask & (_IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE):
+                    raw.append(("rescan", path, None))
+            elif mask & _IN_MOVED_FROM:
+                self._moves[cookie] = path
+            elif mask & _IN_MOVED_TO:
+                old = self._moves.pop(cookie, None)
+                raw.append(("moved", path, old) if old is not None else ("modified", path, None))
+            elif mask & _IN_DELETE:
+                raw.append(("deleted", path, None))
+            elif mask & _IN_CLOSE_WRITE:
+                raw.append(("modified", path, None))
+        return raw
+
+    def _flush_moves(self) -> list[tuple[str, Path, Path | None]]:
+        # A MOVED_FROM without its MOVED_TO means the file left the watched tree.
+        gone = [("deleted", path, None) for path in self._moves.values()]
+        self._moves.clear()
+        return gone
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingBackend:
+    """``os.scandir`` stat snapshots diffed every ``interval`` seconds.
+
+    Renames are recognised by a disappearing and an appearing path sharing
+    the same inode.
+    """
+
+    def __init__(self, roots: list[Path], interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int, int]]:
+        snapshot: dict[Path, tuple[int, int, int]] = {}
+        stack = [root for root in self.roots if root.exists()]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def read(self, timeout: float) -> list[tuple[str, Path, Path | None]]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        previous, self._snapshot = self._snapshot, current
+        removed = {path: info for path, info in previous.items() if path not in current}
+        by_inode = {info[2]: path for path, info in removed.items()}
+        raw: list[tuple[str, Path, Path | None]] = []
+        for path, info in current.items():
+            old = previous.get(path)
+            if old is None:
+                source = by_inode.pop(info[2], None)
+                if source is not None:
+                    removed.pop(source)
+                    raw.append(("moved", path, source))
+                else:
+                    raw.append(("modified", path, None))
+            elif old != info:
+                raw.append(("modified", path, None))
+        raw.extend(("deleted", path, None) for path in removed)
+        return raw
+
+    def close(self) -> None:
+        return None
+
+
+def coalesce(raw: list[tuple[str, Path, Path | None]]) -> list[WatchEvent]:
+    """Collapse a burst of raw events into one event per final path."""
+    state: dict[Path, WatchEvent] = {}
+    rescan = False
+    for kind, path, old in raw:
+        if kind == "rescan":
+            rescan = True
+            continue
+        if kind == "moved" and old is not None and _is_markdown(old):
+            previous = state.pop(old, None)
+            origin = previous.old_path if previous is not None and previous.kind == "moved" else old
+            if not _is_markdown(path):
+                state[origin] = WatchEvent("deleted", origin)
+            elif origin == path:
+                state[path] = WatchEvent("modified", path)
+            else:
+                state[path] = WatchEvent("moved", path, origin)
+            continue
+        if not _is_markdown(path):
+            continue
+        if kind == "moved":
+            kind = "modified"  # atomic write: a temp file renamed over the target
+        if kind == "deleted":
+            previous = state.get(path)
+            if previous is not None and previous.kind == "moved" and previous.old_path is not None:
+                state[previous.old_path] = WatchEvent("deleted", previous.old_path)
+            state[path] = WatchEvent("deleted", path)
+            continue
+        previous = state.get(path)
+        if previous is None or previous.kind == "deleted":
+            state[path] = WatchEvent("modified", path)
+    events = list(state.values())
+    if rescan:
+        events.append(WatchEvent("rescan", Path(".")))
+    return events
+
+
+ChangeHook = Callable[[Path, list[WatchEvent]], None]
+
+
+def _update_indexes(vault_root: Path, events: list[WatchEvent]) -> None:
+    catalog, links = active_catalog(vault_root), active_link_index(vault_root)
+    candidates = (active_trigram_index(vault_root), active_passage_index(vault_root), catalog, links)
+    indexes = [index for index in candidates if index is not None]
+    for event in events:
+        for index in indexes:
+            if event.kind == "moved" and event.old_path is not None:
+                index.remove(event.old_path)
+            if event.kind == "deleted":
+                index.remove(event.path)
+            elif event.kind in ("modified", "moved"):
+                index.update(event.path)
+    if not any(event.kind == "rescan" for event in events):
+        for index in (catalog, links):
+            if index is not None:
+                index.mark_current()
+
+
+_hooks: list[ChangeHook] = [_update_indexes]
+
+
+def register_change_hook(hook: ChangeHook) -> None:
+    """Call ``hook(vault_root, events)`` for every change batch the watcher applies."""
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def apply_changes(vault_root: Path, events: list[WatchEvent]) -> int:
+    """Bump the vault generation and feed ``events`` to the change hooks."""
+    generation = bump_generation()
+    for hook in list(_hooks):
+        hook(vault_root, events)
+    return generation
+
+
+class Watcher:
+    """Watches the vault's markdown directories and applies coalesced changes.
+
+    Uses inotify (through ctypes) on Linux and falls back to stat polling.
+    Bursts are collected until ``debounce`` seconds pass without a new event
+    (at most ``MAX_BATCH_DELAY``), then applied as one batch.
+    """
+
+    def __init__(
+        self,
+        vault_root: Path,
+        *,
+        backend: str = "auto",
+        interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"backend must be one of: {', '.join(WATCH_BACKENDS)}")
+        self.vault_root = vault_root
+        self.debounce = debounce
+        roots = markdown_dirs(vault_root)
+        self._backend: _InotifyBackend | _PollingBackend
+        if backend in ("auto", "inotify"):
+            try:
+                self._backend = _InotifyBackend(roots)
+            except OSError:
+                if backend == "inotify":
+                    raise
+                self._backend = _PollingBackend(roots, interval)
+        else:
+            self._backend = _PollingBackend(roots, interval)
+        self.backend = "inotify" if isinstance(self._backend, _InotifyBackend) else "poll"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll(self, timeout: float) -> list[WatchEvent]:
+        """Wait up to ``timeout`` for changes; returns one coalesced batch."""
+        raw = self._backend.read(timeout)
+        if not raw:
+            return []
+        started = time.monotonic()
+        while time.monotonic() - started < MAX_BATCH_DELAY:
+            more = self._backend.read(self.debounce)
+            if not more:
+                break
+            raw.extend(more)
+        return coalesce(raw)
+
+    def run(self, on_batch: Callable[[int, list[WatchEvent]], None] | None = None) -> None:
+        while not self._stop.is_set():
+            events = self.poll(DEFAULT_POLL_INTERVAL)
+            if not events:
+                continue
+            try:
+                generation = apply_changes(self.vault_root, events)
+            except Exception as exc:
+                append_ops_log(self.vault_root, "watcher.error", {"error": str(exc), "events": len(events)})
+                continue
+            if on_batch is not None:
+                on_batch(generation, events)
+
+    def start(self) -> Watcher:
+        self._thread = threading.Thread(target=self.run, name="vault-watcher", daemon=True)
+        self._thread.start()
+        set_watched(self.vault_root, True)
+        return self
+
+    def stop(self) -> None:
+        set_watched(self.vault_root, False)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._backend.close()
@@ -14,6 +14,7 @@ from pathlib import Path
 import pytest
 
 from substrate.io import parse_frontmatter
+from substrate.items import create_inbox_note
 
 
 def _repo_root() -> Path:
@@ -32,7 +33,7 @@ def _pick_port() -> int:
     return port
 
 
-def _start_server(vault_root: Path, port: int, token: str | None = None) -> subprocess.Popen:
+def _start_server(vault_root: Path, port: int, token: str | None = None, *flags: str) -> subprocess.Popen:
     root = _repo_root()
     env = os.environ.copy()
     env["PYTHONPATH"] = str(root)
@@ -46,6 +47,7 @@ def _start_server(vault_root: Path, port: int, token: str | None = None) -> subp
     ]
     if token:
         cmd.extend(["--token", token])
+    cmd.extend(flags)
     return subprocess.Popen(
         cmd,
         cwd=str(root),
@@ -304,3 +306,32 @@ def test_api_server_editor_endpoints_require_token(vault_root: Path):
             proc.wait(timeout=2)
         except subprocess.TimeoutExpired:
             proc.kill()
+
+
+def test_api_server_catalog_runs_watcher(vault_root: Path):
+    try:
+        port = _pick_port()
+    except PermissionError:
+        pytest.skip("Socket binding not permitted in this environment")
+
+    note = create_inbox_note(vault_root, title="Before", body="")
+    proc = _start_server(vault_root, port, None, "--catalog")
+    try:
+        base = f"http://127.0.0.1:{port}"
+        _wait_for(f"{base}/api/inbox", proc)
+        _json_get(f"{base}/api/inbox")
+        _json_get(f"{base}/api/inbox")
+        # Views are only cached while a watcher runs.
+        assert _json_get(f"{base}/api/cache/stats")["hits"] >= 1
+
+        note.write_text(note.read_text(encoding="utf-8").replace("Before", "After"), encoding="utf-8")
+        deadline = time.time() + 5
+        while [item["title"] for item in _json_get(f"{base}/api/inbox")["items"]] != ["After"]:
+            assert time.time() < deadline, "watcher did not apply the edit"
+            time.sleep(0.1)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
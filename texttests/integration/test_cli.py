@@ -78,6 +78,10 @@ def test_cli_repair_tree(vault_root: Path):
     items_root.mkdir(parents=True, exist_ok=True)
     safe_write_text(good_file, dump_frontmatter(good_frontmatter, "Body"))
     bad_file.write_text("no frontmatter", encoding="utf-8")
+    nested_file = items_root / "01HZX0" / "nested.md"
+    nested_file.parent.mkdir()
+    nested_file.write_text("no frontmatter", encoding="utf-8")
+    (items_root / "notes.txt").write_text("not markdown", encoding="utf-8")
 
     result = _run_cli(["repair-tree", str(vault_root), str(items_root)])
     assert result.returncode == 0, result.stderr
@@ -85,6 +89,8 @@ def test_cli_repair_tree(vault_root: Path):
     actions = {entry["file"]: entry["action"] for entry in payload}
     assert str(bad_file) in actions
     assert actions[str(bad_file)] == "quarantined"
+    assert actions[str(nested_file)] == "quarantined"
+    assert str(items_root / "notes.txt") not in actions
 
 
 def test_cli_repair_dry_run_no_quarantine(vault_root: Path):
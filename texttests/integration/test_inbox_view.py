@@ -140,3 +140,40 @@ def test_inbox_view_filters(vault_root: Path):
     payload = json.loads(result.stdout)
     titles = [item["title"] for item in payload["items"]]
     assert titles == ["Sensitive"]
+
+
+def test_inbox_view_cursor_paging(vault_root: Path):
+    from substrate.items import create_inbox_note
+    from substrate.views import inbox_view
+
+    for idx in range(5):
+        create_inbox_note(vault_root, title=f"Note {idx}")
+
+    full = inbox_view(vault_root, sort="title_asc")
+    expected = [item["title"] for item in full["items"]]
+    assert full["next_cursor"] is None
+
+    titles: list[str] = []
+    cursor = None
+    while True:
+        page = inbox_view(vault_root, limit=2, sort="title_asc", cursor=cursor)
+        assert page["total"] == 5
+        titles.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert titles == expected
+
+    first = inbox_view(vault_root, limit=2, sort="title_asc")
+    result = _run_cli(
+        [
+            "inbox-view",
+            str(vault_root),
+            "--sort",
+            "title_desc",
+            "--cursor",
+            first["next_cursor"],
+        ]
+    )
+    assert result.returncode == 1
+    assert "cursor" in result.stdout
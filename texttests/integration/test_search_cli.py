@@ -64,3 +64,24 @@ def test_search_cli_filters(vault_root: Path):
     assert result.returncode == 0, result.stderr
     payload = json.loads(result.stdout)
     assert not any(item["title"] == "PrivateNote" for item in payload)
+
+
+def test_search_cli_fielded_query_explain(vault_root: Path):
+    result = _run_cli([
+        "capture",
+        str(vault_root),
+        "--title",
+        "Tagged",
+        "--body",
+        "travel notes",
+        "--tags",
+        "travel",
+    ])
+    assert result.returncode == 0, result.stderr
+
+    result = _run_cli(["search", str(vault_root), "tag:travel -status:archived notes", "--explain"])
+    assert result.returncode == 0, result.stderr
+    payload = json.loads(result.stdout)
+    assert [item["title"] for item in payload["results"]] == ["Tagged"]
+    assert payload["plan"]["query"]["clauses"] == ["tag:travel", "-status:archived", "notes"]
+    assert payload["plan"]["stages"]
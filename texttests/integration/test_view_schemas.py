@@ -5,7 +5,7 @@ from pathlib import Path
 
 from substrate.items import create_inbox_note
 from substrate.json_schema import validate_schema
-from substrate.views import inbox_view, load_item_view, search_view
+from substrate.views import inbox_view, load_item_view, retrieve_view, search_view
 
 
 def _load_schema(name: str) -> dict:
@@ -33,3 +33,11 @@ def test_search_view_schema(vault_root: Path):
     errors = validate_schema(payload, _load_schema("search_view.json"))
     assert errors == []
     assert payload["total"] >= 1
+
+
+def test_retrieve_view_schema(vault_root: Path):
+    create_inbox_note(vault_root, title="Passage", body="needle in haystack")
+    payload = retrieve_view(vault_root, "needle", k=5)
+    errors = validate_schema(payload, _load_schema("retrieve_view.json"))
+    assert errors == []
+    assert len(payload["passages"]) == 1
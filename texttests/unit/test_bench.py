@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from substrate.constants import DEFAULT_SCHEMA_PATH
+from substrate.io import parse_frontmatter, safe_read_text
+from substrate.schema import load_schema, validate_frontmatter
+from substrate.vault import iter_markdown_files
+from tools.bench.load import DEFAULT_MIX, _free_port, check_targets, parse_mix, run_load, start_server, summarize
+from tools.bench.memory import parse_budgets, run_memory
+from tools.bench.run import compare, run_benchmarks
+from tools.bench.synthetic import VaultSpec, generate_vault
+
+SPEC = VaultSpec(items=40, daily_notes=3, ops_entries=50, body_words=30)
+
+
+def _snapshot(root: Path) -> dict[str, str]:
+    return {path.relative_to(root).as_posix(): path.read_text(encoding="utf-8") for path in iter_markdown_files(root)}
+
+
+def test_generator_is_deterministic_and_schema_valid(tmp_path: Path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    counts = generate_vault(first, SPEC)
+    generate_vault(second, SPEC)
+    assert counts["items"] + counts["inbox"] == 40
+    assert _snapshot(first) == _snapshot(second)
+
+    schema = load_schema(DEFAULT_SCHEMA_PATH)
+    for path in iter_markdown_files(first):
+        assert validate_frontmatter(parse_frontmatter(safe_read_text(path)).frontmatter, schema) == []
+    assert len((first / "vault" / "_system" / "logs" / "ops.jsonl").read_text().splitlines()) == 50
+
+
+def test_run_benchmarks_reports_and_compares(tmp_path: Path):
+    root = tmp_path / "vault_root"
+    generate_vault(root, SPEC)
+    report = run_benchmarks(root, rounds=2, only=["search_items", "promote_inbox_item"], spec=SPEC)
+    assert set(report["results"]) == {"search_items", "promote_inbox_item"}
+    assert report["results"]["search_items"]["rounds"] == 2
+
+    slower = {"results": {name: {**stats, "median_ms": stats["median_ms"] * 2} for name, stats in report["results"].items()}}
+    rows = compare(report, slower, threshold=1.5)
+    assert all(row["regression"] for row in rows)
+
+
+def test_load_mix_summary_and_targets():
+    assert parse_mix("search=3,inbox") == {"search": 3.0, "inbox": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("search=1,bogus=2")
+
+    samples = {"search": [(i / 1000, i != 100) for i in range(1, 101)]}
+    routes = summarize(samples, elapsed=2.0)
+    assert routes["search"]["requests"] == 100
+    assert routes["search"]["errors"] == 1
+    assert routes["search"]["rps"] == 50.0
+    assert routes["search"]["p50_ms"] == 50.0
+    assert routes["search"]["p95_ms"] == 95.0
+    assert routes["search"]["p99_ms"] == 99.0
+    checks = check_targets(routes, {"search": {"p50_ms": 40.0, "p95_ms": 2000.0}})
+    assert [check["pass"] for check in checks] == [False, True]
+
+
+def test_load_run_against_stdlib_server(tmp_path: Path):
+    root = tmp_path / "vault_root"
+    generate_vault(root, SPEC)
+    port = _free_port()
+    proc = start_server("stdlib", root, port, ["--token", "secret"], token="secret")
+    try:
+        url = f"http://127.0.0.1:{port}"
+        report = asyncio.run(run_load(url, mix=parse_mix(DEFAULT_MIX), concurrency=2, duration=1.0, token="secret"))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    assert report["total"]["requests"] > 0
+    assert report["total"]["errors"] == 0
+    assert set(report["routes"]) <= {"inbox", "item", "search", "capture", "update"}
+
+
+def test_start_server_ready_on_auth_error(tmp_path: Path):
+    root = tmp_path / "vault_root"
+    generate_vault(root, SPEC)
+    proc = start_server("stdlib", root, _free_port(), ["--token", "secret"])  # probe gets 401
+    proc.terminate()
+    proc.wait(timeout=10)
+
+
+def test_memory_peaks_are_reported_per_size():
+    with pytest.raises(ValueError):
+        parse_budgets(["list_inbox=10"])
+    report = run_memory(SPEC, sizes=(20, 60), budgets=parse_budgets(["search_view=1e9", "inbox_view=1e9"]))
+    assert report["sizes"] == [20, 60]
+    for row in report["results"].values():
+        assert set(row["peak_bytes"]) == {"20", "60"}
+        assert row["bytes_per_item"] is not None and row["within_budget"]
+    assert report["listings"]["search_items"]["records"] > 0
+    assert run_memory(SPEC, sizes=()) == {"sizes": [], "results": {}, "listings": None}
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from substrate.api import api_inbox, api_item_update, api_search
+from substrate.cache import ViewCache, bump_generation, cached_view, set_watched, vault_generation, view_cache
+from substrate.io import dump_frontmatter, safe_write_text
+from substrate.items import create_inbox_note, promote_inbox_item
+from substrate.watcher import Watcher
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache(vault_root: Path):
+    # Views are only cached while a watcher reports changes for the vault.
+    view_cache.clear()
+    set_watched(vault_root, True)
+    yield
+    set_watched(vault_root, False)
+    view_cache.clear()
+
+
+def _search(vault_root: Path, query: str) -> dict:
+    return api_search(
+        vault_root,
+        query=query,
+        limit=20,
+        offset=0,
+        status=None,
+        privacy=None,
+        token_required=None,
+        token_provided=None,
+    )
+
+
+def _inbox(vault_root: Path) -> dict:
+    return api_inbox(
+        vault_root,
+        limit=20,
+        offset=0,
+        sort="updated_desc",
+        status=None,
+        privacy=None,
+        token_required=None,
+        token_provided=None,
+    )
+
+
+def test_view_cache_lru_eviction_by_bytes():
+    payload = {"data": "x" * 100}
+    size = len(json.dumps(payload, separators=(",", ":")))
+    cache = ViewCache(max_bytes=size * 2)
+    cache.put(("a",), payload)
+    cache.put(("b",), payload)
+    assert cache.get(("a",)) == payload
+    cache.put(("c",), payload)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == payload
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+    assert stats.bytes == size * 2
+    assert stats.hits == 2
+    assert stats.misses == 1
+
+
+def test_view_cache_skips_oversized_and_uncacheable(vault_root: Path):
+    cache = ViewCache(max_bytes=4)
+    cache.put(("big",), {"data": "too large"})
+    assert cache.stats().entries == 0
+
+    calls = []
+
+    def compute() -> dict:
+        calls.append(1)
+        return {"partial": True}
+
+    cached_view("search", vault_root, {}, compute, cacheable=lambda p: not p["partial"])
+    cached_view("search", vault_root, {}, compute, cacheable=lambda p: not p["partial"])
+    assert len(calls) == 2
+
+
+def test_cache_hit_and_invalidation_on_capture(vault_root: Path):
+    create_inbox_note(vault_root, title="First", body="needle")
+    first = _search(vault_root, "needle")
+    assert first["total"] == 1
+    assert _search(vault_root, "needle") == first
+    assert view_cache.stats().hits == 1
+
+    create_inbox_note(vault_root, title="Second", body="needle")
+    assert _search(vault_root, "needle")["total"] == 2
+    assert _inbox(vault_root)["total"] == 2
+
+
+def test_cache_invalidated_by_item_update_and_promote(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Before", body="body")
+    assert [item["title"] for item in _inbox(vault_root)["items"]] == ["Before"]
+
+    api_item_update(
+        vault_root,
+        payload={"path": str(path), "frontmatter": {"title": "After"}},
+        token_required=None,
+        token_provided=None,
+    )
+    assert [item["title"] for item in _inbox(vault_root)["items"]] == ["After"]
+
+    promote_inbox_item(vault_root, path)
+    assert _inbox(vault_root)["total"] == 0
+    assert _search(vault_root, "after")["total"] == 1
+
+
+def test_cache_detects_external_writes(vault_root: Path):
+    assert _search(vault_root, "external")["total"] == 0
+    frontmatter = {
+        "schema_version": "0.1",
+        "id": "01HZX0M0M4W6W7K7Q8T2K3Q2Q9",
+        "type": "note",
+        "created": "2026-02-03T10:00:00+00:00",
+        "updated": "2026-02-03T10:00:00+00:00",
+        "status": "canonical",
+        "privacy": "private",
+        "title": "External",
+    }
+    target = vault_root / "vault" / "items" / "01HZX0M0M4W6W7K7Q8T2K3Q2Q9.md"
+    safe_write_text(target, dump_frontmatter(frontmatter, "written by another tool"))
+    assert _search(vault_root, "external")["total"] == 1
+
+
+def test_bump_generation_invalidates(vault_root: Path):
+    calls = []
+
+    def compute() -> dict:
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert cached_view("inbox", vault_root, {"limit": 1}, compute) == {"n": 1}
+    assert cached_view("inbox", vault_root, {"limit": 1}, compute) == {"n": 1}
+    bump_generation()
+    assert cached_view("inbox", vault_root, {"limit": 1}, compute) == {"n": 2}
+
+
+def _edit_in_place(path: Path, old: str, new: str) -> None:
+    # Rewrites the file without a rename, so no directory mtime changes.
+    text = path.read_text(encoding="utf-8").replace(old, new)
+    with path.open("r+", encoding="utf-8") as handle:
+        handle.write(text)
+        handle.truncate()
+
+
+def test_unwatched_vault_sees_in_place_edits(vault_root: Path):
+    set_watched(vault_root, False)
+    path = create_inbox_note(vault_root, title="Draft", body="plain")
+    assert _search(vault_root, "zebra")["total"] == 0
+    _edit_in_place(path, "plain", "zebra")
+    assert _search(vault_root, "zebra")["total"] == 1
+    assert view_cache.stats().entries == 0
+
+
+def test_watcher_invalidates_on_in_place_edit(vault_root: Path):
+    set_watched(vault_root, False)
+    path = create_inbox_note(vault_root, title="Draft", body="plain")
+    watcher = Watcher(vault_root, debounce=0.05).start()
+    try:
+        assert _search(vault_root, "zebra")["total"] == 0
+        before = vault_generation()
+        _edit_in_place(path, "plain", "zebra")
+        deadline = time.monotonic() + 10
+        while vault_generation() == before and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _search(vault_root, "zebra")["total"] == 1
+    finally:
+        watcher.stop()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate import catalog as catalog_module
+from substrate.cache import set_watched
+from substrate.catalog import Catalog
+from substrate.items import create_inbox_note
+from substrate.search import SearchStats, search_items
+from substrate.views import inbox_view
+from substrate.watcher import WatchEvent, apply_changes
+
+
+@pytest.fixture(params=["numpy", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(catalog_module, "np", None)
+    elif catalog_module.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def _populate(vault_root: Path) -> None:
+    for idx, privacy in enumerate(["private", "public", "sensitive", "public", "private", "public"]):
+        create_inbox_note(vault_root, title=f"{'Zeta' if idx % 2 else 'alpha'} {idx}", privacy=privacy)
+    # Hand-written timestamps that do not round-trip through isoformat().
+    (vault_root / "vault" / "inbox" / "legacy.md").write_text(
+        "---\ntitle: Legacy\nstatus: triage\nprivacy: public\n"
+        "created: 2024-01-01T00:00:00Z\nupdated: '2024-01-02'\n---\nold\n",
+        encoding="utf-8",
+    )
+
+
+def _walk(vault_root: Path, **kwargs) -> list[dict]:
+    """Every page of ``inbox_view`` by cursor, as a list of payloads."""
+    pages, cursor = [], None
+    while True:
+        payload = inbox_view(vault_root, cursor=cursor, **kwargs)
+        pages.append(payload)
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+FILTERS = [{}, {"privacy": ["public"]}, {"status": ["inbox"], "privacy": ["private", "sensitive"]}]
+
+
+@pytest.mark.parametrize("sort", ["updated_desc", "updated_asc", "created_desc", "title_asc", "title_desc"])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_catalog_pages_match_list_inbox(vault_root: Path, backend: str, sort: str, filters: dict):
+    _populate(vault_root)
+    catalog = Catalog(vault_root)
+    for offset, limit in [(0, None), (0, 2), (1, 3), (10, 2)]:
+        kwargs = {"sort": sort, "offset": offset, "limit": limit, **filters}
+        assert inbox_view(vault_root, catalog=catalog, **kwargs) == inbox_view(vault_root, **kwargs)
+    assert _walk(vault_root, sort=sort, limit=2, catalog=catalog, **filters) == _walk(
+        vault_root, sort=sort, limit=2, **filters
+    )
+
+
+def test_catalog_follows_change_events_without_rescanning(vault_root: Path, backend: str, monkeypatch):
+    _populate(vault_root)
+    catalog = catalog_module.enable_catalog(vault_root)
+    set_watched(vault_root, True)  # as Watcher.start() does
+    try:
+        catalog.inbox_page(field="title", reverse=False)  # build the title permutation
+        legacy = vault_root / "vault" / "inbox" / "legacy.md"
+        legacy.write_text(legacy.read_text(encoding="utf-8").replace("Legacy", "Aardvark"), encoding="utf-8")
+        added = create_inbox_note(vault_root, title="Middle", privacy="public")
+        removed = next(path for path in (vault_root / "vault" / "inbox").iterdir() if path != legacy and path != added)
+        removed.unlink()
+        events = [WatchEvent("modified", legacy), WatchEvent("modified", added), WatchEvent("deleted", removed)]
+
+        def _no_walk(vault_root: Path):
+            raise AssertionError("catalog re-walked the vault")
+
+        apply_changes(vault_root, events)
+        monkeypatch.setattr(catalog_module, "iter_markdown_files", _no_walk)
+        page = catalog.inbox_page(field="title", reverse=False)
+        titles = [item.title for item in page.items]
+        assert titles == sorted(titles, key=str.casefold) and titles[0] == "Aardvark" and "Middle" in titles
+        assert str(removed) not in {str(item.path) for item in page.items}
+        assert inbox_view(vault_root, sort="title_asc", catalog=catalog) == inbox_view(vault_root, sort="title_asc")
+    finally:
+        set_watched(vault_root, False)
+        catalog_module.disable_catalog(vault_root)
+
+
+def test_catalog_compacts_after_removals(vault_root: Path, backend: str):
+    paths = [create_inbox_note(vault_root, title=f"Doc {idx}") for idx in range(6)]
+    catalog = Catalog(vault_root)
+    catalog.refresh()
+    for path in paths[:4]:
+        path.unlink()
+        catalog.remove(path)
+    assert len(catalog) == 2 and len(catalog._paths) == 2
+    assert [item.title for item in catalog.inbox_page(field="title", reverse=False).items] == ["Doc 4", "Doc 5"]
+
+
+def test_search_prefilters_coded_fields_with_catalog(vault_root: Path, backend: str):
+    _populate(vault_root)
+    catalog = Catalog(vault_root)
+    stats = SearchStats()
+    query = "privacy:public -status:triage"
+    results = search_items(vault_root, query)
+    assert [r.path for r in results] == [r.path for r in search_items(vault_root, query, catalog=catalog, stats=stats)]
+    assert stats.plan[0].stage == "columnar" and stats.plan[0].output == len(results) == 3
+    assert stats.scanned == 3
+
+
+def test_catalog_sees_in_place_edits_without_watcher(vault_root: Path, backend: str):
+    path = create_inbox_note(vault_root, title="Hello", body="hello world", privacy="private")
+    catalog = Catalog(vault_root)
+    assert inbox_view(vault_root, catalog=catalog, privacy=["public"])["total"] == 0
+    text = path.read_text(encoding="utf-8").replace("privacy: private", "privacy: public")
+    with path.open("r+", encoding="utf-8") as handle:  # no rename, so no directory mtime change
+        handle.write(text)
+        handle.truncate()
+    assert inbox_view(vault_root, catalog=catalog, privacy=["public"])["total"] == 1
+    assert [r.path for r in search_items(vault_root, "privacy:public hello", catalog=catalog)] == [path]
+
+
+def test_inbox_cursor_is_bound_to_filters(vault_root: Path):
+    _populate(vault_root)
+    cursor = inbox_view(vault_root, limit=2, privacy=["public"])["next_cursor"]
+    assert inbox_view(vault_root, limit=2, privacy=["public"], cursor=cursor)["items"]
+    with pytest.raises(ValueError, match="cursor does not match"):
+        inbox_view(vault_root, limit=2, privacy=["private"], cursor=cursor)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from substrate.chunks import chunk_text
+from substrate.items import create_inbox_note
+from substrate.passages import passage_index, read_passage, retrieve_passages
+
+
+def test_chunks_overlap_and_cite_exact_bytes_and_lines():
+    header = "---\nid: DOC\n---\n"
+    body = "\n\n".join(f"Paragraph {idx} talks about café number {idx}." for idx in range(40))
+    text = header + body
+    chunks = chunk_text(text, len(header), "DOC", max_chars=200, overlap=50)
+    assert len(chunks) > 5
+    raw = text.encode("utf-8")
+    for chunk in chunks:
+        assert raw[chunk.byte_start : chunk.byte_end].decode("utf-8") == chunk.text
+        lines = text.split("\n")[chunk.line_start - 1 : chunk.line_end]
+        assert chunk.text.startswith(lines[0].strip()[:10])
+        assert len(chunk.text) <= 200
+    for first, second in zip(chunks, chunks[1:]):
+        assert second.byte_start < first.byte_end
+
+
+def test_chunk_ids_survive_appends():
+    header = "---\nid: DOC\n---\n"
+    body = "First paragraph stays.\n\n" + "Second paragraph. " * 30
+    before = chunk_text(header + body, len(header), "DOC", max_chars=120, overlap=20)
+    after = chunk_text(header + body + "\n\nAppended later.", len(header), "DOC", max_chars=120, overlap=20)
+    assert [chunk.id for chunk in before[:-1]] == [chunk.id for chunk in after[: len(before) - 1]]
+
+
+def test_daily_notes_chunk_by_entry():
+    header = "---\nid: DAY\ntype: daily\n---\n"
+    text = header + "Met Ana about the roadmap\n\nFixed the kettle\n"
+    chunks = chunk_text(text, len(header), "DAY", daily=True)
+    assert [chunk.text for chunk in chunks] == ["Met Ana about the roadmap", "Fixed the kettle"]
+    assert [chunk.line_start for chunk in chunks] == [5, 7]
+
+
+def test_retrieve_ranks_passages_and_tracks_edits(vault_root: Path):
+    body = "Intro text.\n\n" + "filler words here. " * 60 + "\n\nThe launch codes are in the blue folder."
+    path = create_inbox_note(vault_root, title="Notes", body=body)
+    create_inbox_note(vault_root, title="Other", body="Nothing about folders of any colour.")
+    passages = retrieve_passages(vault_root, "blue folder", k=2)
+    assert "blue folder" in passages[0].text
+    assert passages[0].path == path
+    citation = passages[0].citation
+    assert read_passage(path, passages[0].id, citation["byte_start"], citation["byte_end"]) == passages[0].text
+
+    index = passage_index(vault_root)
+    path.write_text(path.read_text(encoding="utf-8").replace("blue", "green"), encoding="utf-8")
+    index.update(path)
+    assert read_passage(path, passages[0].id, citation["byte_start"], citation["byte_end"]) is None
+    assert "green folder" in retrieve_passages(vault_root, "green folder", k=1)[0].text
+
+
+def test_crlf_files_cite_raw_bytes(vault_root: Path):
+    body = "Intro line.\n\n" + "filler words here. " * 60 + "\n\nThe launch codes are in the blue folder, café."
+    lf = create_inbox_note(vault_root, title="Unix", body=body)
+    crlf = create_inbox_note(vault_root, title="Windows", body=body)
+    crlf.write_bytes(crlf.read_bytes().replace(b"\n", b"\r\n"))
+    passages = retrieve_passages(vault_root, "launch codes", k=5)
+    assert sorted(passage.path for passage in passages if "launch codes" in passage.text) == sorted([lf, crlf])
+    raw = crlf.read_bytes()
+    for passage in passages:
+        if passage.path == crlf:
+            cited = raw[passage.citation["byte_start"] : passage.citation["byte_end"]].decode("utf-8")
+            assert cited.replace("\r\n", "\n") == passage.text
+
+
+def test_retrieve_filters_fold_case(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Notes", body="The launch codes are in the blue folder.")
+    expected = [passage.path for passage in retrieve_passages(vault_root, "blue folder", status=["inbox"])]
+    assert expected == [path]
+    assert [passage.path for passage in retrieve_passages(vault_root, "blue folder", status=["Inbox"])] == expected
+    assert retrieve_passages(vault_root, "blue folder", status=["ARCHIVED"]) == []
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate.dedupe import DedupeIndex, estimate_jaccard, minhash, shingles
+from substrate.items import create_inbox_note
+
+BASE = " ".join(f"word{idx}" for idx in range(200))
+
+
+def _titles(index: DedupeIndex) -> list[list[str]]:
+    return [[member.title for member in group.members] for group in index.groups()]
+
+
+def test_minhash_estimates_jaccard():
+    first = shingles(BASE)
+    second = shingles(BASE.replace("word100", "changed"))
+    exact = len(first & second) / len(first | second)
+    estimate = estimate_jaccard(minhash(first), minhash(second))
+    assert abs(estimate - exact) < 0.15
+    assert estimate_jaccard(minhash(first), minhash(shingles("something else entirely here"))) < 0.1
+
+
+def test_groups_are_transitive_and_incremental(vault_root: Path):
+    create_inbox_note(vault_root, title="A", body=BASE)
+    create_inbox_note(vault_root, title="B", body=BASE.replace("word10 ", "x "))
+    create_inbox_note(vault_root, title="Other", body="a completely unrelated note about gardening")
+    index = DedupeIndex(vault_root)
+    groups = list(index.groups())
+    assert len(groups) == 1
+    assert sorted(member.title for member in groups[0].members) == ["A", "B"]
+
+    added = create_inbox_note(vault_root, title="C", body=BASE.replace("word190 ", "y "))
+    index.update(added)
+    assert sorted(sorted(group) for group in _titles(index)) == [["A", "B", "C"]]
+
+    reloaded = DedupeIndex(vault_root)
+    assert sorted(sorted(group) for group in _titles(reloaded)) == [["A", "B", "C"]]
+    assert (vault_root / "vault" / "_system" / "dedupe" / "signatures.bin").exists()
+
+
+def test_empty_bodies_are_skipped(vault_root: Path):
+    create_inbox_note(vault_root, title="Empty", body="")
+    create_inbox_note(vault_root, title="Empty too", body="")
+    assert _titles(DedupeIndex(vault_root)) == []
+    assert _titles(DedupeIndex(vault_root)) == []
+
+
+def test_edits_append_to_journal_and_regroup_locally(vault_root: Path, monkeypatch):
+    first = create_inbox_note(vault_root, title="A", body=BASE)
+    second = create_inbox_note(vault_root, title="B", body=BASE.replace("word10 ", "x "))
+    create_inbox_note(vault_root, title="Other", body="a completely unrelated note about gardening")
+    index = DedupeIndex(vault_root)
+    assert _titles(index) == [["A", "B"]]
+    directory = vault_root / "vault" / "_system" / "dedupe"
+    files_json = (directory / "files.json").read_bytes()
+    rows = (directory / "signatures.bin").stat().st_size
+
+    monkeypatch.setattr(DedupeIndex, "_save", lambda self: pytest.fail("full rewrite"))
+    edited = second.read_text(encoding="utf-8").replace(BASE.replace("word10 ", "x "), "now about cooking")
+    second.write_text(edited, encoding="utf-8")
+    index.update(second)
+    assert _titles(index) == []
+    second.write_text(second.read_text(encoding="utf-8").replace("now about cooking", BASE), encoding="utf-8")
+    index.update(second)
+    first.unlink()
+    index.update(first)
+    third = create_inbox_note(vault_root, title="C", body=BASE.replace("word150 ", "z "))
+    index.update(third)
+    assert _titles(index) == [["B", "C"]]
+    assert (directory / "files.json").read_bytes() == files_json
+    assert (directory / "signatures.bin").stat().st_size > rows
+    assert len((directory / "changes.jsonl").read_text(encoding="utf-8").splitlines()) == 4
+
+    monkeypatch.undo()
+    assert _titles(DedupeIndex(vault_root)) == [["B", "C"]]
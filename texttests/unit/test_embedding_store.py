@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from substrate.embedding_store import EmbeddingStore, content_hash, embed_with_store
+from substrate.embeddings import HashingEmbedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, fail_after: int | None = None) -> None:
+        super().__init__(dim=8, n_features=64)
+        self.calls: list[int] = []
+        self.fail_after = fail_after
+
+    def embed(self, texts):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise RuntimeError("interrupted")
+        self.calls.append(len(texts))
+        return super().embed(texts)
+
+
+def test_store_reuses_unchanged_texts(vault_root: Path):
+    embedder = CountingEmbedder()
+    texts = [f"text {idx}" for idx in range(10)]
+    store = EmbeddingStore(vault_root, embedder.model_id, embedder.dim)
+    vectors, result = embed_with_store(store, embedder, texts, batch_size=4, workers=2)
+    assert (result.embedded, result.reused, result.batches) == (10, 0, 3)
+    assert np.allclose(vectors, HashingEmbedder(dim=8, n_features=64).embed(texts))
+
+    reopened = EmbeddingStore(vault_root, embedder.model_id, embedder.dim)
+    again, result = embed_with_store(reopened, embedder, texts + ["new text"], batch_size=4)
+    assert (result.embedded, result.reused) == (1, 10)
+    assert np.array_equal(again[:10], vectors)
+
+
+def test_interrupted_job_resumes_from_stored_batches(vault_root: Path):
+    texts = [f"text {idx}" for idx in range(12)]
+    failing = CountingEmbedder(fail_after=2)
+    store = EmbeddingStore(vault_root, failing.model_id, failing.dim)
+    with pytest.raises(RuntimeError):
+        embed_with_store(store, failing, texts, batch_size=4, workers=1)
+
+    resumed = CountingEmbedder()
+    store = EmbeddingStore(vault_root, resumed.model_id, resumed.dim)
+    assert len(store) == 8
+    _, result = embed_with_store(store, resumed, texts, batch_size=4, workers=1)
+    assert resumed.calls == [4]
+    assert (result.embedded, result.reused) == (4, 8)
+
+
+def test_store_ignores_vectors_without_keys(vault_root: Path):
+    store = EmbeddingStore(vault_root, "m", 2)
+    store.add([content_hash("a")], np.ones((1, 2), dtype=np.float32))
+    with store.vectors_path.open("ab") as handle:
+        handle.write(np.zeros(2, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingStore(vault_root, "m", 2)
+    assert len(reopened) == 1
+    assert reopened.vectors_path.stat().st_size == 8
+
+
+def test_texts_are_streamed_into_batches(vault_root: Path):
+    yielded = []
+    seen_at_call = []
+
+    class RecordingEmbedder(CountingEmbedder):
+        def embed(self, texts):
+            seen_at_call.append(len(yielded))
+            return super().embed(texts)
+
+    def texts():
+        for idx in range(40):
+            yielded.append(idx)
+            yield f"text {idx}"
+
+    embedder = RecordingEmbedder()
+    store = EmbeddingStore(vault_root, embedder.model_id, embedder.dim)
+    vectors, result = embed_with_store(store, embedder, texts(), batch_size=4, workers=1)
+    assert (result.total, result.embedded, result.batches) == (40, 40, 10)
+    assert len(vectors) == 40
+    # One worker keeps at most two batches in flight, so batch i starts
+    # before the generator has produced batch i + 3.
+    assert all(seen <= 4 * (call + 3) for call, seen in enumerate(seen_at_call))
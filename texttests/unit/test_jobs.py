@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from substrate import jobs
+from substrate.api import ApiError, api_jobs
+from substrate.items import read_item
+from substrate.jobs import create_import_job, open_job
+
+
+def _sources(tmp_path: Path) -> Path:
+    source = tmp_path / "import"
+    source.mkdir()
+    for idx in range(12):
+        (source / f"note{idx}.md").write_text(f"# Heading {idx}\n\nFirst line {idx}.\n", encoding="utf-8")
+    (source / "copy.md").write_text("# Heading 0\n\nFirst line 0.\n", encoding="utf-8")
+    (source / "scan.pdf").write_bytes(b"%PDF-1.4 fake")
+    return source
+
+
+def test_import_job_runs_all_stages(vault_root: Path, tmp_path: Path):
+    job = create_import_job(vault_root, [_sources(tmp_path)], job_id="first")
+    progress = job.run(workers=2, queue_size=2)
+    assert progress["state"] == "completed"
+    assert progress["items"] == progress["completed"] == 14
+    assert set(progress["stages"]) == set(jobs.STAGES)
+
+    notes = sorted((vault_root / "vault" / "inbox").glob("*.md"))
+    assert len(notes) == 13  # copy.md has the same bytes as note0.md
+    items = {read_item(path).frontmatter["title"]: read_item(path) for path in notes}
+    assert items["Heading 3"].frontmatter["summary"] == "First line 3."
+    assert items["scan"].frontmatter["type"] == "document"
+    raw = items["scan"].frontmatter["sources"][0]["raw"]
+    assert (vault_root / raw).read_bytes() == b"%PDF-1.4 fake"
+    ops_log = (vault_root / "vault" / "_system" / "logs" / "ops.jsonl").read_text(encoding="utf-8")
+    assert sum(json.loads(line)["op"] == "import.note" for line in ops_log.splitlines()) == 13
+
+
+def test_resume_skips_completed_work(vault_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    job = create_import_job(vault_root, [_sources(tmp_path)], job_id="crashy")
+    job.run(workers=2)
+    # Simulate a crash after hashing: later stages only finished half the items.
+    for stage in ("extract", "canonicalize", "enrich", "index"):
+        path = job.directory / f"{stage}.jsonl"
+        lines = path.read_text(encoding="utf-8").splitlines()
+        path.write_text("\n".join(lines[:7]) + '\n{"key": "torn', encoding="utf-8")
+
+    hashed: list[str] = []
+    original = jobs.hash_file
+    monkeypatch.setattr(jobs, "hash_file", lambda path, algorithm: hashed.append(path) or original(path, algorithm))
+    progress = open_job(vault_root, "crashy").run()
+    assert hashed == []
+    assert progress["stages"]["hash"]["skipped"] == 14
+    assert progress["stages"]["index"]["done"] == 7
+    assert len(list((vault_root / "vault" / "inbox").glob("*.md"))) == 13
+
+
+def test_failed_items_are_recorded_and_retried(vault_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = _sources(tmp_path)
+    job = create_import_job(vault_root, [source], job_id="flaky")
+    original = jobs.archive_file
+
+    def flaky(vault_root, path, *args):
+        if path.name == "scan.pdf":
+            raise OSError("disk full")
+        return original(vault_root, path, *args)
+
+    monkeypatch.setattr(jobs, "archive_file", flaky)
+    progress = job.run()
+    assert progress["state"] == "completed_with_errors"
+    error = json.loads((job.directory / "errors.jsonl").read_text(encoding="utf-8"))
+    assert (error["stage"], error["error"]) == ("extract", "disk full")
+
+    monkeypatch.setattr(jobs, "archive_file", original)
+    progress = open_job(vault_root, "flaky").run()
+    assert progress["errors"] == 0
+    assert progress["stages"]["extract"]["done"] == 1
+
+
+def test_api_jobs_lists_progress(vault_root: Path, tmp_path: Path):
+    create_import_job(vault_root, [_sources(tmp_path)], job_id="api").run()
+    listed = api_jobs(vault_root, job_id=None, token_required=None, token_provided=None)
+    assert [job["id"] for job in listed["jobs"]] == ["api"]
+    single = api_jobs(vault_root, job_id="api", token_required=None, token_provided=None)
+    assert single["job"]["completed"] == 14
+    with pytest.raises(ApiError) as excinfo:
+        api_jobs(vault_root, job_id="missing", token_required=None, token_provided=None)
+    assert excinfo.value.status == 404
+
+
+def test_checkpoint_failure_does_not_hang(vault_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    job = create_import_job(vault_root, [_sources(tmp_path)], job_id="stuck")
+    original = jobs.ImportJob._checkpoint
+
+    def broken(self, stage, record):
+        if stage == "enrich":
+            raise OSError("no space left")
+        original(self, stage, record)
+
+    monkeypatch.setattr(jobs.ImportJob, "_checkpoint", broken)
+    progress = job.run(workers=2, queue_size=2)
+    assert progress["state"] == "completed_with_errors"
+    assert progress["stages"]["enrich"]["failed"] == 14
+
+
+def test_crash_after_note_write_does_not_duplicate(vault_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    job = create_import_job(vault_root, [_sources(tmp_path)], job_id="torn")
+    original = jobs.create_inbox_note
+
+    def crash_after_write(*args, **kwargs):
+        original(*args, **kwargs)
+        raise OSError("killed")
+
+    monkeypatch.setattr(jobs, "create_inbox_note", crash_after_write)
+    job.run()
+    monkeypatch.setattr(jobs, "create_inbox_note", original)
+    progress = open_job(vault_root, "torn").run()
+    assert progress["errors"] == 0
+    notes = list((vault_root / "vault" / "inbox").glob("*.md"))
+    assert len(notes) == 13
+    assert {read_item(path).frontmatter["title"] for path in notes} >= {"Heading 0", "Heading 11"}
+
+
+def test_reimport_does_not_retitle_existing_item(vault_root: Path, tmp_path: Path):
+    source = tmp_path / "first"
+    source.mkdir()
+    (source / "doc.md").write_text("# Big Title\n\nBody.\n", encoding="utf-8")
+    create_import_job(vault_root, [source], job_id="one").run()
+    (note,) = (vault_root / "vault" / "inbox").glob("*.md")
+    note.write_text(note.read_text(encoding="utf-8").replace("title: Big Title", "title: doc"), encoding="utf-8")
+
+    again = tmp_path / "second"
+    again.mkdir()
+    (again / "doc.md").write_bytes((source / "doc.md").read_bytes())
+    create_import_job(vault_root, [again], job_id="two").run()
+    assert list((vault_root / "vault" / "inbox").glob("*.md")) == [note]
+    assert read_item(note).frontmatter["title"] == "doc"
+
+
+def test_index_stage_patches_persisted_indexes(vault_root: Path, tmp_path: Path):
+    pytest.importorskip("numpy")
+    from substrate.dedupe import DedupeIndex
+    from substrate.embedding_store import EmbeddingStore, content_hash
+    from substrate.embeddings import default_embedder
+    from substrate.items import create_inbox_note
+    from substrate.links import LinkIndex
+    from substrate.semantic import build_document_vectors, document_record
+
+    target = create_inbox_note(vault_root, title="Target", body="target")
+    LinkIndex(vault_root).refresh(force=True)
+    list(DedupeIndex(vault_root).groups())
+    build_document_vectors(vault_root)
+    source = _sources(tmp_path)
+    (source / "note3.md").write_text("# Heading 3\n\nSee [[Target]].\n", encoding="utf-8")
+
+    create_import_job(vault_root, [source], job_id="indexed").run()
+    imported = [path for path in (vault_root / "vault" / "inbox").glob("*.md") if path != target]
+    # Fresh instances read only what the job persisted.
+    links = LinkIndex(vault_root)
+    assert len(links.backlinks(read_item(target).frontmatter["id"], refresh=False)) == 1
+    dedupe = DedupeIndex(vault_root)
+    dedupe._load()
+    assert {path.relative_to(vault_root).as_posix() for path in imported} <= set(dedupe._files)
+    embedder = default_embedder()
+    store = EmbeddingStore(vault_root, embedder.model_id, embedder.dim)
+    assert all(content_hash(document_record(vault_root, path)[0]) in store for path in imported)
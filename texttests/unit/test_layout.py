@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from substrate.cache import change_token, set_watched
+from substrate.items import create_inbox_note, migrate_items, promote_inbox_item, read_item
+from substrate.layout import item_layout, resolve_item
+from substrate.vault import iter_markdown_files
+from substrate.watcher import WatchEvent, apply_changes
+
+
+def _promote(vault_root: Path, title: str) -> Path:
+    return promote_inbox_item(vault_root, create_inbox_note(vault_root, title=title))
+
+
+def test_migrate_to_sharded_and_back(vault_root: Path):
+    flat = [_promote(vault_root, f"Item {idx}") for idx in range(5)]
+    ids = [read_item(path).frontmatter["id"] for path in flat]
+    batches: list[tuple[int, int]] = []
+
+    result = migrate_items(vault_root, "sharded", shard_chars=6, batch_size=2, on_batch=lambda *batch: batches.append(batch))
+    assert (result.moved, result.batches, result.conflicts) == (5, 3, [])
+    assert batches == [(1, 2), (2, 2), (3, 1)]
+    assert item_layout(vault_root).name == "sharded"
+    for item_id in ids:
+        path = resolve_item(vault_root, item_id)
+        assert path is not None and path.parent.name == item_id[:6]
+    assert sorted(path.stem for path in iter_markdown_files(vault_root)) == sorted(ids)
+
+    promoted = _promote(vault_root, "After migration")
+    assert promoted.parent.parent.name == "items"
+
+    assert migrate_items(vault_root, "flat").moved == 6
+    items_dir = vault_root / "vault" / "items"
+    assert sorted(p.name for p in items_dir.iterdir()) == sorted(f"{item_id}.md" for item_id in ids + [promoted.stem])
+
+
+def test_watcher_invalidates_writes_inside_shards(vault_root: Path):
+    path = _promote(vault_root, "Sharded")
+    migrate_items(vault_root, "sharded")
+    moved = resolve_item(vault_root, path.stem)
+    set_watched(vault_root, True)
+    try:
+        before = change_token(vault_root)
+        added = moved.parent / "01ZZZZZZZZZZZZZZZZZZZZZZZZ.md"
+        added.write_text("x", encoding="utf-8")
+        apply_changes(vault_root, [WatchEvent("modified", added)])
+        assert change_token(vault_root) != before
+    finally:
+        set_watched(vault_root, False)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate.api import api_capture, api_daily_append
+from substrate.items import create_inbox_note, read_item
+from substrate.links import LinkIndex, active_link_index, extract_links, link_index
+from substrate.views import load_item_view
+
+
+def _id(path: Path) -> str:
+    return str(read_item(path).frontmatter["id"])
+
+
+def test_extract_links_kinds(vault_root: Path):
+    source = vault_root / "vault" / "items" / "A.md"
+    body = (
+        "See [[Trip Plan|the plan]] and [doc](../inbox/B.md#top), "
+        "[site](https://example.com) and 01HZX0M0ABCDEFGHJKMNPQRSTV."
+    )
+    assert extract_links(body, source, vault_root) == [
+        ["id", "01HZX0M0ABCDEFGHJKMNPQRSTV"],
+        ["path", "vault/inbox/B.md"],
+        ["wiki", "Trip Plan"],
+    ]
+
+
+def test_backlinks_and_neighbors(vault_root: Path):
+    target = create_inbox_note(vault_root, title="Trip Plan", body="Lisbon in May")
+    target_id = _id(target)
+    by_title = create_inbox_note(vault_root, title="Packing", body="For [[trip plan]]")
+    by_id = create_inbox_note(vault_root, title="Budget", body=f"Costs for {target_id}")
+    by_path = create_inbox_note(vault_root, title="Index", body=f"[packing](./{by_title.name})")
+    link_index(vault_root).refresh()
+
+    payload = load_item_view(target)
+    assert sorted(link["title"] for link in payload["backlinks"]) == ["Budget", "Packing"]
+
+    index = LinkIndex(vault_root)
+    index.refresh()
+    assert [node.title for node in index.outlinks(_id(by_path))] == ["Packing"]
+    walked = index.neighbors(_id(by_path), depth=2, direction="out")
+    assert [(node.title, distance) for node, distance in walked] == [("Packing", 1), ("Trip Plan", 2)]
+    assert {node.title for node, _ in index.neighbors(target_id, direction="in")} == {"Packing", "Budget"}
+    with pytest.raises(ValueError):
+        index.neighbors("missing")
+
+    by_id.write_text(by_id.read_text(encoding="utf-8").replace(target_id, "nothing"), encoding="utf-8")
+    index.refresh(force=True)
+    assert [node.title for node in index.backlinks(target_id)] == ["Packing"]
+
+
+def test_link_index_persists_without_rereading(vault_root: Path, monkeypatch):
+    target = create_inbox_note(vault_root, title="Target", body="")
+    create_inbox_note(vault_root, title="Source", body="[[Target]]")
+    LinkIndex(vault_root).refresh()
+
+    reloaded = LinkIndex(vault_root)
+    monkeypatch.setattr(LinkIndex, "_extract", lambda *args: pytest.fail("file re-read"))
+    assert [node.title for node in reloaded.backlinks(_id(target))] == ["Source"]
+
+
+def _graph(index: LinkIndex) -> dict[str, tuple[list[str], list[str]]]:
+    index.refresh()
+    return {
+        node.path: ([n.path for n in index.outlinks(node.id)], [n.path for n in index.backlinks(node.id)])
+        for node in index._nodes
+        if node is not None
+    }
+
+
+def test_incremental_updates_match_full_rebuild(vault_root: Path):
+    target = create_inbox_note(vault_root, title="Trip Plan", body="Lisbon")
+    packing = create_inbox_note(vault_root, title="Packing", body="For [[trip plan]]")
+    budget = create_inbox_note(vault_root, title="Budget", body=f"Costs for {_id(target)}")
+    create_inbox_note(vault_root, title="Index", body=f"[packing](./{packing.name}) and [[Budget]]")
+    index = LinkIndex(vault_root)
+    index.refresh()
+
+    target.write_text(target.read_text(encoding="utf-8").replace("Trip Plan", "Lisbon Trip"), encoding="utf-8")
+    index.update(target)
+    create_inbox_note(vault_root, title="Trip Plan", body="the new plan, see [[Packing]]")
+    budget.unlink()
+    index.update(budget)
+    index.refresh()
+
+    rebuilt = LinkIndex(vault_root)
+    rebuilt.refresh(force=True)
+    assert _graph(index) == _graph(rebuilt)
+    assert [node.title for node in index.backlinks(_id(packing))] == ["Index", "Trip Plan"]
+    assert index.backlinks(_id(target)) == []
+
+    reloaded = LinkIndex(vault_root)  # state.json plus the replayed change journal
+    assert _graph(reloaded) == _graph(rebuilt)
+
+
+def test_daily_append_patches_loaded_index_only(vault_root: Path, monkeypatch):
+    daily = Path(api_daily_append(vault_root, payload={"text": "first"}, token_required=None, token_provided=None)["path"])
+    assert active_link_index(vault_root) is None  # a write never builds the graph
+    create_inbox_note(vault_root, title="Log", body=f"[[{daily.stem}]]")
+    index = link_index(vault_root)
+    index.refresh()
+
+    monkeypatch.setattr(LinkIndex, "refresh", lambda *args, **kwargs: pytest.fail("full refresh on write"))
+    payload = api_daily_append(vault_root, payload={"text": "second"}, token_required=None, token_provided=None)
+    assert [link["title"] for link in payload["item"]["backlinks"]] == ["Log"]
+    assert not (index.directory / "state.json").exists()
+    assert len((index.directory / "changes.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_item_view_serves_persisted_index_patched_by_writes(vault_root: Path, monkeypatch):
+    target = create_inbox_note(vault_root, title="Target", body="")
+    LinkIndex(vault_root).refresh()
+    assert active_link_index(vault_root) is None
+
+    monkeypatch.setattr(LinkIndex, "refresh", lambda *args, **kwargs: pytest.fail("vault walk"))
+    api_capture(vault_root, payload={"title": "Source", "body": "[[Target]]"}, token_required=None, token_provided=None)
+    assert [link["title"] for link in load_item_view(target, vault_root)["backlinks"]] == ["Source"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from substrate.api import ApiError, api_debug_memory
+from substrate.items import create_inbox_note
+from substrate.memory import OTHER_SITE, diff_sites, load_snapshot, top_sites
+from substrate.profiling import profile_call, profiles_dir
+from substrate.search import search_items
+
+
+def test_profile_call_memory_snapshot_groups_by_substrate_module(vault_root: Path, tmp_path: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    results, path = profile_call(lambda: tmp_path, "unit", "memory", lambda: search_items(vault_root, "apple"))
+    assert len(results) == 1
+    assert path.suffix == ".tracemalloc" and not tracemalloc.is_tracing()
+    sites = {row["site"] for row in top_sites(load_snapshot(path), limit=100)}
+    assert "substrate.search" in sites
+    assert all(site == OTHER_SITE or site.startswith("substrate.") for site in sites)
+    lines = top_sites(load_snapshot(path), group="line")
+    assert all(row["site"] == OTHER_SITE or ".py:" in row["site"] for row in lines)
+
+
+def test_diff_sites_reports_growth(tmp_path: Path):
+    tracemalloc.start(5)
+    try:
+        before = tracemalloc.take_snapshot()
+        retained = [str(number) * 50 for number in range(2000)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    rows = diff_sites(before, after, limit=5)
+    assert rows[0]["size_diff_bytes"] > 100_000 and rows[0]["count_diff"] >= 2000
+    assert len(retained) == 2000
+    with pytest.raises(ValueError):
+        top_sites(after, group="file")
+
+
+def test_debug_memory_endpoint_snapshots_and_diffs(vault_root: Path):
+    with pytest.raises(ApiError) as exc:
+        api_debug_memory(vault_root, action=None, limit=None, group=None, token_required=None, token_provided=None)
+    assert exc.value.status == 403
+    with pytest.raises(ApiError) as exc:
+        api_debug_memory(vault_root, action="dump", limit=None, group=None, token_required="s", token_provided="s")
+    assert exc.value.status == 400
+
+    def _call() -> dict:
+        return api_debug_memory(vault_root, action=None, limit=5, group=None, token_required="s", token_provided="s")
+
+    try:
+        assert _call()["status"] == "tracing"
+        first = _call()
+        assert first["status"] == "snapshot" and first["diff"] is None
+        second = _call()
+        assert second["previous"] == first["path"] and isinstance(second["diff"], list)
+        assert Path(second["path"]).parent == profiles_dir(vault_root)
+        assert len(second["top"]) <= 5
+    finally:
+        stopped = api_debug_memory(
+            vault_root, action="stop", limit=None, group=None, token_required="s", token_provided="s"
+        )
+    assert stopped == {"status": "stopped"} and not tracemalloc.is_tracing()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from http.server import HTTPServer
+from pathlib import Path
+
+from substrate.cache import set_watched
+from substrate.items import create_inbox_note
+from substrate.metrics import Metrics, render_prometheus
+from tools.api_server import make_handler
+
+
+def test_thread_shards_merge_and_survive_thread_exit():
+    registry = Metrics(buckets=(0.01, 0.1))
+
+    def _work() -> None:
+        for _ in range(1000):
+            registry.inc("files_read_total")
+        registry.observe("yaml_parse_seconds", 0.05)
+
+    threads = [threading.Thread(target=_work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.inc("files_read_total", 5)
+    registry.observe("yaml_parse_seconds", 0.5)
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]["files_read_total"] == [{"labels": {}, "value": 4005}]
+    histogram = snapshot["histograms"]["yaml_parse_seconds"][0]
+    assert histogram["buckets"] == {"0.01": 0, "0.1": 4, "+Inf": 5}
+    assert histogram["count"] == 5
+    # Retired shards are folded in once, not double counted on the next scrape.
+    assert registry.snapshot()["counters"]["files_read_total"][0]["value"] == 4005
+
+
+def test_render_prometheus_text():
+    registry = Metrics(buckets=(0.1,))
+    registry.inc("http_requests_total", route="/api/search", method="GET", status="200")
+    registry.observe("http_request_duration_seconds", 0.2, route="/api/search")
+    registry.inc("bytes_read_total", 12345678)
+    text = render_prometheus({**registry.snapshot(), "gauges": {"view_cache_hit_ratio": 0.5}})
+    assert "# TYPE substrate_http_requests_total counter" in text
+    assert 'substrate_http_requests_total{method="GET",route="/api/search",status="200"} 1' in text
+    assert 'substrate_http_request_duration_seconds_bucket{route="/api/search",le="0.1"} 0' in text
+    assert 'substrate_http_request_duration_seconds_bucket{route="/api/search",le="+Inf"} 1' in text
+    assert "substrate_bytes_read_total 12345678" in text
+    assert "substrate_view_cache_hit_ratio 0.5" in text
+
+
+def test_stdlib_server_metrics_endpoint(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    set_watched(vault_root, True)  # views are cached only for watched vaults
+    server = HTTPServer(("127.0.0.1", 0), make_handler(vault_root, "secret"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        headers = {"X-Substrate-Token": "secret"}
+        urllib.request.urlopen(urllib.request.Request(f"{base}/api/inbox", headers=headers), timeout=5).read()
+        with urllib.request.urlopen(urllib.request.Request(f"{base}/api/metrics", headers=headers), timeout=5) as resp:
+            payload = json.loads(resp.read())
+        prom = urllib.request.Request(f"{base}/api/metrics", headers={**headers, "Accept": "text/plain"})
+        with urllib.request.urlopen(prom, timeout=5) as resp:
+            content_type = resp.headers["Content-Type"]
+            text = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+        set_watched(vault_root, False)
+    # The registry is process-wide, so other in-process servers may have counted too.
+    requests = {tuple(sorted(row["labels"].items())): row["value"] for row in payload["counters"]["http_requests_total"]}
+    assert requests[(("method", "GET"), ("route", "/api/inbox"), ("status", "200"))] >= 1
+    assert payload["gauges"]["view_cache_entries"] >= 1
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'substrate_http_requests_total{method="GET",route="/api/metrics",status="200"}' in text
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from substrate.paging import cursor_scope, decode_cursor, encode_cursor, select_page
+
+
+def _key(value: int) -> tuple:
+    return (value % 3, value)
+
+
+def test_select_page_matches_full_sort():
+    values = list(range(50))
+    expected = sorted(values, key=_key, reverse=True)
+    page = select_page(values, key=_key, reverse=True, offset=5, limit=10)
+    assert page.total == 50
+    assert page.items == expected[5:15]
+    assert page.next_key == _key(expected[14])
+
+
+def test_select_page_keyset_walk_covers_all_items():
+    values = list(range(23))
+    seen: list[int] = []
+    after = None
+    while True:
+        page = select_page(values, key=_key, reverse=False, limit=4, after=after)
+        seen.extend(page.items)
+        if page.next_key is None:
+            break
+        after = page.next_key
+    assert seen == sorted(values, key=_key)
+
+
+def test_select_page_cursor_stable_under_inserts():
+    values = [10, 20, 30, 40]
+    first = select_page(values, key=lambda v: (v,), reverse=False, limit=2)
+    assert first.items == [10, 20]
+    values = [5, 15] + values
+    second = select_page(values, key=lambda v: (v,), reverse=False, limit=2, after=first.next_key)
+    assert second.items == [30, 40]
+    assert second.next_key is None
+
+
+def test_cursor_round_trip_and_scope():
+    cursor = encode_cursor("inbox:updated_desc", ("2026-02-03", "a.md"))
+    assert decode_cursor(cursor, "inbox:updated_desc") == ("2026-02-03", "a.md")
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "inbox:title_asc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "search")
+
+
+def test_cursor_scope_covers_query_and_filters():
+    scope = cursor_scope("search", mode="lexical", query="bread", status=["draft", "inbox"], privacy=None)
+    assert scope == cursor_scope("search", mode="lexical", query="bread", status=["inbox", "draft"], privacy=[])
+    assert scope != cursor_scope("search", mode="lexical", query="cake", status=["draft", "inbox"])
+    assert scope != cursor_scope("search", mode="lexical", query="bread", status=["draft"])
+    assert scope != cursor_scope("search", mode="hybrid", query="bread", status=["draft", "inbox"])
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from http.server import HTTPServer
+from pathlib import Path
+
+from substrate.items import create_inbox_note
+from substrate.perf import PERF_LOG, collect, current_timings, span
+from substrate.search import search_items
+from tools.api_server import make_handler
+
+
+def test_spans_are_noops_without_a_collector():
+    assert current_timings() is None
+    with span("read"):
+        pass
+    assert current_timings() is None
+
+
+def test_collect_sums_spans_from_search(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    create_inbox_note(vault_root, title="Beta", body="apple pie")
+    with collect() as timings:
+        assert len(search_items(vault_root, "apple")) == 2
+    assert current_timings() is None
+    spans = timings.to_dict()["spans"]
+    assert spans["read"]["count"] == 2
+    assert spans["yaml"]["count"] == 2
+    assert spans["score"]["count"] == 2
+    assert "list" in spans
+    header = timings.server_timing()
+    assert 'read;dur=' in header and 'desc="2x"' in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+def test_stdlib_server_sends_server_timing_and_logs(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    handler = make_handler(vault_root, None, server_timing=True, perf_log=True)
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/search?q=apple"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            header = resp.headers["Server-Timing"]
+            assert json.loads(resp.read())["total"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    names = {part.split(";")[0] for part in header.split(", ")}
+    assert {"read", "yaml", "scan", "json", "total"} <= names
+
+    lines = (vault_root / "vault" / "_system" / "logs" / PERF_LOG).read_text(encoding="utf-8").splitlines()
+    entry = json.loads(lines[-1])
+    assert entry["op"] == "GET /api/search"
+    assert entry["data"] == {"status": 200}
+    assert entry["spans"]["read"]["count"] == 1
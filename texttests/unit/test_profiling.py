@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pstats
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from substrate.api import ApiError, api_debug_profile
+from substrate.cli import main
+from substrate.profiling import StackSampler, profile_call, profiles_dir
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_stacks_of_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,))
+    worker.start()
+    sampler = StackSampler(interval=0.001, threads={worker.ident})
+    try:
+        sampler.run(0.2)
+    finally:
+        stop.set()
+        worker.join()
+    assert sampler.samples > 0
+    stack, count = sampler.counts.most_common(1)[0]
+    assert stack.endswith("test_profiling.py:_busy_loop") and count > 0
+    assert sampler.collapsed().splitlines()[0] == f"{stack} {count}"
+
+
+def test_profile_call_writes_loadable_cprofile(tmp_path: Path):
+    result, path = profile_call(lambda: tmp_path, "unit", "cprofile", lambda: sorted(range(1000)))
+    assert result[:3] == [0, 1, 2]
+    assert path.suffix == ".prof" and path.parent == tmp_path
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_cli_profile_flag(vault_root: Path, monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["substrate", "inbox-list", str(vault_root), "--profile"])
+    assert main() == 0
+    assert "profile written to" in capsys.readouterr().err
+    assert [path.name.split("-", 1)[1] for path in profiles_dir(vault_root).iterdir()] == ["inbox-list.prof"]
+
+
+def test_debug_profile_requires_token_and_writes_capture(vault_root: Path):
+    with pytest.raises(ApiError) as exc:
+        api_debug_profile(vault_root, seconds=1, token_required=None, token_provided=None)
+    assert exc.value.status == 403
+    with pytest.raises(ApiError) as exc:
+        api_debug_profile(vault_root, seconds=1, token_required="secret", token_provided="wrong")
+    assert exc.value.status == 401
+    with pytest.raises(ApiError) as exc:
+        api_debug_profile(vault_root, seconds=10_000, token_required="secret", token_provided="secret")
+    assert exc.value.status == 400
+
+    started = api_debug_profile(vault_root, seconds=1, token_required="secret", token_provided="secret")
+    assert started["status"] == "started" and started["mode"] == "sample"
+    with pytest.raises(ApiError) as exc:
+        api_debug_profile(vault_root, seconds=1, token_required="secret", token_provided="secret")
+    assert exc.value.status == 409
+    deadline = time.monotonic() + 5
+    while not Path(started["path"]).exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert Path(started["path"]).parent == profiles_dir(vault_root)
+    assert Path(started["path"]).exists()
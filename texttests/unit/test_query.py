@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate.io import dump_frontmatter, safe_write_text
+from substrate.query import TEXT, parse_query
+from substrate.search import SearchStats, search_items
+from substrate.text_index import TrigramIndex
+from substrate.views import search_view
+
+
+def test_parse_query_clauses():
+    query = parse_query('tag:travel type:photo created:2024-01..2024-06 -privacy:sensitive "exact phrase" plain')
+    described = [clause.describe() for clause in query.clauses]
+    assert described == [
+        "tag:travel",
+        "type:photo",
+        "created:2024-01..2024-06",
+        "-privacy:sensitive",
+        '"exact phrase"',
+        "plain",
+    ]
+    assert query.text_terms == ["exact phrase", "plain"]
+
+
+def test_parse_query_unknown_field_is_text():
+    query = parse_query("http://example.com -\"not this\" title:\"Trip Plan\"")
+    assert query.clauses[0].field == TEXT
+    assert query.clauses[0].values == ("http://example.com",)
+    assert query.clauses[1].negated and query.clauses[1].values == ("not this",)
+    assert query.clauses[2].field == "title" and query.clauses[2].values == ("trip plan",)
+
+
+def test_date_clause_prefix_and_range():
+    clause = parse_query("created:2024-01..2024-06").clauses[0]
+    assert clause.matches_value("2024-03-01T10:00:00+00:00")
+    assert clause.matches_value("2024-06-30T23:59:59+00:00")
+    assert not clause.matches_value("2024-07-01T00:00:00+00:00")
+    open_ended = parse_query("updated:2025..").clauses[0]
+    assert open_ended.matches_value("2026-01-01")
+    assert not open_ended.matches_value("2024-12-31")
+
+
+def _write(vault_root: Path, uid: str, *, title: str, body: str, **fields) -> None:
+    frontmatter = {
+        "schema_version": "0.1",
+        "id": uid,
+        "type": "note",
+        "created": "2024-03-01T10:00:00+00:00",
+        "updated": "2024-03-01T10:00:00+00:00",
+        "status": "canonical",
+        "privacy": "private",
+        "title": title,
+    }
+    frontmatter.update(fields)
+    safe_write_text(vault_root / "vault" / "items" / f"{uid}.md", dump_frontmatter(frontmatter, body))
+
+
+def _seed(vault_root: Path) -> None:
+    _write(
+        vault_root,
+        "01HZX0M0M4W6W7K7Q8T2K3Q2R1",
+        title="Lisbon",
+        body="tram photos from the exact phrase trip",
+        type="photo",
+        tags=["travel"],
+    )
+    _write(
+        vault_root,
+        "01HZX0M0M4W6W7K7Q8T2K3Q2R2",
+        title="Porto",
+        body="exact phrase again",
+        type="photo",
+        tags=["travel"],
+        privacy="sensitive",
+    )
+    _write(
+        vault_root,
+        "01HZX0M0M4W6W7K7Q8T2K3Q2R3",
+        title="Old trip",
+        body="exact phrase",
+        type="photo",
+        tags=["travel"],
+        created="2023-05-01T10:00:00+00:00",
+    )
+    _write(vault_root, "01HZX0M0M4W6W7K7Q8T2K3Q2R4", title="Work", body="exact phrase", tags=["work"])
+
+
+def test_fielded_query_scan_and_index_agree(vault_root: Path):
+    _seed(vault_root)
+    query = 'tag:travel type:photo created:2024-01..2024-06 -privacy:sensitive "exact phrase"'
+    scanned = search_items(vault_root, query)
+    assert [result.title for result in scanned] == ["Lisbon"]
+
+    index = TrigramIndex(vault_root)
+    stats = SearchStats()
+    indexed = search_items(vault_root, query, index=index, stats=stats)
+    assert [result.title for result in indexed] == ["Lisbon"]
+    stages = [stage.stage for stage in stats.plan]
+    assert stages[-1] == "verify"
+    assert "catalog" in stages and "trigram" in stages
+    assert stats.scanned == 1
+
+
+def test_search_view_explain(vault_root: Path):
+    _seed(vault_root)
+    payload = search_view(vault_root, "tag:work phrase", explain=True)
+    assert [result["title"] for result in payload["results"]] == ["Work"]
+    assert payload["plan"]["query"]["clauses"] == ["tag:work", "phrase"]
+    assert payload["plan"]["stages"][0]["stage"] == "scan"
+    assert "plan" not in search_view(vault_root, "phrase")
+
+
+def test_unquoted_words_are_separate_terms_and_filters_fold_case(vault_root: Path):
+    _seed(vault_root)
+    _write(vault_root, "01HZX0M0M4W6W7K7Q8T2K3Q2R5", title="Reversed", body="the phrase is not exact", status="inbox")
+    assert "Reversed" in {result.title for result in search_items(vault_root, "exact phrase")}
+    assert "Reversed" not in {result.title for result in search_items(vault_root, '"exact phrase"')}
+    assert [result.title for result in search_items(vault_root, "exact", status=["INBOX"])] == ["Reversed"]
+    assert [result.title for result in search_items(vault_root, "Status:Inbox exact")] == ["Reversed"]
+
+
+def test_search_cursor_is_bound_to_query_and_filters(vault_root: Path):
+    _seed(vault_root)
+    _write(vault_root, "01HZX0M0M4W6W7K7Q8T2K3Q2R5", title="Second", body="another phrase", status="inbox")
+    cursor = search_view(vault_root, "phrase", limit=1)["next_cursor"]
+    assert cursor
+    assert search_view(vault_root, "phrase", limit=1, cursor=cursor)["results"]
+    for kwargs in ({"query": "exact"}, {"query": "phrase", "status": ["inbox"]}):
+        with pytest.raises(ValueError, match="cursor does not match"):
+            search_view(vault_root, limit=1, cursor=cursor, **kwargs)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from substrate.raw_archive import hash_algorithm, hash_file, ingest_files, raw_dir
+
+
+def test_hash_file_streams_in_chunks(tmp_path: Path):
+    path = tmp_path / "big.bin"
+    data = b"x" * (3 * 1024 * 1024 + 17)
+    path.write_bytes(data)
+    digest, size = hash_file(path, "sha256")
+    assert (digest, size) == (hashlib.sha256(data).hexdigest(), len(data))
+
+
+def test_ingest_copies_once_per_hash(vault_root: Path, tmp_path: Path):
+    source = tmp_path / "import"
+    (source / "sub").mkdir(parents=True)
+    (source / "a.JPG").write_bytes(b"photo")
+    (source / "sub" / "copy.jpg").write_bytes(b"photo")
+    (source / "notes.txt").write_bytes(b"other")
+
+    report = ingest_files(vault_root, [source], workers=2)
+    assert (report.files, report.copied, report.skipped, report.errors) == (3, 2, 1, [])
+
+    algorithm = hash_algorithm()
+    digest, _ = hash_file(source / "a.JPG", algorithm)
+    stored = raw_dir(vault_root, algorithm, digest)
+    assert stored.parent.name == digest[:2]
+    assert (stored / "original.jpg").read_bytes() == b"photo"
+    meta = json.loads((stored / "meta.json").read_text(encoding="utf-8"))
+    assert meta["hash"] == digest and meta["size"] == 5
+    assert len(meta["sources"]) == 2
+
+    again = ingest_files(vault_root, [source], workers=1)
+    assert (again.copied, again.skipped, again.bytes_copied) == (0, 3, 0)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from substrate.inbox import InboxItem, list_inbox
+from substrate.items import create_inbox_note, read_item
+from substrate.ops_log import OpsEntry, append_ops_log, tail_ops_log
+from substrate.quarantine import QuarantineEntry, list_quarantine, quarantine_file
+from substrate.search import SearchResult, search_items
+
+
+def test_records_are_slotted():
+    for cls in (InboxItem, SearchResult, OpsEntry, QuarantineEntry):
+        assert "__slots__" in vars(cls)
+    entry = OpsEntry(timestamp="t", op="x", data={})
+    assert not hasattr(entry, "__dict__")
+
+
+def test_to_dict_matches_field_serialization(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Alpha", body="apple pie", privacy="public")
+    inbox = list_inbox(vault_root)[0]
+    assert inbox.to_dict() == {**asdict(inbox), "path": str(inbox.path)}
+    assert list(inbox.to_dict()) == ["path", "title", "status", "privacy", "created", "updated"]
+
+    result = search_items(vault_root, "apple")[0]
+    expected = {**asdict(result), "path": str(result.path), "highlights": [list(span) for span in result.highlights]}
+    assert result.to_dict() == expected
+    assert json.loads(json.dumps(result.to_dict()))["highlights"] == expected["highlights"]
+
+    item = read_item(path)
+    assert item.to_dict() == {"path": str(path), "frontmatter": item.frontmatter, "body": item.body}
+
+
+def test_ops_log_and_quarantine_round_trip(vault_root: Path, tmp_path: Path):
+    append_ops_log(vault_root, "unit.op", {"n": 1})
+    entry = tail_ops_log(vault_root, limit=1)[0]
+    line = (vault_root / "vault" / "_system" / "logs" / "ops.jsonl").read_text(encoding="utf-8").splitlines()[-1]
+    assert json.loads(line) == entry.to_dict() and list(json.loads(line)) == ["timestamp", "op", "data"]
+
+    victim = tmp_path / "bad.md"
+    victim.write_text("not frontmatter", encoding="utf-8")
+    quarantined = quarantine_file(vault_root, victim, "unit")
+    assert list_quarantine(vault_root) == [quarantined]
+    assert list(quarantined.to_dict()) == ["id", "original_path", "reason", "timestamp"]
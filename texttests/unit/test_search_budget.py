@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate.api import ApiError, api_search, effective_budget_ms
+from substrate.items import create_inbox_note
+from substrate.search import CancelToken, SearchStats, search_items
+from substrate.views import search_view
+
+
+def test_search_cancelled_returns_partial(vault_root: Path):
+    for idx in range(3):
+        create_inbox_note(vault_root, title=f"Needle {idx}", body="needle")
+
+    cancel = CancelToken()
+    cancel.cancel()
+    stats = SearchStats()
+    assert search_items(vault_root, "needle", cancel=cancel, stats=stats) == []
+    assert stats.partial is True
+    assert stats.scanned == 0
+
+    stats = SearchStats()
+    assert len(search_items(vault_root, "needle", stats=stats)) == 3
+    assert stats.scanned == 3
+    assert stats.partial is False
+
+
+def test_search_view_budget_flags_partial(vault_root: Path):
+    create_inbox_note(vault_root, title="Needle", body="needle")
+    payload = search_view(vault_root, "needle", time_budget=0)
+    assert payload["partial"] is True
+    assert payload["total"] == 0
+
+    payload = search_view(vault_root, "needle", time_budget=10)
+    assert payload["partial"] is False
+    assert payload["scanned"] == 1
+
+
+def test_api_search_budget_validation(vault_root: Path):
+    with pytest.raises(ApiError) as exc:
+        api_search(
+            vault_root,
+            query="x",
+            limit=10,
+            offset=0,
+            status=None,
+            privacy=None,
+            token_required=None,
+            token_provided=None,
+            budget_ms=0,
+        )
+    assert exc.value.status == 400
+    assert effective_budget_ms(500, 100) == 100
+    assert effective_budget_ms(500, 5000) == 500
+    assert effective_budget_ms(None, 100) == 100
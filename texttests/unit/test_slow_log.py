@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from substrate.api import api_capture
+from substrate.config import load_config, save_config
+from substrate.items import create_inbox_note
+from substrate.perf import collect, span
+from substrate.search import search_items
+from substrate.slow_log import iter_slow_log, redact, slow_op, summarize_slow_log, tracked
+
+
+def _log_everything(vault_root: Path) -> None:
+    config = load_config(vault_root)
+    config["perf"] = {"slow_ms": 0.000001}
+    save_config(vault_root, config)
+
+
+def test_redact_drops_secrets_and_sensitive_bodies():
+    params = {"payload": {"body": "secret plan", "privacy": "sensitive"}, "token_provided": "abc", "limit": 5}
+    assert redact(params) == {"payload": {"body": "[redacted 11 chars]", "privacy": "sensitive"}, "limit": 5}
+    assert redact({"body": "unknown privacy"})["body"] == "[redacted 15 chars]"
+    assert redact({"body": "hello", "privacy": "public"})["body"] == "hello"
+    assert redact({"query": "x" * 600})["query"].endswith("...")
+
+
+def test_fast_operations_are_not_logged(vault_root: Path):
+    with slow_op(vault_root, "fast", {}):
+        pass
+    assert list(iter_slow_log(vault_root)) == []
+
+
+def test_slow_search_records_spans_and_params(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    _log_everything(vault_root)
+    assert len(search_items(vault_root, "apple")) == 1
+    record = next(record for record in iter_slow_log(vault_root) if record["op"] == "search.items")
+    assert record["params"]["query"] == "apple"
+    assert record["spans"]["read"]["count"] == 1
+    assert record["files"]["read"] == 1
+    assert record["elapsed_ms"] >= 0
+
+
+def test_api_capture_body_is_redacted(vault_root: Path):
+    _log_everything(vault_root)
+    api_capture(
+        vault_root,
+        payload={"title": "Pin", "body": "1234", "privacy": "sensitive"},
+        token_required="tok",
+        token_provided="tok",
+    )
+    record = next(record for record in iter_slow_log(vault_root) if record["op"] == "api.capture")
+    assert record["params"] == {"payload": {"title": "Pin", "body": "[redacted 4 chars]", "privacy": "sensitive"}}
+
+
+def test_nested_operation_reports_only_its_own_spans(vault_root: Path):
+    _log_everything(vault_root)
+
+    @tracked("inner")
+    def inner(root: Path) -> None:
+        with span("score"):
+            pass
+
+    with collect():
+        with span("read"):
+            pass
+        inner(vault_root)
+    record = next(iter_slow_log(vault_root))
+    assert record["op"] == "inner"
+    assert set(record["spans"]) == {"score"}
+
+
+def test_failed_operation_records_error(vault_root: Path):
+    _log_everything(vault_root)
+    with pytest.raises(KeyError):
+        with slow_op(vault_root, "boom", {}):
+            raise KeyError("x")
+    assert next(iter_slow_log(vault_root))["error"] == "KeyError"
+
+
+def test_summarize_groups_by_operation(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    _log_everything(vault_root)
+    for _ in range(3):
+        search_items(vault_root, "apple")
+    summary = summarize_slow_log(vault_root, op="search", top=2)
+    assert summary["records"] == 3
+    assert [row["op"] for row in summary["operations"]] == ["search.items"]
+    row = summary["operations"][0]
+    assert row["count"] == 3 and row["p50_ms"] <= row["p95_ms"] <= row["max_ms"]
+    assert "read" in row["top_spans"]
+    assert len(summary["slowest"]) == 2
+    with pytest.raises(ValueError):
+        summarize_slow_log(vault_root, since="yesterday")
+
+
+def test_summarize_since_date_only_is_utc(vault_root: Path):
+    create_inbox_note(vault_root, title="Alpha", body="apple")
+    _log_everything(vault_root)
+    search_items(vault_root, "apple")
+    assert summarize_slow_log(vault_root, since="2000-01-01")["records"] == 1
+    assert summarize_slow_log(vault_root, since="2999-01-01T00:00:00")["records"] == 0
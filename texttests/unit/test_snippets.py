@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from substrate.items import create_inbox_note
+from substrate.query import parse_query
+from substrate.snippets import build_snippet, find_term_offsets
+from substrate.views import search_view
+
+
+def _snippet(body: str, query: str, **kwargs):
+    hits = find_term_offsets(body, body.casefold(), parse_query(query).text_terms)
+    return build_snippet(body, hits, **kwargs)
+
+
+def test_highlights_point_at_terms():
+    snippet = _snippet("Pack the Passport and the tickets", "passport tickets")
+    spans = [snippet.text[start:end] for start, end in snippet.highlights]
+    assert spans == ["Passport", "tickets"]
+
+
+def test_densest_window_preferred():
+    body = "alpha " + "filler " * 40 + "alpha beta together " + "filler " * 40
+    snippet = _snippet(body, "alpha beta", max_len=40)
+    spans = [snippet.text[start:end] for start, end in snippet.highlights]
+    assert "beta" in spans and "alpha" in spans
+
+
+def test_hits_capped_per_term():
+    body = "a" * 10_000
+    hits = find_term_offsets(body, body.casefold(), ["a"], max_hits=5)
+    assert len(hits) == 5
+
+
+def test_casefold_length_change_maps_offsets():
+    body = "Straße und STRASSE"
+    snippet = _snippet(body, "strasse")
+    spans = [snippet.text[start:end] for start, end in snippet.highlights]
+    assert spans == ["Straße", "STRASSE"]
+
+
+def test_no_body_hit_falls_back_to_prefix():
+    snippet = _snippet("body text", "title-only")
+    assert snippet.text == "body text"
+    assert snippet.highlights == ()
+
+
+def test_search_view_returns_highlights(vault_root: Path):
+    create_inbox_note(vault_root, title="Trip", body="Line one\nremember the needle here")
+    payload = search_view(vault_root, "needle", limit=5)
+    result = payload["results"][0]
+    start, end = result["highlights"][0]
+    assert result["snippet"][start:end] == "needle"
+
+
+def test_term_longer_than_snippet(vault_root: Path):
+    token = "x" * 130
+    snippet = _snippet(f"see {token} and short x", token)
+    assert snippet.text.startswith("see ")
+    create_inbox_note(vault_root, title="Hash", body=f"digest {token}")
+    for query in (token, f'"{token}"', f"{token} digest"):
+        assert [result["title"] for result in search_view(vault_root, query)["results"]] == ["Hash"]
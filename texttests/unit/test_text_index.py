@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from substrate.items import create_inbox_note, promote_inbox_item
+from substrate.search import SearchStats, search_items
+from substrate.text_index import TrigramIndex, trigrams
+
+
+def _titles(results) -> list[str]:
+    return sorted(result.title for result in results)
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_index_matches_scan_for_substrings(vault_root: Path):
+    create_inbox_note(vault_root, title="Config loader", body="def load_config(path): pass")
+    create_inbox_note(vault_root, title="Travel", body="Flight 01HZX0M0 to Lisbon")
+    create_inbox_note(vault_root, title="Groceries", body="milk, eggs, flour")
+    index = TrigramIndex(vault_root)
+
+    for query in ["d_conf", "hzx0", "LISB", "egg", "nothing-here", "ou"]:
+        scanned = search_items(vault_root, query)
+        indexed = search_items(vault_root, query, index=index)
+        assert _titles(indexed) == _titles(scanned), query
+
+
+def test_index_reads_only_candidates(vault_root: Path):
+    for idx in range(10):
+        create_inbox_note(vault_root, title=f"Note {idx}", body="common words only")
+    create_inbox_note(vault_root, title="Rare", body="zyxwv marker")
+    index = TrigramIndex(vault_root)
+    index.refresh()
+
+    stats = SearchStats()
+    results = search_items(vault_root, "yxw", index=index, stats=stats)
+    assert _titles(results) == ["Rare"]
+    assert stats.scanned == 1
+
+
+def test_index_refreshes_after_writes(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Alpha", body="first body")
+    index = TrigramIndex(vault_root)
+    assert _titles(search_items(vault_root, "first", index=index)) == ["Alpha"]
+
+    create_inbox_note(vault_root, title="Beta", body="first again")
+    assert _titles(search_items(vault_root, "first", index=index)) == ["Alpha", "Beta"]
+
+    target = promote_inbox_item(vault_root, path)
+    results = search_items(vault_root, "first", index=index)
+    assert sorted(str(r.path) for r in results if r.title == "Alpha") == [str(target)]
+
+
+def test_index_compaction_keeps_postings(vault_root: Path):
+    paths = [create_inbox_note(vault_root, title=f"Doc {idx}", body=f"shared token{idx}") for idx in range(6)]
+    index = TrigramIndex(vault_root)
+    index.refresh()
+    for path in paths[:4]:
+        path.unlink()
+        index.update(path)
+    assert len(index) == 2
+    docs = index.candidates("shared")
+    assert sorted(doc.title for doc in docs) == ["Doc 4", "Doc 5"]
+
+
+def test_index_sees_in_place_edits(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Alpha", body="first body")
+    index = TrigramIndex(vault_root)
+    assert search_items(vault_root, "zebra", index=index) == []
+    text = path.read_text(encoding="utf-8").replace("first body", "a zebra crossing")
+    with path.open("r+", encoding="utf-8") as handle:  # no rename, so no directory mtime change
+        handle.write(text)
+        handle.truncate()
+    assert _titles(search_items(vault_root, "zebra", index=index)) == ["Alpha"]
+    assert _titles(search_items(vault_root, "zebra")) == ["Alpha"]
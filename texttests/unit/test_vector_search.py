@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from substrate.embeddings import HashingEmbedder
+from substrate.hybrid import reciprocal_rank_fusion
+from substrate.items import create_inbox_note, update_frontmatter
+from substrate.search import SearchResult
+from substrate.semantic import build_document_vectors, semantic_search
+from substrate.vector_index import load_vector_index, write_vector_index
+from substrate.views import search_view
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    first = HashingEmbedder(dim=32).embed(["the quick brown fox", ""])
+    second = HashingEmbedder(dim=32).embed(["the quick brown fox", ""])
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+
+
+def test_ivf_search_matches_exact_top_k(vault_root: Path):
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((2000, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    rows = [{"key": str(i), "status": "draft" if i % 2 else "canonical", "privacy": "private"} for i in range(2000)]
+    write_vector_index(vault_root, "test", "random", vectors, rows, nlist=16)
+    index = load_vector_index(vault_root, "test")
+
+    query = vectors[42]
+    exact = np.argsort(-(vectors @ query))[:10]
+    hits = index.search(query, 10, nprobe=16)
+    assert [hit.key for hit in hits] == [str(i) for i in exact]
+
+    filtered = index.search(query, 10, nprobe=1, filters={"status": ["canonical"]})
+    assert len(filtered) == 10
+    assert all(int(hit.key) % 2 == 0 for hit in filtered)
+    assert index.search(query, 10, nprobe=1, filters={"status": ["Canonical"]}) == filtered
+
+
+def test_rows_are_read_by_offset(vault_root: Path):
+    vectors = np.eye(4, dtype=np.float32)
+    rows = [{"key": str(i), "title": "x" * i} for i in range(4)]
+    write_vector_index(vault_root, "test", "eye", vectors, rows, nlist=2)
+    index = load_vector_index(vault_root, "test")
+    lines = (index.directory / "rows.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [index.row(position) for position in range(4)] == [json.loads(line) for line in lines]
+    assert index.search(vectors[3], 1)[0].meta == rows[3]
+
+
+def test_semantic_search_checks_hits_against_current_files(vault_root: Path):
+    create_inbox_note(vault_root, title="Sourdough", body="Bake the bread loaf.")
+    gone = create_inbox_note(vault_root, title="Rye", body="Dense bread with seeds.")
+    hidden = create_inbox_note(vault_root, title="Spelt", body="Nutty bread for toast.")
+    build_document_vectors(vault_root)
+
+    gone.unlink()
+    update_frontmatter(hidden, {"privacy": "sensitive"})
+    titles = [result.title for result in semantic_search(vault_root, "bread", privacy=["private"])]
+    assert titles == ["Sourdough"]
+
+
+def test_semantic_search_ranks_related_document_first(vault_root: Path):
+    create_inbox_note(vault_root, title="Sourdough", body="Feed the starter, then bake the bread loaf at high heat.")
+    create_inbox_note(vault_root, title="Taxes", body="File the quarterly estimated payment before the deadline.")
+    create_inbox_note(vault_root, title="Running", body="Interval training plan for the marathon season.")
+    assert build_document_vectors(vault_root).total == 3
+
+    results = semantic_search(vault_root, "baking bread")
+    assert results[0].title == "Sourdough"
+    assert results[0].score > results[-1].score
+
+    payload = search_view(vault_root, "marathon training", mode="semantic", limit=1)
+    assert payload["mode"] == "semantic"
+    assert payload["results"][0]["title"] == "Running"
+    assert payload["next_cursor"]
+
+
+def test_semantic_search_requires_built_index(vault_root: Path):
+    create_inbox_note(vault_root, title="Note", body="body")
+    with pytest.raises(ValueError, match="not built"):
+        search_view(vault_root, "note", mode="semantic")
+
+
+def test_reciprocal_rank_fusion_prefers_documents_in_both_lists(tmp_path: Path):
+    def result(name: str) -> SearchResult:
+        return SearchResult(tmp_path / name, name, "note", "inbox", "private", "", "", 0)
+
+    fused = reciprocal_rank_fusion([([result("a"), result("b")], 1.0), ([result("c"), result("b")], 1.0)], k=60)
+    assert [item.title for item in fused][0] == "b"
+    weighted = reciprocal_rank_fusion([([result("a")], 1.0), ([result("c")], 3.0)], k=60)
+    assert [item.title for item in weighted] == ["c", "a"]
+
+
+def test_hybrid_search_filters_before_fusion_and_reports_timings(vault_root: Path):
+    create_inbox_note(vault_root, title="Sourdough", body="Bake the bread loaf.")
+    create_inbox_note(vault_root, title="Rye", body="Dense bread with seeds.", privacy="sensitive")
+    create_inbox_note(vault_root, title="Taxes", body="Quarterly payment.")
+    build_document_vectors(vault_root)
+
+    payload = search_view(vault_root, "bread", mode="hybrid", privacy=["private"])
+    titles = [result["title"] for result in payload["results"]]
+    assert titles[0] == "Sourdough"
+    assert "Rye" not in titles
+    assert set(payload["timings"]) == {"lexical", "semantic", "fusion"}
+
+
+def test_hybrid_search_drops_semantic_hits_with_negated_terms(vault_root: Path):
+    create_inbox_note(vault_root, title="Sourdough", body="Bake the bread loaf.")
+    create_inbox_note(vault_root, title="Rye", body="Dense bread, secret recipe.")
+    build_document_vectors(vault_root)
+
+    payload = search_view(vault_root, "bread -secret", mode="hybrid")
+    titles = [result["title"] for result in payload["results"]]
+    assert "Sourdough" in titles
+    assert "Rye" not in titles
+
+
+def test_semantic_filters_fold_case_like_lexical(vault_root: Path):
+    create_inbox_note(vault_root, title="Sourdough", body="Bake the bread loaf.")
+    build_document_vectors(vault_root)
+    for mode in ("lexical", "semantic", "hybrid"):
+        payload = search_view(vault_root, "bread", mode=mode, status=["INBOX"], privacy=["Private"])
+        assert [result["title"] for result in payload["results"]] == ["Sourdough"], mode
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from substrate.cache import vault_generation
+from substrate.items import create_inbox_note
+from substrate.text_index import disable_trigram_index, enable_trigram_index
+from substrate.watcher import WatchEvent, Watcher, apply_changes, coalesce
+
+
+def test_coalesce_bursts_and_renames(tmp_path: Path):
+    a, b, c = tmp_path / "a.md", tmp_path / "b.md", tmp_path / "c.md"
+    tmp = tmp_path / "a.md.x1y2"
+    events = coalesce(
+        [
+            ("modified", a, None),
+            ("modified", a, None),
+            ("moved", a, tmp),  # atomic write
+            ("moved", b, a),
+            ("moved", c, b),
+            ("modified", tmp_path / "notes.txt", None),
+            ("rescan", Path("."), None),
+        ]
+    )
+    assert events == [WatchEvent("moved", c, a), WatchEvent("rescan", Path("."))]
+    assert coalesce([("moved", b, a), ("deleted", b, None)]) == [WatchEvent("deleted", b), WatchEvent("deleted", a)]
+
+
+def _poll_until(watcher: Watcher, predicate, timeout: float = 5.0) -> list[WatchEvent]:
+    seen: list[WatchEvent] = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not predicate(seen):
+        seen.extend(watcher.poll(0.2))
+    return seen
+
+
+@pytest.mark.parametrize("backend", ["poll", "inotify"])
+def test_watcher_reports_changes_and_renames(vault_root: Path, backend: str):
+    if backend == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux only")
+    path = create_inbox_note(vault_root, title="Watched", body="before")
+    watcher = Watcher(vault_root, backend=backend, interval=0.05, debounce=0.05)
+    try:
+        assert watcher.backend == backend
+        path.write_text(path.read_text(encoding="utf-8") + "after\n", encoding="utf-8")
+        events = _poll_until(watcher, lambda seen: any(event.kind == "modified" for event in seen))
+        assert WatchEvent("modified", path) in events
+
+        target = vault_root / "vault" / "items" / path.name
+        path.rename(target)
+        events = _poll_until(watcher, lambda seen: any(event.kind == "moved" for event in seen))
+        assert WatchEvent("moved", target, path) in events
+
+        target.unlink()
+        events = _poll_until(watcher, lambda seen: any(event.kind == "deleted" for event in seen))
+        assert WatchEvent("deleted", target) in events
+    finally:
+        watcher.stop()
+
+
+def test_apply_changes_updates_indexes(vault_root: Path):
+    path = create_inbox_note(vault_root, title="Kettle", body="descale the kettle")
+    index = enable_trigram_index(vault_root)
+    try:
+        path.write_text(path.read_text(encoding="utf-8").replace("kettle", "samovar"), encoding="utf-8")
+        before = vault_generation()
+        generation = apply_changes(vault_root, [WatchEvent("modified", path)])
+        assert generation > before
+        assert index.get(path).size == path.stat().st_size
+        assert index.text_estimate("samovar") == 1
+        moved = vault_root / "vault" / "items" / path.name
+        path.rename(moved)
+        apply_changes(vault_root, [WatchEvent("moved", moved, path)])
+        assert index.get(path) is None and index.get(moved) is not None
+    finally:
+        disable_trigram_index(vault_root)
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import time
 from pathlib import Path
 from typing import Any
 
 try:
     from fastapi import FastAPI, Header, Request
     from fastapi.exceptions import RequestValidationError
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, PlainTextResponse
+    from starlette.concurrency import run_in_threadpool
     from starlette.exceptions import HTTPException as StarletteHTTPException
 except Exception as exc:  # pragma: no cover
     raise SystemExit("fastapi is required to run this server") from exc
@@ -17,17 +20,35 @@ import uvicorn
 
 from substrate.api import (
     ApiError,
+    api_cache_stats,
     api_capture,
     api_daily_append,
     api_daily_open,
+    api_debug_memory,
+    api_debug_profile,
+    api_graph_neighbors,
     api_inbox,
     api_item,
     api_item_update,
+    api_jobs,
+    api_metrics,
     api_promote,
+    api_retrieve,
     api_search,
     api_validate,
+    effective_budget_ms,
+    metrics_format,
 )
-from substrate.config import load_api_token
+from substrate.cache import configure_view_cache
+from substrate.catalog import enable_catalog
+from substrate.config import config_value, load_api_token, load_config
+from substrate.metrics import metrics, render_prometheus
+from substrate.perf import append_perf_log, collect
+from substrate.search import CancelToken
+from substrate.text_index import enable_trigram_index
+from substrate.watcher import Watcher
+
+_DISCONNECT_POLL_SECONDS = 0.1
 
 
 def _parse_csv(value: str | None) -> list[str] | None:
@@ -55,9 +76,57 @@ async def _read_payload(request: Request) -> dict:
     return payload
 
 
-def create_app(vault_root: Path, token_required: str | None) -> FastAPI:
+async def _run_cancellable(request: Request, cancel: CancelToken, func, /, *args, **kwargs):
+    """Run a blocking API call off the event loop; cancel it if the client disconnects."""
+    task = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_SECONDS)
+        if done:
+            break
+        if await request.is_disconnected():
+            cancel.cancel()
+            break
+    return await task
+
+
+def create_app(
+    vault_root: Path,
+    token_required: str | None,
+    search_budget_ms: int | None = None,
+    *,
+    server_timing: bool = False,
+    perf_log: bool = False,
+) -> FastAPI:
     app = FastAPI()
 
+    @app.middleware("http")
+    async def observe_middleware(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        metrics.inc("http_requests_in_flight", 1)
+        try:
+            if not (server_timing or perf_log):
+                response = await call_next(request)
+                status = response.status_code
+                return response
+            # Endpoint tasks and threadpool calls inherit a copy of this
+            # context, so their spans land in the same collector.
+            with collect() as timings:
+                response = await call_next(request)
+            status = response.status_code
+            if server_timing:
+                response.headers["Server-Timing"] = timings.server_timing()
+            if perf_log:
+                op = f"{request.method} {request.url.path}"
+                await run_in_threadpool(append_perf_log, vault_root, op, timings, {"status": status})
+            return response
+        finally:
+            metrics.inc("http_requests_in_flight", -1)
+            matched = request.scope.get("route")
+            route = matched.path if matched is not None else "unmatched"
+            metrics.inc("http_requests_total", route=route, method=request.method, status=str(status))
+            metrics.observe("http_request_duration_seconds", time.perf_counter() - started, route=route)
+
     @app.exception_handler(ApiError)
     async def api_error_handler(request: Request, exc: ApiError):
         return JSONResponse({"error": exc.message}, status_code=exc.status)
@@ -80,6 +149,7 @@ def create_app(vault_root: Path, token_required: str | None) -> FastAPI:
         sort: str = "updated_desc",
         status: str | None = None,
         privacy: str | None = None,
+        cursor: str | None = None,
         token: str | None = None,
         x_substrate_token: str | None = Header(default=None),
     ) -> dict[str, Any]:
@@ -92,6 +162,7 @@ def create_app(vault_root: Path, token_required: str | None) -> FastAPI:
             privacy=_parse_csv(privacy),
             token_required=token_required,
             token_provided=_token(x_substrate_token, token),
+            cursor=cursor,
         )
 
     @app.get("/api/item")
@@ -109,15 +180,24 @@ def create_app(vault_root: Path, token_required: str | None) -> FastAPI:
 
     @app.get("/api/search")
     async def search(
+        request: Request,
         q: str = "",
         limit: int = 20,
         offset: int = 0,
         status: str | None = None,
         privacy: str | None = None,
+        cursor: str | None = None,
+        budget_ms: int | None = None,
+        explain: bool = False,
+        mode: str = "lexical",
         token: str | None = None,
         x_substrate_token: str | None = Header(default=None),
     ) -> dict[str, Any]:
-        return api_search(
+        cancel = CancelToken()
+        return await _run_cancellable(
+            request,
+            cancel,
+            api_search,
             vault_root,
             query=q,
             limit=limit,
@@ -126,6 +206,120 @@ def create_app(vault_root: Path, token_required: str | None) -> FastAPI:
             privacy=_parse_csv(privacy),
             token_required=token_required,
             token_provided=_token(x_substrate_token, token),
+            cursor=cursor,
+            budget_ms=effective_budget_ms(search_budget_ms, budget_ms),
+            cancel=cancel,
+            explain=explain,
+            mode=mode,
+        )
+
+    @app.get("/api/retrieve")
+    async def retrieve(
+        q: str = "",
+        k: int = 10,
+        mode: str = "lexical",
+        status: str | None = None,
+        privacy: str | None = None,
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ) -> dict[str, Any]:
+        return await run_in_threadpool(
+            api_retrieve,
+            vault_root,
+            query=q,
+            k=k,
+            mode=mode,
+            status=_parse_csv(status),
+            privacy=_parse_csv(privacy),
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
+        )
+
+    @app.get("/api/graph/neighbors")
+    async def graph_neighbors(
+        id: str = "",
+        depth: int = 1,
+        direction: str = "both",
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ) -> dict[str, Any]:
+        return await run_in_threadpool(
+            api_graph_neighbors,
+            vault_root,
+            item_id=id,
+            depth=depth,
+            direction=direction,
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
+        )
+
+    @app.get("/api/cache/stats")
+    async def cache_stats(
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ) -> dict[str, Any]:
+        return api_cache_stats(
+            vault_root,
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
+        )
+
+    @app.get("/api/metrics")
+    async def metrics_endpoint(
+        request: Request,
+        format: str | None = None,
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ):
+        payload = api_metrics(vault_root, token_required=token_required, token_provided=_token(x_substrate_token, token))
+        if metrics_format(format, request.headers.get("accept")) == "prometheus":
+            return PlainTextResponse(render_prometheus(payload), media_type="text/plain; version=0.0.4; charset=utf-8")
+        return payload
+
+    @app.get("/api/debug/profile")
+    async def debug_profile(
+        seconds: int | None = None,
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ):
+        payload = api_debug_profile(
+            vault_root,
+            seconds=seconds,
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
+        )
+        return JSONResponse(payload, status_code=202)
+
+    @app.get("/api/debug/memory")
+    async def debug_memory(
+        action: str | None = None,
+        limit: int | None = None,
+        group: str | None = None,
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ) -> dict[str, Any]:
+        return await run_in_threadpool(
+            api_debug_memory,
+            vault_root,
+            action=action,
+            limit=limit,
+            group=group,
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
+        )
+
+    @app.get("/api/jobs")
+    async def jobs(
+        id: str | None = None,
+        token: str | None = None,
+        x_substrate_token: str | None = Header(default=None),
+    ) -> dict[str, Any]:
+        return await run_in_threadpool(
+            api_jobs,
+            vault_root,
+            job_id=id,
+            token_required=token_required,
+            token_provided=_token(x_substrate_token, token),
         )
 
     @app.get("/api/daily/open")
@@ -234,11 +428,39 @@ def main() -> int:
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--vault", required=True, help="Vault root")
     parser.add_argument("--token", help="API token (optional)")
+    parser.add_argument("--search-budget-ms", type=int, help="Upper bound on search scan time")
+    parser.add_argument("--trigram-index", action="store_true", help="Serve substring search from a trigram index")
+    parser.add_argument(
+        "--catalog", action="store_true", help="Filter and sort views from a columnar catalog (starts the watcher)"
+    )
+    parser.add_argument("--watch", action="store_true", help="Apply external file changes to indexes as they happen")
+    parser.add_argument("--server-timing", action="store_true", help="Send per-request span timings as Server-Timing")
+    parser.add_argument("--perf-log", action="store_true", help="Append per-request span timings to perf.jsonl")
     args = parser.parse_args()
 
     vault_root = Path(args.vault).resolve()
     token = args.token or load_api_token(vault_root)
-    app = create_app(vault_root, token)
+    config = load_config(vault_root)
+    budget = args.search_budget_ms or config_value(config, "search.time_budget_ms")
+    cache_max_bytes = config_value(config, "cache.max_bytes")
+    if cache_max_bytes is not None:
+        configure_view_cache(int(cache_max_bytes))
+    if args.trigram_index or config_value(config, "search.trigram_index", False):
+        enable_trigram_index(vault_root)
+    catalog = args.catalog or config_value(config, "views.catalog", False)
+    if catalog:
+        enable_catalog(vault_root)
+    # The catalog only answers from memory while a watcher applies changes;
+    # without one every query would stat every file.
+    if catalog or args.watch or config_value(config, "watcher.enabled", False):
+        Watcher(vault_root, backend=config_value(config, "watcher.backend", "auto")).start()
+    app = create_app(
+        vault_root,
+        token,
+        search_budget_ms=budget,
+        server_timing=args.server_timing or bool(config_value(config, "perf.server_timing", False)),
+        perf_log=args.perf_log or bool(config_value(config, "perf.log", False)),
+    )
     uvicorn.run(app, host=args.host, port=args.port)
     return 0
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from typing import Any
@@ -9,17 +10,32 @@ from urllib.parse import parse_qs, urlparse
 
 from substrate.api import (
     ApiError,
+    api_cache_stats,
     api_capture,
     api_daily_append,
     api_daily_open,
+    api_debug_memory,
+    api_debug_profile,
+    api_graph_neighbors,
     api_inbox,
     api_item,
     api_item_update,
+    api_jobs,
+    api_metrics,
+    metrics_format,
     api_promote,
+    api_retrieve,
     api_search,
     api_validate,
+    effective_budget_ms,
 )
-from substrate.config import load_api_token
+from substrate.cache import configure_view_cache
+from substrate.catalog import enable_catalog
+from substrate.config import config_value, load_api_token, load_config
+from substrate.metrics import metrics, render_prometheus
+from substrate.perf import append_perf_log, collect, current_timings, span
+from substrate.text_index import enable_trigram_index
+from substrate.watcher import Watcher
 
 
 def _parse_csv(value: str | None) -> list[str] | None:
@@ -31,10 +47,23 @@ def _parse_csv(value: str | None) -> list[str] | None:
 
 
 def _json_response(handler: BaseHTTPRequestHandler, payload: dict, status: int = 200) -> None:
-    data = json.dumps(payload).encode("utf-8")
+    with span("json"):
+        data = json.dumps(payload).encode("utf-8")
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(data)))
+    timings = current_timings()
+    if timings is not None and getattr(handler, "send_server_timing", False):
+        handler.send_header("Server-Timing", timings.server_timing())
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def _text_response(handler: BaseHTTPRequestHandler, text: str, content_type: str) -> None:
+    data = text.encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(data)))
     handler.end_headers()
     handler.wfile.write(data)
 
@@ -51,9 +80,57 @@ def _extract_token(handler: BaseHTTPRequestHandler, query: dict) -> str | None:
     return token_param or None
 
 
-def make_handler(vault_root: Path, token_required: str | None):
+def _parse_int(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError("invalid integer parameter", status=400)
+
+
+def make_handler(
+    vault_root: Path,
+    token_required: str | None,
+    search_budget_ms: int | None = None,
+    *,
+    server_timing: bool = False,
+    perf_log: bool = False,
+):
     class APIHandler(BaseHTTPRequestHandler):
+        status_code = 0
+        matched = True
+        send_server_timing = server_timing
+
         def do_GET(self):
+            self._timed(self._get)
+
+        def do_POST(self):
+            self._timed(self._post)
+
+        def _timed(self, handle) -> None:
+            started = time.perf_counter()
+            metrics.inc("http_requests_in_flight", 1)
+            try:
+                if not (server_timing or perf_log):
+                    handle()
+                    return
+                with collect() as timings:
+                    handle()
+                if perf_log:
+                    op = f"{self.command} {urlparse(self.path).path}"
+                    append_perf_log(vault_root, op, timings, {"status": self.status_code})
+            finally:
+                metrics.inc("http_requests_in_flight", -1)
+                route = urlparse(self.path).path if self.matched else "unmatched"
+                metrics.inc("http_requests_total", route=route, method=self.command, status=str(self.status_code))
+                metrics.observe("http_request_duration_seconds", time.perf_counter() - started, route=route)
+
+        def send_response(self, code: int, message: str | None = None) -> None:
+            self.status_code = code
+            super().send_response(code, message)
+
+        def _get(self):
             parsed = urlparse(self.path)
             query = parse_qs(parsed.query)
             token = _extract_token(self, query)
@@ -64,6 +141,7 @@ def make_handler(vault_root: Path, token_required: str | None):
                     sort = query.get("sort", ["updated_desc"])[0]
                     status = _parse_csv(query.get("status", [""])[0])
                     privacy = _parse_csv(query.get("privacy", [""])[0])
+                    cursor = query.get("cursor", [""])[0] or None
                     payload = api_inbox(
                         vault_root,
                         limit=limit,
@@ -73,6 +151,7 @@ def make_handler(vault_root: Path, token_required: str | None):
                         privacy=privacy,
                         token_required=token_required,
                         token_provided=token,
+                        cursor=cursor,
                     )
                     _json_response(self, payload)
                     return
@@ -94,6 +173,10 @@ def make_handler(vault_root: Path, token_required: str | None):
                     offset = int(query.get("offset", ["0"])[0])
                     status = _parse_csv(query.get("status", [""])[0])
                     privacy = _parse_csv(query.get("privacy", [""])[0])
+                    cursor = query.get("cursor", [""])[0] or None
+                    budget_ms = _parse_int(query.get("budget_ms", [""])[0])
+                    explain = query.get("explain", [""])[0].lower() in {"1", "true", "yes"}
+                    mode = query.get("mode", ["lexical"])[0] or "lexical"
                     payload = api_search(
                         vault_root,
                         query=q,
@@ -103,6 +186,85 @@ def make_handler(vault_root: Path, token_required: str | None):
                         privacy=privacy,
                         token_required=token_required,
                         token_provided=token,
+                        cursor=cursor,
+                        budget_ms=effective_budget_ms(search_budget_ms, budget_ms),
+                        explain=explain,
+                        mode=mode,
+                    )
+                    _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/retrieve":
+                    payload = api_retrieve(
+                        vault_root,
+                        query=query.get("q", [""])[0],
+                        k=_parse_int(query.get("k", [""])[0]) or 10,
+                        mode=query.get("mode", ["lexical"])[0] or "lexical",
+                        status=_parse_csv(query.get("status", [""])[0]),
+                        privacy=_parse_csv(query.get("privacy", [""])[0]),
+                        token_required=token_required,
+                        token_provided=token,
+                    )
+                    _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/graph/neighbors":
+                    payload = api_graph_neighbors(
+                        vault_root,
+                        item_id=query.get("id", [""])[0],
+                        depth=_parse_int(query.get("depth", [""])[0]) or 1,
+                        direction=query.get("direction", ["both"])[0] or "both",
+                        token_required=token_required,
+                        token_provided=token,
+                    )
+                    _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/cache/stats":
+                    payload = api_cache_stats(
+                        vault_root,
+                        token_required=token_required,
+                        token_provided=token,
+                    )
+                    _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/metrics":
+                    payload = api_metrics(vault_root, token_required=token_required, token_provided=token)
+                    if metrics_format(query.get("format", [""])[0], self.headers.get("Accept")) == "prometheus":
+                        _text_response(self, render_prometheus(payload), "text/plain; version=0.0.4; charset=utf-8")
+                    else:
+                        _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/debug/profile":
+                    payload = api_debug_profile(
+                        vault_root,
+                        seconds=_parse_int(query.get("seconds", [""])[0]),
+                        token_required=token_required,
+                        token_provided=token,
+                    )
+                    _json_response(self, payload, status=202)
+                    return
+
+                if parsed.path == "/api/debug/memory":
+                    payload = api_debug_memory(
+                        vault_root,
+                        action=query.get("action", [""])[0] or None,
+                        limit=_parse_int(query.get("limit", [""])[0]),
+                        group=query.get("group", [""])[0] or None,
+                        token_required=token_required,
+                        token_provided=token,
+                    )
+                    _json_response(self, payload)
+                    return
+
+                if parsed.path == "/api/jobs":
+                    payload = api_jobs(
+                        vault_root,
+                        job_id=query.get("id", [""])[0] or None,
+                        token_required=token_required,
+                        token_provided=token,
                     )
                     _json_response(self, payload)
                     return
@@ -121,9 +283,10 @@ def make_handler(vault_root: Path, token_required: str | None):
                 _error(self, exc.message, status=exc.status)
                 return
 
+            self.matched = False
             _error(self, "not found", status=404)
 
-        def do_POST(self):
+        def _post(self):
             parsed = urlparse(self.path)
             length = int(self.headers.get("Content-Length", "0"))
             if length <= 0:
@@ -200,6 +363,7 @@ def make_handler(vault_root: Path, token_required: str | None):
                 _error(self, exc.message, status=exc.status)
                 return
 
+            self.matched = False
             _error(self, "not found", status=404)
 
         def log_message(self, format: str, *args: Any) -> None:
@@ -213,11 +377,39 @@ def main() -> int:
     parser.add_argument("--port", type=int, default=8123)
     parser.add_argument("--vault", required=True, help="Vault root")
     parser.add_argument("--token", help="API token (optional)")
+    parser.add_argument("--search-budget-ms", type=int, help="Upper bound on search scan time")
+    parser.add_argument("--trigram-index", action="store_true", help="Serve substring search from a trigram index")
+    parser.add_argument(
+        "--catalog", action="store_true", help="Filter and sort views from a columnar catalog (starts the watcher)"
+    )
+    parser.add_argument("--watch", action="store_true", help="Apply external file changes to indexes as they happen")
+    parser.add_argument("--server-timing", action="store_true", help="Send per-request span timings as Server-Timing")
+    parser.add_argument("--perf-log", action="store_true", help="Append per-request span timings to perf.jsonl")
     args = parser.parse_args()
 
     vault_root = Path(args.vault).resolve()
     token = args.token or load_api_token(vault_root)
-    handler = make_handler(vault_root, token)
+    config = load_config(vault_root)
+    budget = args.search_budget_ms or config_value(config, "search.time_budget_ms")
+    cache_max_bytes = config_value(config, "cache.max_bytes")
+    if cache_max_bytes is not None:
+        configure_view_cache(int(cache_max_bytes))
+    if args.trigram_index or config_value(config, "search.trigram_index", False):
+        enable_trigram_index(vault_root)
+    catalog = args.catalog or config_value(config, "views.catalog", False)
+    if catalog:
+        enable_catalog(vault_root)
+    # The catalog only answers from memory while a watcher applies changes;
+    # without one every query would stat every file.
+    if catalog or args.watch or config_value(config, "watcher.enabled", False):
+        Watcher(vault_root, backend=config_value(config, "watcher.backend", "auto")).start()
+    handler = make_handler(
+        vault_root,
+        token,
+        search_budget_ms=budget,
+        server_timing=args.server_timing or bool(config_value(config, "perf.server_timing", False)),
+        perf_log=args.perf_log or bool(config_value(config, "perf.log", False)),
+    )
     server = HTTPServer(("", args.port), handler)
     print(f"API server running at http://127.0.0.1:{args.port}")
     print("Deprecated: use tools/api_fastapi.py for the default server")
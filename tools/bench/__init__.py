@@ -0,0 +1 @@
+"""Scale benchmarks: synthetic vault generator, timed scenarios, load generator."""
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from .synthetic import generate_vault, spec_arguments, spec_from_args
+
+ROUTES = ("inbox", "item", "search", "capture", "update")
+WRITE_ROUTES = ("capture", "update")
+DEFAULT_MIX = "inbox=30,item=25,search=30,capture=10,update=5"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 10.0
+
+# PRD non-functional requirements: search <300ms typical, <2s p95 at 1M items.
+PRD_TARGETS_MS = {"search": {"p50_ms": 300.0, "p95_ms": 2000.0}}
+
+_SERVERS = {"stdlib": "tools/api_server.py", "fastapi": "tools/api_fastapi.py"}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"unknown route in mix: {name} (expected one of {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("mix needs at least one positive weight")
+    return mix
+
+
+class _Connection:
+    """Minimal HTTP/1.1 client; reconnects when the server closes (HTTP/1.0)."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def request(self, method: str, target: str, headers: dict[str, str], body: bytes = b"") -> tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+        assert self._reader is not None
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        length: int | None = None
+        close = version == "HTTP/1.0"
+        while True:
+            line = (await self._reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection":
+                close = value.strip().lower() == "close"
+        data = await self._reader.readexactly(length) if length is not None else await self._reader.read()
+        if close or length is None:
+            await self.close()
+        return int(status), data
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    # Nearest-rank percentile over already sorted samples.
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def summarize(samples: dict[str, list[tuple[float, bool]]], elapsed: float) -> dict[str, dict[str, float]]:
+    routes: dict[str, dict[str, float]] = {}
+    for route, values in sorted(samples.items()):
+        latencies = sorted(latency for latency, _ in values)
+        errors = sum(1 for _, ok in values if not ok)
+        routes[route] = {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4) if values else 0.0,
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+    return routes
+
+
+def check_targets(routes: dict[str, dict[str, float]], targets: dict[str, dict[str, float]] = PRD_TARGETS_MS) -> list[dict]:
+    checks = []
+    for route, metrics in targets.items():
+        if route not in routes:
+            continue
+        for metric, target in metrics.items():
+            actual = routes[route][metric]
+            checks.append({"route": route, "metric": metric, "target": target, "actual": actual, "pass": actual <= target})
+    return checks
+
+
+async def run_load(
+    base_url: str,
+    *,
+    mix: dict[str, float],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    duration: float = DEFAULT_DURATION,
+    token: str | None = None,
+    seed: int = 1,
+) -> dict[str, Any]:
+    """Drive ``concurrency`` keep-alive clients through ``mix`` for ``duration`` seconds."""
+    parsed = urllib.parse.urlsplit(base_url)
+    host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["X-Substrate-Token"] = token
+
+    seed_conn = _Connection(host, port)
+    status, data = await seed_conn.request("GET", "/api/inbox?limit=200", headers)
+    await seed_conn.close()
+    if status != 200:
+        raise RuntimeError(f"GET /api/inbox failed with {status}: {data[:200]!r}")
+    inbox = json.loads(data)["items"]
+    paths = [item["path"] for item in inbox]
+    words = sorted({word.lower() for item in inbox for word in str(item.get("title") or "").split() if len(word) > 3})
+    words = words or ["note"]
+    names = [name for name in ROUTES if mix.get(name)]
+    weights = [mix[name] for name in names]
+    samples: dict[str, list[tuple[float, bool]]] = {name: [] for name in names}
+    deadline = time.perf_counter() + duration
+
+    def _build(route: str, rng: random.Random, counter: int) -> tuple[str, str, bytes]:
+        if route == "inbox":
+            return "GET", f"/api/inbox?limit=50&offset={rng.randrange(0, 4) * 50}", b""
+        if route == "item" and paths:
+            return "GET", "/api/item?" + urllib.parse.urlencode({"path": rng.choice(paths)}), b""
+        if route == "search":
+            return "GET", "/api/search?" + urllib.parse.urlencode({"q": rng.choice(words), "limit": 20}), b""
+        if route == "update" and paths:
+            payload = {"path": rng.choice(paths), "frontmatter": {"summary": f"load test {counter}"}}
+            return "POST", "/api/item/update", json.dumps(payload).encode("utf-8")
+        payload = {"title": f"Load capture {counter}", "body": " ".join(rng.choices(words, k=20))}
+        return "POST", "/api/capture", json.dumps(payload).encode("utf-8")
+
+    async def _client(number: int) -> None:
+        rng = random.Random(seed * 1000 + number)
+        conn = _Connection(host, port)
+        counter = 0
+        try:
+            while time.perf_counter() < deadline:
+                route = rng.choices(names, weights=weights)[0]
+                counter += 1
+                method, target, body = _build(route, rng, counter)
+                started = time.perf_counter()
+                try:
+                    status, _ = await conn.request(method, target, headers, body)
+                    ok = status < 400
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    ok = False
+                    await conn.close()
+                samples[route].append((time.perf_counter() - started, ok))
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    routes = summarize(samples, elapsed)
+    total = sum(route["requests"] for route in routes.values())
+    errors = sum(route["errors"] for route in routes.values())
+    return {
+        "meta": {"url": base_url, "concurrency": concurrency, "duration_s": round(elapsed, 3), "mix": mix},
+        "total": {"requests": total, "errors": errors, "rps": round(total / elapsed, 2) if elapsed else 0.0},
+        "routes": routes,
+        "targets": check_targets(routes),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    kind: str,
+    vault_root: Path,
+    port: int,
+    extra: list[str] | None = None,
+    token: str | None = None,
+) -> subprocess.Popen:
+    """Start one of the bundled API servers and wait until it answers."""
+    root = Path(__file__).resolve().parents[2]
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(root)
+    proc = subprocess.Popen(
+        [sys.executable, _SERVERS[kind], "--port", str(port), "--vault", str(vault_root), *(extra or [])],
+        cwd=str(root),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    probe = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/inbox?limit=1",
+        headers={"X-Substrate-Token": token} if token else {},
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited early: {proc.stderr.read() if proc.stderr else ''}")
+        try:
+            with urllib.request.urlopen(probe, timeout=1):
+                return proc
+        except urllib.error.HTTPError:
+            return proc  # any HTTP response (e.g. 401 for a vault token) means it is serving
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="HTTP load generator for the substrate API servers")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--server", choices=sorted(_SERVERS), default="fastapi", help="Server to start")
+    parser.add_argument("--vault", help="Vault for the started server; omit to generate a synthetic one")
+    parser.add_argument("--token", help="API token")
+    parser.add_argument(
+        "--allow-writes",
+        action="store_true",
+        help="Let capture/update requests write into a --vault or --url vault (synthetic vaults always allow them)",
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Route weights (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds")
+    parser.add_argument("--server-arg", action="append", default=[], help="Extra argument for the started server")
+    parser.add_argument("--output", help="Write the report JSON here")
+    spec_arguments(parser)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    writes = [name for name in WRITE_ROUTES if mix.get(name)]
+    if writes and (args.vault or args.url) and not args.allow_writes:
+        print(
+            f"the mix writes notes ({', '.join(writes)}) into a real vault; pass --allow-writes or set those weights to 0",
+            file=sys.stderr,
+        )
+        return 2
+
+    with tempfile.TemporaryDirectory(prefix="substrate-load-") as tmp:
+        proc = None
+        url = args.url
+        if not url:
+            vault_root = Path(args.vault).resolve() if args.vault else Path(tmp) / "vault_root"
+            if not args.vault:
+                generate_vault(vault_root, spec_from_args(args))
+            port = _free_port()
+            extra = list(args.server_arg) + (["--token", args.token] if args.token else [])
+            proc = start_server(args.server, vault_root, port, extra, token=args.token)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            report = asyncio.run(
+                run_load(url, mix=mix, concurrency=args.concurrency, duration=args.duration, token=args.token, seed=args.seed)
+            )
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    failed = report["total"]["errors"] or not all(check["pass"] for check in report["targets"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
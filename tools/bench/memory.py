@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable
+
+from substrate.inbox import list_inbox
+from substrate.ops_log import iter_ops_log
+from substrate.search import search_items
+from substrate.views import inbox_view, search_view
+
+from .run import _search_term
+from .synthetic import VaultSpec, generate_vault, spec_arguments, spec_from_args
+
+DEFAULT_SIZES = (1000, 4000)
+# Growth of peak traced memory per vault item between the smallest and the
+# largest vault. Paged views hold a page, not the vault; what still grows is
+# the directory listing (a Path per file, ~250 bytes) and, for the inbox, the
+# InboxItem list. Materializing every parsed item costs several KB per item.
+DEFAULT_BUDGETS = {"search_view": 512, "inbox_view": 1024}
+
+
+def peak_bytes(func: Callable[[], Any]) -> int:
+    """Peak traced memory of one call; one frame per trace keeps overhead low."""
+    func()  # warm imports, schema and regex caches outside the measurement
+    gc.collect()
+    tracemalloc.start(1)
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def memory_scenarios(vault_root: Path) -> dict[str, Callable[[], Any]]:
+    term = _search_term(vault_root)
+    return {
+        "search_view": lambda: search_view(vault_root, term, limit=50),
+        "inbox_view": lambda: inbox_view(vault_root, limit=50),
+    }
+
+
+def listing_scenarios(vault_root: Path) -> dict[str, Callable[[], list[Any]]]:
+    """Bulk listings that materialize one record per item or log entry."""
+    return {
+        "list_inbox": lambda: list_inbox(vault_root),
+        "iter_ops_log": lambda: list(iter_ops_log(vault_root)),
+        "search_items": lambda: search_items(vault_root, "type:note"),
+    }
+
+
+def listing_bytes(vault_root: Path) -> dict[str, dict[str, Any]]:
+    """Retained bytes per record of each listing (the result held, not the peak)."""
+    rows: dict[str, dict[str, Any]] = {}
+    for name, func in listing_scenarios(vault_root).items():
+        func()
+        gc.collect()
+        tracemalloc.start(1)
+        try:
+            records = func()
+            retained = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        rows[name] = {
+            "records": len(records),
+            "retained_bytes": retained,
+            "bytes_per_record": round(retained / len(records), 1) if records else None,
+        }
+    return rows
+
+
+def parse_budgets(values: list[str] | None) -> dict[str, float]:
+    budgets: dict[str, float] = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        name, sep, amount = value.partition("=")
+        if not sep or name not in DEFAULT_BUDGETS:
+            raise ValueError(f"budget must be <scenario>=<bytes> for one of: {', '.join(DEFAULT_BUDGETS)}")
+        budgets[name] = float(amount)
+    return budgets
+
+
+def run_memory(
+    spec: VaultSpec,
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    budgets: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Peak memory per scenario at each vault size, checked against per-item budgets."""
+    budgets = budgets or dict(DEFAULT_BUDGETS)
+    sizes = tuple(sorted(sizes))
+    peaks: dict[str, dict[int, int]] = {}
+    listings: dict[str, Any] | None = None
+    with tempfile.TemporaryDirectory(prefix="substrate-bench-memory-") as tmp:
+        for size in sizes:
+            vault_root = Path(tmp) / f"vault_{size}"
+            started = time.perf_counter()
+            generate_vault(vault_root, replace(spec, items=size))
+            print(f"generated {size} items in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            for name, func in memory_scenarios(vault_root).items():
+                peaks.setdefault(name, {})[size] = peak_bytes(func)
+            if size == sizes[-1]:
+                listings = listing_bytes(vault_root)
+
+    results: dict[str, Any] = {}
+    for name, by_size in peaks.items():
+        growth = None
+        if len(sizes) > 1:
+            growth = round((by_size[sizes[-1]] - by_size[sizes[0]]) / (sizes[-1] - sizes[0]), 1)
+        results[name] = {
+            "peak_bytes": {str(size): peak for size, peak in by_size.items()},
+            "bytes_per_item": growth,
+            "budget_bytes_per_item": budgets.get(name),
+            "within_budget": growth is None or name not in budgets or growth <= budgets[name],
+        }
+    return {"sizes": list(sizes), "results": results, "listings": listings}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that view peak memory stays bounded as the vault grows")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated item counts")
+    parser.add_argument("--budget", action="append", help="<scenario>=<bytes per item> (repeatable)")
+    parser.add_argument("--output", help="Write results JSON here")
+    spec_arguments(parser)
+    args = parser.parse_args()
+    try:
+        sizes = tuple(int(size) for size in args.sizes.split(","))
+        budgets = parse_budgets(args.budget)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    report = run_memory(spec_from_args(args), sizes, budgets)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0 if all(row["within_budget"] for row in report["results"].values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from substrate.catalog import Catalog
+from substrate.inbox import list_inbox
+from substrate.items import create_inbox_note, promote_inbox_item
+from substrate.ops_log import filter_ops_since, tail_ops_log
+from substrate.repair import repair_tree
+from substrate.search import search_items
+from substrate.text_index import disable_trigram_index, enable_trigram_index
+from substrate.views import inbox_view
+
+from .synthetic import VaultSpec, generate_vault, spec_arguments, spec_from_args
+
+DEFAULT_ROUNDS = 5
+DEFAULT_THRESHOLD = 1.25
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A timed operation; ``prepare`` runs untimed before each round and its
+    result is passed to ``run``."""
+
+    name: str
+    run: Callable[[Any], Any]
+    prepare: Callable[[], Any] = lambda: None
+
+
+def _search_term(vault_root: Path) -> str:
+    # A mid-frequency body word so the query matches a realistic share of items.
+    items = list_inbox(vault_root)
+    if not items:
+        return "ka"
+    text = items[0].path.read_text(encoding="utf-8").split("---", 2)[-1].split()
+    return text[len(text) // 2].strip(".").lower() if text else "ka"
+
+
+_catalogs: dict[str, Catalog] = {}
+
+
+def _warm_catalog(vault_root: Path) -> Catalog:
+    # Built once per vault and reused across rounds, as a server would.
+    catalog = _catalogs.get(str(vault_root))
+    if catalog is None:
+        catalog = _catalogs[str(vault_root)] = Catalog(vault_root)
+        inbox_view(vault_root, limit=1, sort="title_asc", catalog=catalog)
+    return catalog
+
+
+def scenarios(vault_root: Path) -> list[Scenario]:
+    term = _search_term(vault_root)
+    since = "2025-01-01T00:00:00+00:00"
+
+    def _fresh_inbox_note() -> Path:
+        return create_inbox_note(vault_root, title="Bench promote", body="promote me")
+
+    def _search_indexed(_: Any) -> Any:
+        index = enable_trigram_index(vault_root)
+        try:
+            return search_items(vault_root, term, index=index)
+        finally:
+            disable_trigram_index(vault_root)
+
+    return [
+        Scenario("search_items", lambda _: search_items(vault_root, term)),
+        Scenario("search_items_filtered", lambda _: search_items(vault_root, f"status:canonical {term}")),
+        Scenario("search_items_trigram_cold", _search_indexed),
+        Scenario(
+            "search_items_trigram",
+            lambda index: search_items(vault_root, term, index=index),
+            lambda: enable_trigram_index(vault_root),
+        ),
+        Scenario("inbox_view", lambda _: inbox_view(vault_root, limit=50)),
+        Scenario(
+            "inbox_view_catalog",
+            lambda catalog: inbox_view(vault_root, limit=50, sort="title_asc", privacy=["public"], catalog=catalog),
+            lambda: _warm_catalog(vault_root),
+        ),
+        Scenario(
+            "search_items_filtered_catalog",
+            lambda catalog: search_items(vault_root, f"status:canonical {term}", catalog=catalog),
+            lambda: _warm_catalog(vault_root),
+        ),
+        Scenario("list_inbox", lambda _: list_inbox(vault_root)),
+        Scenario(
+            "repair_tree",
+            lambda _: repair_tree(vault_root, vault_root / "vault" / "items", quarantine_invalid=False, dry_run=True),
+        ),
+        Scenario("tail_ops_log", lambda _: tail_ops_log(vault_root, limit=50)),
+        Scenario("filter_ops_since", lambda _: filter_ops_since(vault_root, since)),
+        Scenario("create_inbox_note", lambda _: create_inbox_note(vault_root, title="Bench capture", body="body")),
+        Scenario("promote_inbox_item", lambda path: promote_inbox_item(vault_root, path), _fresh_inbox_note),
+    ]
+
+
+def time_scenario(scenario: Scenario, rounds: int) -> dict[str, float | int]:
+    timings: list[float] = []
+    for _ in range(rounds):
+        prepared = scenario.prepare()
+        started = time.perf_counter()
+        scenario.run(prepared)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+    return {
+        "rounds": rounds,
+        "min_ms": round(timings[0] * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    vault_root: Path,
+    *,
+    rounds: int = DEFAULT_ROUNDS,
+    only: list[str] | None = None,
+    spec: VaultSpec | None = None,
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for scenario in scenarios(vault_root):
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = time_scenario(scenario, rounds)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vault": str(vault_root),
+            "spec": asdict(spec) if spec else None,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Per-scenario median ratios; ``regression`` when current/baseline > threshold."""
+    rows = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["median_ms"]:
+            continue
+        ratio = stats["median_ms"] / before["median_ms"]
+        rows.append(
+            {
+                "scenario": name,
+                "baseline_ms": before["median_ms"],
+                "current_ms": stats["median_ms"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > threshold,
+            }
+        )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run timed scenarios against a (synthetic) vault")
+    parser.add_argument("--vault", help="Existing vault root; omit to generate a temporary one")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios (repeatable)")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regression ratio")
+    spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = None
+    with tempfile.TemporaryDirectory(prefix="substrate-bench-") as tmp:
+        if args.vault:
+            vault_root = Path(args.vault).resolve()
+        else:
+            spec = spec_from_args(args)
+            vault_root = Path(tmp) / "vault_root"
+            started = time.perf_counter()
+            generate_vault(vault_root, spec)
+            print(f"generated {spec.items} items in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        report = run_benchmarks(vault_root, rounds=args.rounds, only=args.scenario, spec=spec)
+
+    status = 0
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        report["comparison"] = compare(baseline, report, args.threshold)
+        status = 1 if any(row["regression"] for row in report["comparison"]) else 0
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import math
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from substrate.layout import item_path
+from substrate.vault import init_vault
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "be", "da", "fi", "go", "hu", "pe", "zo", "an", "el", "or"]
+_STATUSES = (("canonical", 70), ("draft", 15), ("archived", 10), ("tombstoned", 5))
+_PRIVACY = (("private", 80), ("public", 15), ("sensitive", 5))
+_OPS = ("inbox.capture", "inbox.promote", "item.update", "daily.append", "repair.file", "search.query")
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class VaultSpec:
+    """Shape of a synthetic vault. The same spec and seed give the same files."""
+
+    items: int = 1000
+    inbox_ratio: float = 0.1
+    body_words: int = 150  # median; lengths are log-normal around it
+    body_sigma: float = 0.8
+    vocabulary: int = 5000
+    tags: int = 50
+    daily_notes: int = 30
+    ops_entries: int = 10_000
+    seed: int = 1
+
+
+def _ulid(rng: random.Random, when: datetime) -> str:
+    value = (int(when.timestamp() * 1000) << 80) | rng.getrandbits(80)
+    return "".join(_ALPHABET[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def _weighted(rng: random.Random, choices: tuple[tuple[str, int], ...]) -> str:
+    return rng.choices([name for name, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+class _Words:
+    """Deterministic pseudo-words drawn with a Zipf-like distribution."""
+
+    def __init__(self, rng: random.Random, size: int) -> None:
+        words: set[str] = set()
+        while len(words) < size:
+            words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+        self.words = sorted(words)
+        rng.shuffle(self.words)
+        total = 0.0
+        self.cumulative = []
+        for rank in range(1, size + 1):
+            total += 1.0 / rank
+            self.cumulative.append(total)
+
+    def sample(self, rng: random.Random, count: int) -> list[str]:
+        top = self.cumulative[-1]
+        return [self.words[bisect.bisect_left(self.cumulative, rng.random() * top)] for _ in range(count)]
+
+
+def _body(rng: random.Random, words: _Words, spec: VaultSpec) -> str:
+    count = max(5, int(rng.lognormvariate(math.log(spec.body_words), spec.body_sigma)))
+    sampled = words.sample(rng, count)
+    paragraphs = []
+    for start in range(0, count, 60):
+        paragraphs.append(" ".join(sampled[start : start + 60]).capitalize() + ".")
+    return "\n\n".join(paragraphs) + "\n"
+
+
+def _frontmatter(fields: dict[str, object]) -> str:
+    # Hand-formatted YAML: every value is a plain scalar or a flow list, which
+    # is much faster to emit than yaml.safe_dump at a million files.
+    lines = ["---"]
+    for key, value in fields.items():
+        if isinstance(value, list):
+            lines.append(f"{key}: [{', '.join(json.dumps(item) for item in value)}]")
+        else:
+            lines.append(f"{key}: {json.dumps(value)}")
+    lines.append("---")
+    return "\n".join(lines) + "\n"
+
+
+def generate_vault(vault_root: Path, spec: VaultSpec) -> dict[str, int]:
+    """Write a synthetic vault under ``vault_root``; returns file counts."""
+    rng = random.Random(spec.seed)
+    init_vault(vault_root)
+    vault_root = vault_root.expanduser().resolve()
+    words = _Words(rng, spec.vocabulary)
+    tags = [f"tag{idx}" for idx in range(spec.tags)]
+    span = timedelta(days=730)
+    inbox = 0
+    for idx in range(spec.items):
+        created = _EPOCH + span * (idx / max(spec.items, 1))
+        updated = created + timedelta(hours=rng.randint(0, 24 * 30))
+        item_id = _ulid(rng, created)
+        in_inbox = rng.random() < spec.inbox_ratio
+        fields: dict[str, object] = {
+            "schema_version": "0.1",
+            "id": item_id,
+            "type": "note",
+            "title": " ".join(words.sample(rng, rng.randint(2, 6))).title(),
+            "created": created.isoformat(),
+            "updated": updated.isoformat(),
+            "status": "inbox" if in_inbox else _weighted(rng, _STATUSES),
+            "privacy": _weighted(rng, _PRIVACY),
+        }
+        if tags and rng.random() < 0.7:
+            fields["tags"] = sorted(set(rng.sample(tags, rng.randint(1, min(4, len(tags))))))
+        text = _frontmatter(fields) + _body(rng, words, spec)
+        if in_inbox:
+            path = vault_root / "vault" / "inbox" / f"{item_id}.md"
+            inbox += 1
+        else:
+            path = item_path(vault_root, item_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    for idx in range(spec.daily_notes):
+        day = (_EPOCH + timedelta(days=idx)).date()
+        created = datetime(day.year, day.month, day.day, 8, tzinfo=timezone.utc)
+        fields = {
+            "schema_version": "0.1",
+            "id": _ulid(rng, created),
+            "type": "daily",
+            "title": day.isoformat(),
+            "created": created.isoformat(),
+            "updated": created.isoformat(),
+            "status": "canonical",
+            "privacy": "private",
+        }
+        entries = "\n".join(" ".join(words.sample(rng, rng.randint(4, 16))) for _ in range(rng.randint(1, 8)))
+        (vault_root / "vault" / "daily" / f"{day.isoformat()}.md").write_text(
+            _frontmatter(fields) + entries + "\n", encoding="utf-8"
+        )
+
+    log_dir = vault_root / "vault" / "_system" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with (log_dir / "ops.jsonl").open("w", encoding="utf-8", newline="\n") as handle:
+        for idx in range(spec.ops_entries):
+            timestamp = (_EPOCH + span * (idx / max(spec.ops_entries, 1))).isoformat()
+            entry = {"timestamp": timestamp, "op": rng.choice(_OPS), "data": {"n": idx}}
+            handle.write(json.dumps(entry) + "\n")
+
+    return {
+        "items": spec.items - inbox,
+        "inbox": inbox,
+        "daily": spec.daily_notes,
+        "ops_entries": spec.ops_entries,
+    }
+
+
+def spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = VaultSpec()
+    parser.add_argument("--items", type=int, default=defaults.items)
+    parser.add_argument("--inbox-ratio", type=float, default=defaults.inbox_ratio)
+    parser.add_argument("--body-words", type=int, default=defaults.body_words)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--daily-notes", type=int, default=defaults.daily_notes)
+    parser.add_argument("--ops-entries", type=int, default=defaults.ops_entries)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace) -> VaultSpec:
+    return VaultSpec(
+        items=args.items,
+        inbox_ratio=args.inbox_ratio,
+        body_words=args.body_words,
+        tags=args.tags,
+        daily_notes=args.daily_notes,
+        ops_entries=args.ops_entries,
+        seed=args.seed,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic vault")
+    parser.add_argument("vault", help="Vault root to create (should be empty)")
+    spec_arguments(parser)
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+    counts = generate_vault(Path(args.vault), spec)
+    print(json.dumps({"spec": asdict(spec), "written": counts}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())